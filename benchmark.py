@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for AD_DEV_ChronCLI
+
+Generates synthetic task stores, times storage and rendering operations
+against an in-memory stand-in for curses windows, and compares runs:
+
+    python3 benchmark.py run --sizes 1000,100000 -o before.json
+    python3 benchmark.py run --sizes 1000,100000 -o after.json
+    python3 benchmark.py compare before.json after.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import chroncli
+
+DEFAULT_SIZES = "1000,10000,100000"
+DEFAULT_THRESHOLD = 0.10  # Slowdown ratio flagged as a regression by compare
+
+
+class FakeWindow:
+    """In-memory stand-in for a curses window that records nothing but call counts"""
+
+    def __init__(self, height=50, width=100):
+        self.height = height
+        self.width = width
+        self.writes = 0
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, y, x, text, attr=0):
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            raise ValueError(f"addstr outside window at ({y}, {x})")
+        self.writes += 1
+
+    def erase(self):
+        self.writes += 1
+
+    def clear(self):
+        self.writes += 1
+
+    def box(self):
+        self.writes += 1
+
+    def noutrefresh(self):
+        pass
+
+    def refresh(self):
+        pass
+
+
+class FakePanels:
+    """Stand-in for curses.panel, the views only create panels and never stack them"""
+
+    @staticmethod
+    def new_panel(window):
+        return None
+
+
+def use_data_dir(path):
+    """Point chroncli's storage paths at a scratch directory"""
+    chroncli.CONFIG_DIR = path
+    chroncli.DATA_FILE = os.path.join(path, "tasks.json")
+    chroncli.BINARY_FILE = os.path.join(path, "tasks.bin")
+    chroncli.INDEX_CACHE_FILE = os.path.join(path, "tasks.cache")
+    chroncli.JOURNAL_FILE = os.path.join(path, "tasks.journal")
+    chroncli.DB_FILE = os.path.join(path, "tasks.db")
+    chroncli.CONFIG_FILE = os.path.join(path, "config.json")
+    chroncli.LOCK_FILE = os.path.join(path, "tasks.lock")
+    chroncli.ARCHIVE_DIR = os.path.join(path, "archive")
+    chroncli.CHANGES_FILE = os.path.join(path, "tasks.changes")
+    chroncli.SYNC_FILE = os.path.join(path, "sync.json")
+
+
+def generate_store(path, size, storage, seed=0):
+    """Write a synthetic store of size tasks spread over two years around today"""
+    rng = random.Random(seed)
+    origin = datetime.datetime.combine(datetime.date.today(), datetime.time(8)) - datetime.timedelta(days=365)
+    tasks = []
+    for i in range(size):
+        start = origin + datetime.timedelta(minutes=rng.randrange(0, 730 * 24 * 60, 15))
+        end = start + datetime.timedelta(minutes=rng.choice((15, 30, 60))) if rng.random() < 0.5 else None
+        tasks.append(chroncli.Task(f"Synthetic task {i}", start, end, rng.random() < 0.3))
+
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "config.json"), 'w') as f:
+        json.dump({"storage": storage}, f)
+    if storage == "json":
+        with open(os.path.join(path, "tasks.json"), 'w') as f:
+            json.dump([task.to_dict() for task in tasks], f)
+    else:
+        backend = chroncli.STORAGE_BACKENDS[storage]()
+        backend.open()
+        backend.add_tasks(tasks)
+        backend.close()
+
+
+def measure(func, repeat):
+    """Run func repeat times and return the median wall time in seconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def bench_store(size, storage, repeat):
+    """Time every operation against one synthetic store, returning {name: seconds}"""
+    results = {}
+    rng = random.Random(1)
+    data_dir = tempfile.mkdtemp(prefix="chroncli-bench-")
+    try:
+        use_data_dir(data_dir)
+        generate_store(data_dir, size, storage)
+
+        def load():
+            chroncli.TaskManager().close()
+        results["load_tasks"] = measure(load, repeat)
+
+        task_manager = chroncli.TaskManager()
+        results["save_tasks"] = measure(task_manager.save_tasks, repeat)
+
+        today = datetime.date.today()
+        dates = [today + datetime.timedelta(days=rng.randint(-365, 365)) for _ in range(100)]
+        results["get_tasks_for_date"] = measure(
+            lambda: [task_manager.get_tasks_for_date(date) for date in dates], repeat) / len(dates)
+        results["get_month_counts"] = measure(
+            lambda: task_manager.get_month_counts(today.year, today.month), repeat)
+
+        def query_pages():
+            cursor = None
+            for _ in range(20):
+                page = list(task_manager.query(limit=50, cursor=cursor))
+                cursor = page[-1] if len(page) == 50 else None
+        results["query_cursor_page"] = measure(query_pages, repeat) / 20
+
+        def add_and_delete():
+            task = chroncli.Task("Benchmark task", datetime.datetime.combine(today, datetime.time(12)))
+            task_manager.add_task(task)
+            task_manager.delete_task(task.id)
+        results["add_delete_task"] = measure(add_and_delete, repeat)
+
+        calendar_view = chroncli.CalendarView(FakeWindow(), task_manager)
+
+        def full_calendar_draw():
+            calendar_view._layout = None
+            calendar_view.draw()
+        results["calendar_draw_full"] = measure(full_calendar_draw, repeat)
+        results["calendar_draw_unchanged"] = measure(calendar_view.draw, repeat)
+        results["calendar_month_navigation"] = measure(
+            lambda: (calendar_view.next_month(), calendar_view.prev_month()), repeat) / 2
+
+        calendar_view.view = "year"
+
+        def full_year_draw():
+            task_manager._day_stats = {}
+            calendar_view._layout = None
+            calendar_view.draw()
+        results["calendar_year_draw_full"] = measure(full_year_draw, repeat)
+        calendar_view.view = "month"
+
+        list_view = chroncli.TaskListView(FakeWindow(), task_manager)
+
+        def full_list_draw():
+            list_view._layout = None
+            list_view.model = chroncli.TaskListModel(task_manager)
+            list_view.draw()
+        results["task_list_draw_full"] = measure(full_list_draw, repeat)
+
+        def key_down_burst():
+            list_view.selected_index = list_view.offset = 0
+            for _ in range(100):
+                list_view.handle_key(chroncli.curses.KEY_DOWN)
+        results["task_list_key_down"] = measure(key_down_burst, repeat) / 100
+
+        def page_down_burst():
+            list_view.selected_index = list_view.offset = 0
+            for _ in range(20):
+                list_view.handle_key(chroncli.curses.KEY_NPAGE)
+        results["task_list_page_down"] = measure(page_down_burst, repeat) / 20
+
+        def toggle_selected():
+            list_view.handle_key(ord(' '))
+            list_view.handle_key(ord(' '))
+        results["task_list_toggle"] = measure(toggle_selected, repeat) / 2
+
+        task_manager.close()
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+def command_run(args):
+    """Benchmark every size and storage backend and write the results as JSON"""
+    chroncli.load_curses()
+    chroncli.panel = FakePanels
+
+    results = {}
+    for storage in args.storage.split(","):
+        for size in (int(size) for size in args.sizes.split(",")):
+            print(f"Benchmarking {storage} store with {size} tasks...", file=sys.stderr)
+            for name, seconds in bench_store(size, storage, args.repeat).items():
+                key = f"{storage}/{size}/{name}"
+                results[key] = seconds
+                print(f"  {name:<28} {seconds * 1000:>10.3f} ms", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "chroncli_version": chroncli.VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.datetime.now().isoformat(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+def command_compare(args):
+    """Compare two result files, exiting non-zero if anything regressed past the threshold"""
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    with open(args.candidate) as f:
+        candidate = json.load(f)["results"]
+
+    regressions = 0
+    for key in sorted(set(baseline) & set(candidate)):
+        before, after = baseline[key], candidate[key]
+        ratio = after / before if before else float("inf")
+        flag = ""
+        if ratio > 1 + args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 - args.threshold:
+            flag = "  improved"
+        print(f"{key:<48} {before * 1000:>10.3f} ms -> {after * 1000:>10.3f} ms  x{ratio:.2f}{flag}")
+
+    for key in sorted(set(baseline) ^ set(candidate)):
+        print(f"{key:<48} only in {'baseline' if key in baseline else 'candidate'}")
+
+    print(f"\n{regressions} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    """Entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark AD_DEV_ChronCLI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma separated store sizes (default {DEFAULT_SIZES})")
+    run.add_argument("--storage", default="json", help="comma separated storage backends (default json)")
+    run.add_argument("--repeat", type=int, default=5, help="runs per measurement, the median is kept")
+    run.add_argument("-o", "--output", help="results file, default stdout")
+    run.set_defaults(func=command_run)
+
+    compare = commands.add_parser("compare", help="compare two result files")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                         help=f"slowdown ratio flagged as a regression (default {DEFAULT_THRESHOLD})")
+    compare.set_defaults(func=command_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
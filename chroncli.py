@@ -3,20 +3,77 @@
 AD_DEV_ChronCLI - A terminal-based calendar and task scheduler
 """
 
-import curses
+import argparse
+import bisect
+import contextlib
 import datetime
+import gc
+import gzip
+import hashlib
+import heapq
+import itertools
 import os
 import json
+import random
+import re
+import signal
+import struct
+import subprocess
 import sys
+import threading
 import time
-from curses import panel
+from array import array
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock, writes are then only serialized within one process
+    fcntl = None
+
+# curses is imported by load_curses() only when the interactive UI starts,
+# so headless subcommands never pay for it
+curses = None
+panel = None
 
 # Constants
 CONFIG_DIR = os.path.expanduser("~/.ad_dev_chroncli")
 DATA_FILE = os.path.join(CONFIG_DIR, "tasks.json")
+BINARY_FILE = os.path.join(CONFIG_DIR, "tasks.bin")
+INDEX_CACHE_FILE = os.path.join(CONFIG_DIR, "tasks.cache")
+JOURNAL_FILE = os.path.join(CONFIG_DIR, "tasks.journal")
+DB_FILE = os.path.join(CONFIG_DIR, "tasks.db")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
+LOCK_FILE = os.path.join(CONFIG_DIR, "tasks.lock")
+ARCHIVE_DIR = os.path.join(CONFIG_DIR, "archive")
+CHANGES_FILE = os.path.join(CONFIG_DIR, "tasks.changes")
+SYNC_FILE = os.path.join(CONFIG_DIR, "sync.json")
+JOURNAL_COMPACT_THRESHOLD = 500  # Journal records before compacting into a snapshot
+EXPORT_PAGE_SIZE = 1000  # Tasks fetched per page when streaming exports
+WRITE_BEHIND_DELAY = 0.5  # Seconds to coalesce changes before the background saver writes them
+SQLITE_BATCH_SIZE = 500  # Rows per batched insert, kept under SQLite's bound parameter limit
+RELOAD_POLL_INTERVAL = 1.0  # Seconds between checks for changes made by other instances
+MAX_CACHED_MONTHS = 36  # Months of expanded recurring task occurrences kept in memory
+REMINDER_WINDOW_HOURS = 24  # Hours of upcoming tasks, beyond the reminder lead time, held in the daemon's heap
+ARCHIVE_KEEP_MONTHS = 2  # Completed tasks of this many latest months stay in tasks.json, older ones are archived
+CHANGES_COMPACT_SIZE = 1 << 20  # Bytes of change log below which superseded changes are never compacted away
+SYNC_PORT = 8617  # Default port of chroncli serve
+SYNC_TIMEOUT = 60.0  # Seconds a sync request may take before the client gives up
+MESSAGE_TIMEOUT = 2.0  # Seconds an error message stays on screen
+LOST_EDIT_NOTICE = 10.0  # Seconds the status bar reports a change dropped because another instance deleted its task
+BANNER_TIMEOUT = 1.5  # Seconds the banner is shown unless a key is pressed
+RESIZE_SETTLE = 0.05  # Seconds without a resize event after which a burst of them is laid out
+RESIZE_MAX_DELAY = 0.2  # Seconds a continuing burst of resize events may hold back the layout
+MIN_SCREEN_HEIGHT = 23  # Rows a six week month grid needs above the key help line
+MIN_SCREEN_WIDTH = 80  # Columns the two panes need side by side
 VERSION = "1.0.0"
 
+DEFAULT_CONFIG = {
+    "storage": "json",  # "json", "binary" or "sqlite"
+    "reminder_minutes": 10,  # How long before a task starts the daemon reminds of it
+    "reminder_hooks": ["log"],  # Any of "bell", "log" and "command"
+    "reminder_command": None,  # Shell command for the "command" hook, given the task in CHRONCLI_TASK_* variables
+    "sync_token": None,  # Shared secret that chroncli serve requires and chroncli sync sends
+}
+
 ASCII_BANNER = """
                                                                                                    
                                       .                                                             
@@ -61,23 +118,210 @@ ASCII_BANNER = """
                                                                                                     
 """
 
+def load_curses():
+    """Import curses and curses.panel for the interactive UI"""
+    global curses, panel
+    if curses is None:
+        import curses
+        from curses import panel
+    return curses
+
+
+def write_atomic(path, write, mode='w'):
+    """Write a file through a temp file and rename so a crash never truncates it"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, mode) as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+@contextlib.contextmanager
+def paused_gc():
+    """Suspend cyclic garbage collection while building many objects that form no cycles"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class FileLock:
+    """Advisory lock on LOCK_FILE, or another lock file, shared by every ChronCLI process, reentrant within one"""
+    
+    def __init__(self, path=None):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+    
+    def acquire(self, blocking=True):
+        """Take the lock, returning False instead of waiting when blocking is False"""
+        if not self._thread_lock.acquire(blocking):
+            return False
+        if self._depth == 0:
+            try:
+                if not os.path.exists(CONFIG_DIR):
+                    os.makedirs(CONFIG_DIR)
+                f = open(self.path or LOCK_FILE, 'a')
+            except OSError:
+                self._thread_lock.release()
+                raise
+            if fcntl is not None:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    f.close()
+                    self._thread_lock.release()
+                    return False
+            self._file = f
+        self._depth += 1
+        return True
+    
+    def release(self):
+        """Release the lock, closing the lock file once the outermost holder is done"""
+        self._depth -= 1
+        if self._depth == 0:
+            self._file.close()  # Closing drops the flock
+            self._file = None
+        self._thread_lock.release()
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def new_task_id():
+    """Generate a random, stable task identifier"""
+    return os.urandom(8).hex()
+
+
+class Recurrence:
+    """Repeat rule of a task: every interval days, weeks or months, until a date or for count occurrences"""
+    
+    FREQUENCIES = ("daily", "weekly", "monthly")
+    
+    def __init__(self, freq, interval=1, until=None, count=None, exceptions=()):
+        if freq not in self.FREQUENCIES:
+            raise ValueError(f"Unknown recurrence frequency: {freq}")
+        if interval < 1 or (count is not None and count < 1):
+            raise ValueError("Recurrence interval and count must be positive")
+        self.freq = freq
+        self.interval = interval
+        self.until = until  # Last date an occurrence may fall on, inclusive
+        self.count = count  # Number of occurrences including the first, skipped ones count too
+        self.exceptions = frozenset(exceptions)  # Dates skipped without ending the series
+    
+    def _key(self):
+        """Get the fields that identify the rule"""
+        return (self.freq, self.interval, self.until, self.count, self.exceptions)
+    
+    def __eq__(self, other):
+        return isinstance(other, Recurrence) and self._key() == other._key()
+    
+    def __hash__(self):
+        return hash(self._key())
+    
+    def to_dict(self):
+        """Convert the rule to a dictionary for JSON serialization"""
+        return {
+            "freq": self.freq,
+            "interval": self.interval,
+            "until": self.until.isoformat() if self.until else None,
+            "count": self.count,
+            "exceptions": sorted(date.isoformat() for date in self.exceptions)
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Create a rule from a dictionary"""
+        return cls(
+            freq=data["freq"],
+            interval=int(data.get("interval", 1)),
+            until=datetime.date.fromisoformat(data["until"]) if data.get("until") else None,
+            count=int(data["count"]) if data.get("count") else None,
+            exceptions=[datetime.date.fromisoformat(date) for date in data.get("exceptions", ())]
+        )
+    
+    def describe(self):
+        """Get a short human readable form such as "every 2 weeks" """
+        unit = {"daily": "day", "weekly": "week", "monthly": "month"}[self.freq]
+        return f"every {unit}" if self.interval == 1 else f"every {self.interval} {unit}s"
+    
+    def occurrences(self, start_time, range_start, range_end):
+        """Lazily yield the start times of a series beginning at start_time that fall in [range_start, range_end)
+        
+        Daily and weekly series jump straight to the first slot in range, so the cost is
+        proportional to the range shown rather than the age of the series. Monthly slots
+        whose month lacks the start day (the 31st, February 29th) produce no occurrence.
+        """
+        if self.freq == "monthly":
+            months = (range_start.year - start_time.year) * 12 + range_start.month - start_time.month
+            # Skipped months would shift the count, so jumping ahead is only exact when every month has the day
+            exact = start_time.day <= 28 or self.count is None
+            slot = max(0, months // self.interval) if exact else 0
+        else:
+            step = datetime.timedelta(days=self.interval * (7 if self.freq == "weekly" else 1))
+            slot = max(0, -((start_time - range_start) // step))
+        number = slot  # Occurrences before this slot
+        
+        while self.count is None or number < self.count:
+            if self.freq == "monthly":
+                year, month = divmod(start_time.month - 1 + slot * self.interval, 12)
+                year += start_time.year
+                if datetime.datetime(year, month + 1, 1) >= range_end:
+                    return
+                slot += 1
+                try:
+                    occurrence = start_time.replace(year=year, month=month + 1)
+                except ValueError:
+                    continue
+                if occurrence >= range_end:
+                    return
+            else:
+                occurrence = start_time + slot * step
+                if occurrence >= range_end:
+                    return
+                slot += 1
+            number += 1
+            
+            if self.until is not None and occurrence.date() > self.until:
+                return
+            if occurrence >= range_start and occurrence.date() not in self.exceptions:
+                yield occurrence
+
+
 class Task:
     """Task object representing a scheduled task"""
     
-    def __init__(self, name, start_time, end_time=None, completed=False):
+    __slots__ = ("id", "name", "start_time", "end_time", "completed", "recurrence")
+    
+    def __init__(self, name, start_time, end_time=None, completed=False, task_id=None, recurrence=None):
+        self.id = task_id or new_task_id()
         self.name = name
         self.start_time = start_time
         self.end_time = end_time
         self.completed = completed
+        self.recurrence = recurrence  # Recurrence rule, start_time is then the first occurrence
         
     def to_dict(self):
         """Convert task to dictionary for JSON serialization"""
-        return {
+        data = {
+            "id": self.id,
             "name": self.name,
             "start_time": self.start_time.isoformat(),
             "end_time": self.end_time.isoformat() if self.end_time else None,
             "completed": self.completed
         }
+        if self.recurrence:
+            data["recurrence"] = self.recurrence.to_dict()
+        return data
     
     @classmethod
     def from_dict(cls, data):
@@ -85,253 +329,3290 @@ class Task:
         return cls(
             name=data["name"],
             start_time=datetime.datetime.fromisoformat(data["start_time"]),
-            end_time=datetime.datetime.fromisoformat(data["end_time"]) if data["end_time"] else None,
-            completed=data["completed"]
+            end_time=datetime.datetime.fromisoformat(data["end_time"]) if data.get("end_time") else None,
+            completed=bool(data.get("completed", False)),
+            task_id=data.get("id"),
+            recurrence=Recurrence.from_dict(data["recurrence"]) if data.get("recurrence") else None
         )
+    
+    def occurrence(self, start_time):
+        """Create the instance of a recurring task that starts at start_time"""
+        end_time = self.end_time + (start_time - self.start_time) if self.end_time else None
+        return Task(self.name, start_time, end_time, self.completed, task_id=self.id, recurrence=self.recurrence)
 
 
-class TaskManager:
-    """Manages task data and persistence"""
+def share_task_values(tasks):
+    """Point tasks with equal names or times at one string or datetime, returning tasks
     
-    def __init__(self):
-        self.tasks = []
-        self.load_tasks()
-        
-    def add_task(self, task):
-        """Add a new task and save"""
-        self.tasks.append(task)
-        self.sort_tasks()
-        self.save_tasks()
-        
-    def delete_task(self, task_index):
-        """Delete a task by index"""
-        if 0 <= task_index < len(self.tasks):
-            del self.tasks[task_index]
-            self.save_tasks()
-            return True
-        return False
+    Parsing gives every task its own copies, while a calendar repeats the same
+    names and round times many times over.
+    """
+    shared = {}
+    share = shared.setdefault
+    for task in tasks:
+        task.name = share(task.name, task.name)
+        task.start_time = share(task.start_time, task.start_time)
+        if task.end_time is not None:
+            task.end_time = share(task.end_time, task.end_time)
+    return tasks
+
+
+EPOCH = datetime.datetime(1970, 1, 1)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def epoch_us(when):
+    """Get a naive datetime as whole microseconds since EPOCH"""
+    return (when - EPOCH) // MICROSECOND
+
+
+def day_stats(tasks):
+    """Get a {date: (task count, completed count)} mapping of tasks in start time order
     
-    def toggle_task_completion(self, task_index):
-        """Toggle task completion status"""
-        if 0 <= task_index < len(self.tasks):
-            self.tasks[task_index].completed = not self.tasks[task_index].completed
-            self.save_tasks()
-            return True
-        return False
+    Each day is one run of tasks, so the date is only computed when a task
+    crosses the end of the current run.
+    """
+    stats = {}
+    day = day_end = None
+    count = completed = 0
+    for task in tasks:
+        if day_end is None or task.start_time >= day_end:
+            if count:
+                stats[day] = (count, completed)
+            day = task.start_time.date()
+            day_end = datetime.datetime.combine(day, datetime.time.min) + datetime.timedelta(days=1)
+            count = completed = 0
+        count += 1
+        completed += task.completed
+    if count:
+        stats[day] = (count, completed)
+    return stats
+
+
+def month_bounds(year, month):
+    """Get the [start, end) datetimes covering a month"""
+    return (datetime.datetime(year, month, 1),
+            datetime.datetime(year + month // 12, month % 12 + 1, 1))
+
+
+def month_key(when):
+    """Get the "YYYY-MM" key of the month a date or datetime falls in"""
+    return f"{when.year:04d}-{when.month:02d}"
+
+
+def archive_cutoff(today=None):
+    """Get the start of the oldest month whose completed tasks are kept out of the archive"""
+    today = today or datetime.date.today()
+    months = today.year * 12 + today.month - ARCHIVE_KEEP_MONTHS
+    return datetime.datetime(months // 12, months % 12 + 1, 1)
+
+
+def load_config():
+    """Load settings from config.json on top of the defaults"""
+    config = dict(DEFAULT_CONFIG)
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                config.update(json.load(f))
+        except (json.JSONDecodeError, OSError):
+            print("Error loading config, using defaults")
+    return config
+
+
+class SortedTaskList:
+    """Tasks in start time order, stored as a list of bounded chunks
     
-    def sort_tasks(self):
-        """Sort tasks by start time"""
-        self.tasks.sort(key=lambda x: x.start_time)
+    Inserting or removing a task bisects to one chunk and shifts at most
+    2 * CHUNK_SIZE entries, instead of shifting the whole list. Each chunk's
+    start times are kept as microseconds in an array, so the index costs
+    8 bytes per task rather than a key object.
+    """
     
-    def get_tasks_for_date(self, date):
-        """Get all tasks for a specific date"""
-        return [task for task in self.tasks if task.start_time.date() == date]
+    CHUNK_SIZE = 512
+    
+    def __init__(self, tasks=()):
+        self.reset(tasks)
+    
+    def reset(self, tasks, keys=None):
+        """Replace the contents with tasks, sorted stably by start time
         
-    def save_tasks(self):
-        """Save tasks to JSON file"""
-        if not os.path.exists(CONFIG_DIR):
-            os.makedirs(CONFIG_DIR)
-            
-        with open(DATA_FILE, 'w') as f:
-            json.dump([task.to_dict() for task in self.tasks], f)
+        Tasks already in order can be given with their epoch_us() start times
+        as keys, which skips sorting them.
+        """
+        if keys is None:
+            ordered = sorted(tasks, key=lambda x: x.start_time)
+            keys = array('q', [epoch_us(task.start_time) for task in ordered])
+        else:
+            ordered = list(tasks)
+        size = self.CHUNK_SIZE
+        self._chunks = [ordered[i:i + size] for i in range(0, len(ordered), size)]
+        self._chunk_keys = [keys[i:i + size] for i in range(0, len(keys), size)]
+        self._maxes = [chunk_keys[-1] for chunk_keys in self._chunk_keys]
+        self._len = len(ordered)
+        self._offsets = None
     
-    def load_tasks(self):
-        """Load tasks from JSON file"""
-        if os.path.exists(DATA_FILE):
-            try:
-                with open(DATA_FILE, 'r') as f:
-                    tasks_data = json.load(f)
-                    self.tasks = [Task.from_dict(task_data) for task_data in tasks_data]
-                    self.sort_tasks()
-            except (json.JSONDecodeError, KeyError):
-                self.tasks = []
-                print("Error loading tasks, starting with empty task list")
-
-
-class CalendarView:
-    """Calendar visualization component"""
+    def __len__(self):
+        return self._len
     
-    def __init__(self, window, task_manager):
-        self.window = window
-        self.task_manager = task_manager
-        self.current_date = datetime.date.today()
-        self.panel = panel.new_panel(window)
+    def __iter__(self):
+        for chunk in self._chunks:
+            yield from chunk
+    
+    def start_keys(self):
+        """Get the epoch_us() start times of all tasks in order, as reset() takes them"""
+        keys = array('q')
+        for chunk_keys in self._chunk_keys:
+            keys.extend(chunk_keys)
+        return keys
+    
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("task index out of range")
+        chunk, i = self._locate(index)
+        return self._chunks[chunk][i]
+    
+    def _chunk_offsets(self):
+        """Get the position of the first task of each chunk, rebuilt lazily after changes"""
+        if self._offsets is None:
+            offsets = []
+            total = 0
+            for chunk in self._chunks:
+                offsets.append(total)
+                total += len(chunk)
+            self._offsets = offsets
+        return self._offsets
+    
+    def _locate(self, index):
+        """Map a position to (chunk number, index within the chunk)"""
+        offsets = self._chunk_offsets()
+        chunk = bisect.bisect_right(offsets, index) - 1
+        return chunk, index - offsets[chunk]
+    
+    def slice(self, start, stop):
+        """Get the tasks at positions [start, stop)"""
+        start, stop = max(start, 0), min(stop, self._len)
+        result = []
+        if start >= stop:
+            return result
+        chunk, i = self._locate(start)
+        while len(result) < stop - start:
+            result.extend(self._chunks[chunk][i:i + stop - start - len(result)])
+            chunk, i = chunk + 1, 0
+        return result
+    
+    def add(self, task):
+        """Insert a task after any tasks with the same start time"""
+        key = epoch_us(task.start_time)
+        self._len += 1
+        self._offsets = None
         
-    def draw(self):
-        """Draw the calendar view"""
-        self.window.clear()
-        height, width = self.window.getmaxyx()
+        if not self._chunks:
+            self._chunks.append([task])
+            self._chunk_keys.append(array('q', [key]))
+            self._maxes.append(key)
+            return
         
-        # Draw calendar header
-        month_year = self.current_date.strftime("%B %Y")
-        self.window.addstr(1, (width - len(month_year)) // 2, month_year, curses.A_BOLD)
+        chunk = min(bisect.bisect_right(self._maxes, key), len(self._chunks) - 1)
+        keys = self._chunk_keys[chunk]
+        i = bisect.bisect_right(keys, key)
+        keys.insert(i, key)
+        self._chunks[chunk].insert(i, task)
+        self._maxes[chunk] = keys[-1]
         
-        # Draw weekday headers
-        weekdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        day_width = width // 7
+        # Split chunks that grew too large so shifts stay bounded
+        if len(keys) > 2 * self.CHUNK_SIZE:
+            half = len(keys) // 2
+            self._chunks[chunk + 1:chunk + 1] = [self._chunks[chunk][half:]]
+            self._chunk_keys[chunk + 1:chunk + 1] = [keys[half:]]
+            del self._chunks[chunk][half:]
+            del keys[half:]
+            self._maxes[chunk:chunk + 1] = [keys[-1], self._chunk_keys[chunk + 1][-1]]
+    
+    def _find(self, task):
+        """Get (chunk number, index within the chunk) of a stored task"""
+        key = epoch_us(task.start_time)
+        chunk = bisect.bisect_left(self._maxes, key)
+        i = bisect.bisect_left(self._chunk_keys[chunk], key) if chunk < len(self._chunks) else 0
+        # Tasks starting at the same time are told apart by identity
+        while chunk < len(self._chunks):
+            tasks, keys = self._chunks[chunk], self._chunk_keys[chunk]
+            for i in range(i, len(tasks)):
+                if tasks[i] is task:
+                    return chunk, i
+                if keys[i] != key:
+                    raise ValueError("task is not stored")
+            chunk, i = chunk + 1, 0
+        raise ValueError("task is not stored")
+    
+    def remove(self, task):
+        """Remove a stored task"""
+        chunk, i = self._find(task)
+        del self._chunks[chunk][i]
+        keys = self._chunk_keys[chunk]
+        del keys[i]
+        if keys:
+            self._maxes[chunk] = keys[-1]
+        else:
+            del self._chunks[chunk]
+            del self._chunk_keys[chunk]
+            del self._maxes[chunk]
+        self._len -= 1
+        self._offsets = None
+    
+    def index(self, task):
+        """Get the position of a stored task"""
+        chunk, i = self._find(task)
+        return self._chunk_offsets()[chunk] + i
+    
+    def bisect_left(self, start_time):
+        """Get the position of the first task starting at or after start_time"""
+        key = epoch_us(start_time)
+        chunk = bisect.bisect_left(self._maxes, key)
+        if chunk == len(self._chunks):
+            return self._len
+        return self._chunk_offsets()[chunk] + bisect.bisect_left(self._chunk_keys[chunk], key)
+
+
+class TaskBackend:
+    """Storage interface behind TaskManager, tasks are addressed by start time order"""
+    
+    def open(self):
+        """Prepare storage for writes without loading tasks"""
+    
+    def load_tasks(self):
+        """Load tasks from storage"""
+        raise NotImplementedError
+    
+    def load_range(self, start, end):
+        """Load at least the tasks starting in [start, end) and every recurring task, for commands that only read
         
-        for i, day in enumerate(weekdays):
-            x = i * day_width + (day_width - len(day)) // 2
-            self.window.addstr(3, x, day)
+        start or end may be None to leave that side of the range open.
+        """
+        self.load_tasks()
+    
+    def save_tasks(self):
+        """Persist any pending changes"""
+        raise NotImplementedError
+    
+    def close(self):
+        """Flush and release storage resources"""
+        raise NotImplementedError
+    
+    def start_write_behind(self):
+        """Move persistence to a background thread where supported"""
+    
+    def save_status(self):
+        """Get "saved", "saving" or "save failed" """
+        return "saved"
+    
+    def reload_changes(self):
+        """Pick up changes other processes made to storage, returning whether anything changed"""
+        return False
+    
+    def count(self):
+        """Get the number of stored tasks"""
+        raise NotImplementedError
+    
+    def get_tasks_page(self, offset, limit):
+        """Get up to limit tasks in start time order beginning at offset"""
+        raise NotImplementedError
+    
+    def get_tasks_from(self, start, end, limit, after=None):
+        """Get up to limit tasks starting before end (if given) in start time order, right after the task with id after
         
-        # Calculate first day of month and number of days
-        first_day = datetime.date(self.current_date.year, self.current_date.month, 1)
-        last_day = (datetime.date(self.current_date.year, self.current_date.month % 12 + 1, 1) 
-                    if self.current_date.month < 12 
-                    else datetime.date(self.current_date.year + 1, 1, 1)) - datetime.timedelta(days=1)
+        Without after, or once that task is gone, the page begins at the first
+        task starting at or after start (any time if None).
+        """
+        index = self.index_of(after) if after is not None else None
+        if index is not None:
+            offset = index + 1
+        else:
+            offset = self.count_before(start) if start is not None else 0
+        if end is not None:
+            limit = min(limit, self.count_before(end) - offset)
+        return self.get_tasks_page(offset, limit) if limit > 0 else []
+    
+    def get_tasks_between(self, start, end):
+        """Get all tasks starting in [start, end)"""
+        raise NotImplementedError
+    
+    def get_task(self, task_id):
+        """Get a task by id, or None"""
+        raise NotImplementedError
+    
+    def index_of(self, task_id):
+        """Get the start time order position of a task by id, or None"""
+        raise NotImplementedError
+    
+    def count_before(self, start):
+        """Get the number of tasks starting before start, i.e. the index of the first task at or after it"""
+        raise NotImplementedError
+    
+    def get_month_counts(self, year, month):
+        """Get a {day: task count} mapping for a whole month"""
+        counts = {}
+        for task in self.get_tasks_between(*month_bounds(year, month)):
+            day = task.start_time.day
+            counts[day] = counts.get(day, 0) + 1
+        return counts
+    
+    def get_day_stats(self, start, end):
+        """Get a {date: (task count, completed count)} mapping for tasks starting in [start, end)"""
+        return day_stats(self.get_tasks_between(start, end))
+    
+    def get_recurring_tasks(self):
+        """Get every task that has a recurrence rule"""
+        raise NotImplementedError
+    
+    def page_in(self, start=None, end=None):
+        """Load archived tasks of the months overlapping [start, end), or of every month, returning how many were added"""
+        return 0
+    
+    def add_task(self, task):
+        """Add a new task"""
+        raise NotImplementedError
+    
+    def add_tasks(self, tasks, on_added=None):
+        """Add many tasks at once, returning how many were added
         
-        # Calculate offset (0 = Monday, 6 = Sunday)
-        offset = first_day.weekday()
+        Tasks whose id is taken get a new one. on_added, if given, is called
+        with each batch of added tasks once their ids are final.
+        """
+        added = 0
+        for task in tasks:
+            self.add_task(task)
+            if on_added:
+                on_added([task])
+            added += 1
+        return added
+    
+    def delete_task(self, task_id):
+        """Delete a task by id, returning whether it existed"""
+        raise NotImplementedError
+    
+    def toggle_task_completion(self, task_id):
+        """Toggle task completion status, returning whether the task existed"""
+        raise NotImplementedError
+
+
+class WriteBehindSaver(threading.Thread):
+    """Background thread that coalesces bursts of changes and persists them off the UI thread"""
+    
+    def __init__(self, flush, delay=WRITE_BEHIND_DELAY):
+        super().__init__(name="chroncli-saver", daemon=True)
+        self.flush = flush
+        self.delay = delay
+        self.saving = False
+        self.error = None
+        self._dirty = threading.Event()
+        self._stopping = threading.Event()
+    
+    def mark_dirty(self):
+        """Schedule a save"""
+        self._dirty.set()
+    
+    def run(self):
+        while True:
+            self._dirty.wait()
+            # Let a burst of changes pile up so they are written together
+            if self._stopping.wait(self.delay):
+                return  # stop() flushes on the caller's thread
+            self._dirty.clear()
+            self.saving = True
+            try:
+                self.flush()
+                self.error = None
+            except OSError as e:
+                self.error = str(e)
+                self._dirty.set()  # Retry after the next delay
+            finally:
+                self.saving = False
+    
+    def stop(self):
+        """Stop the thread; the caller flushes whatever is still pending"""
+        self._stopping.set()
+        self._dirty.set()
+        self.join()
+
+
+class TaskArchive:
+    """Completed tasks of past months, one gzipped JSON segment per month
+    
+    A manifest of per-day task counts lets the calendar show archived months
+    without reading their segments.
+    """
+    
+    def __init__(self):
+        self.manifest = {}  # "YYYY-MM" -> {day: task count}
+        self._manifest_state = None  # Stat signature of the manifest when it was read
+    
+    def _segment_path(self, key):
+        """Get the segment file of a month"""
+        return os.path.join(ARCHIVE_DIR, f"{key}.json.gz")
+    
+    def _manifest_path(self):
+        """Get the manifest file, kept next to the segments"""
+        return os.path.join(ARCHIVE_DIR, "manifest.json")
+    
+    def stat(self):
+        """Get a cheap signature of the manifest that changes whenever it is written"""
+        try:
+            stat = os.stat(self._manifest_path())
+            return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            return None
+    
+    def refresh(self):
+        """Reread the manifest if another instance changed it, returning whether it changed"""
+        state = self.stat()
+        if state == self._manifest_state:
+            return False
+        manifest = {}
+        if state is not None:
+            try:
+                with open(self._manifest_path(), 'r') as f:
+                    manifest = {key: {int(day): count for day, count in days.items()}
+                                for key, days in json.load(f).items()}
+            except (json.JSONDecodeError, OSError, AttributeError, ValueError):
+                print("Error loading archive manifest, archived months are hidden")
+        changed = manifest != self.manifest
+        self.manifest = manifest
+        self._manifest_state = state
+        return changed
+    
+    def months(self):
+        """Get the keys of the archived months, oldest first"""
+        return sorted(self.manifest)
+    
+    def day_counts(self, key):
+        """Get the {day: task count} mapping of an archived month"""
+        return self.manifest.get(key, {})
+    
+    def read(self, key):
+        """Read the tasks of an archived month"""
+        return share_task_values([Task.from_dict(task_data) for task_data in self._read_segment(key)])
+    
+    def _read_segment(self, key):
+        """Read the task dicts of an archived month, empty if it has no segment"""
+        try:
+            with gzip.open(self._segment_path(key), 'rt') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+    
+    def update(self, key, add=(), drop=()):
+        """Add tasks to a month's segment and drop ids from it, the caller holds the file lock
         
-        # Draw days
-        day = 1
-        for week in range(6):  # Max 6 weeks in a month
-            for weekday in range(7):
-                x = weekday * day_width + 2
-                y = week * 3 + 5
-                
-                if (week == 0 and weekday < offset) or day > last_day.day:
-                    # Empty cell
-                    pass
-                else:
-                    # Draw day number
-                    day_str = str(day)
-                    if day == self.current_date.day and self.current_date.month == datetime.date.today().month:
-                        self.window.addstr(y, x, day_str, curses.A_REVERSE)
-                    else:
-                        self.window.addstr(y, x, day_str)
-                    
-                    # Check for tasks on this day
-                    day_date = datetime.date(self.current_date.year, self.current_date.month, day)
-                    day_tasks = self.task_manager.get_tasks_for_date(day_date)
-                    
-                    if day_tasks:
-                        task_indicator = f"[{len(day_tasks)}]"
-                        self.window.addstr(y, x + len(day_str) + 1, task_indicator, 
-                                          curses.A_BOLD if len(day_tasks) > 0 else 0)
-                    
-                    day += 1
+        Call save_manifest() once the months being changed are all updated.
+        """
+        by_id = {task_data["id"]: task_data for task_data in self._read_segment(key)}
+        for task_id in drop:
+            by_id.pop(task_id, None)
+        for task in add:
+            by_id[task.id] = task.to_dict()
         
-        # Draw navigation instructions
-        nav_text = "< Prev [p] | Next [n] >"
-        self.window.addstr(height - 2, (width - len(nav_text)) // 2, nav_text)
+        if not os.path.exists(ARCHIVE_DIR):
+            os.makedirs(ARCHIVE_DIR)
+        if by_id:
+            data = gzip.compress(json.dumps(list(by_id.values())).encode())
+            write_atomic(self._segment_path(key), lambda f: f.write(data), 'wb')
+        elif os.path.exists(self._segment_path(key)):
+            os.remove(self._segment_path(key))
         
-        self.window.box()
-        self.window.refresh()
-    
-    def next_month(self):
-        """Move to next month"""
-        if self.current_date.month == 12:
-            self.current_date = datetime.date(self.current_date.year + 1, 1, self.current_date.day)
+        counts = {}
+        for task_data in by_id.values():
+            day = int(task_data["start_time"][8:10])
+            counts[day] = counts.get(day, 0) + 1
+        if counts:
+            self.manifest[key] = counts
         else:
-            self.current_date = datetime.date(self.current_date.year, self.current_date.month + 1, 
-                                             min(self.current_date.day, 
-                                                 self._days_in_month(self.current_date.year, self.current_date.month + 1)))
-        self.draw()
+            self.manifest.pop(key, None)
     
-    def prev_month(self):
-        """Move to previous month"""
-        if self.current_date.month == 1:
-            self.current_date = datetime.date(self.current_date.year - 1, 12, self.current_date.day)
-        else:
-            self.current_date = datetime.date(self.current_date.year, self.current_date.month - 1, 
-                                             min(self.current_date.day, 
-                                                 self._days_in_month(self.current_date.year, self.current_date.month - 1)))
-        self.draw()
+    def save_manifest(self):
+        """Write the manifest after segments were updated"""
+        write_atomic(self._manifest_path(), lambda f: json.dump(self.manifest, f))
+        self._manifest_state = self.stat()
+
+
+# Binary snapshot layout, all little-endian:
+#   header   magic, format version, file flags, task count, distinct name count and the byte sizes
+#            of the three text blocks
+#   columns  start and end times as int64 microseconds since EPOCH, one flag byte per task,
+#            uint32 name table positions, uint32 lengths of the distinct names, then uint32 id
+#            lengths unless the ids are raw
+#   blocks   the distinct names in UTF-8, ids (8 raw bytes each, or UTF-8), and the JSON list of
+#            recurrence rules
+# Every column is fixed width, so it is read with one array.frombytes() instead of per-record parsing.
+BINARY_MAGIC = b"CHRNTASK"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<8sHHQQQQQ")
+BINARY_RAW_IDS = 1  # File flag: every id is 16 lowercase hex digits, stored as 8 bytes
+TASK_COMPLETED = 1
+TASK_HAS_END = 2
+TASK_RECURRING = 4
+RECURRING_MARKS = bytes(1 if flag & TASK_RECURRING else 0 for flag in range(256))  # Flag byte -> 1 if recurring
+
+
+def _pack_column(typecode, values):
+    """Pack integers as a little-endian column"""
+    column = array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def encode_binary_snapshot(tasks):
+    """Pack tasks into the binary snapshot format, see decode_binary_snapshot()"""
+    name_table = {}  # Repeated names are stored once, tasks refer to them by position
+    name_positions = [name_table.setdefault(task.name, len(name_table)) for task in tasks]
+    ids = "".join(task.id for task in tasks)
+    raw_ids = all(len(task.id) == 16 for task in tasks)
+    if raw_ids:
+        try:
+            id_data = bytes.fromhex(ids)
+            raw_ids = id_data.hex() == ids
+        except ValueError:
+            raw_ids = False
+    if not raw_ids:
+        id_data = ids.encode("utf-8", "surrogatepass")
+    name_data = "".join(name_table).encode("utf-8", "surrogatepass")
+    rule_data = json.dumps([task.recurrence.to_dict() for task in tasks if task.recurrence]).encode()
+
+    parts = [
+        BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, BINARY_RAW_IDS if raw_ids else 0, len(tasks),
+                           len(name_table), len(name_data), len(id_data), len(rule_data)),
+        _pack_column('q', [epoch_us(task.start_time) for task in tasks]),
+        _pack_column('q', [epoch_us(task.end_time) if task.end_time else 0 for task in tasks]),
+        bytes([(TASK_COMPLETED if task.completed else 0) | (TASK_HAS_END if task.end_time else 0)
+               | (TASK_RECURRING if task.recurrence else 0) for task in tasks]),
+        _pack_column('I', name_positions),
+        _pack_column('I', map(len, name_table)),
+    ]
+    if not raw_ids:
+        parts.append(_pack_column('I', [len(task.id) for task in tasks]))
+    parts += [name_data, id_data, rule_data]
+    return b"".join(parts)
+
+
+def _epoch_datetimes(micros):
+    """Convert microseconds since EPOCH to datetimes, building one object per distinct value"""
+    # Tasks cluster on round times, so this builds far fewer datetimes than there are tasks
+    cache = {value: EPOCH + datetime.timedelta(microseconds=value) for value in set(micros)}
+    return list(map(cache.__getitem__, micros))
+
+
+def _split_text(text, lengths):
+    """Cut a decoded text block into consecutive strings of the given lengths"""
+    ends = list(itertools.accumulate(lengths))
+    return list(map(text.__getitem__, map(slice, itertools.chain((0,), ends), ends)))
+
+
+def decode_binary_snapshot(data, start=None, end=None):
+    """Unpack tasks from the bytes of a binary snapshot, raising ValueError if they are not one
     
-    def _days_in_month(self, year, month):
-        """Helper method to get the number of days in a month"""
-        if month == 12:
-            return 31
-        return (datetime.date(year, month + 1, 1) - datetime.timedelta(days=1)).day
+    Given start or end, only the tasks starting in [start, end) and the recurring
+    ones are built, found by bisecting the start column.
+    """
+    view = memoryview(data)
+    if len(view) < BINARY_HEADER.size:
+        raise ValueError("Truncated task snapshot")
+    magic, version, file_flags, count, name_count, name_size, id_size, rule_size = BINARY_HEADER.unpack_from(view)
+    if magic != BINARY_MAGIC:
+        raise ValueError("Not a binary task snapshot")
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary task snapshot version {version}")
+    raw_ids = file_flags & BINARY_RAW_IDS
+    expected = (BINARY_HEADER.size + count * (8 + 8 + 1 + 4 + (0 if raw_ids else 4)) + name_count * 4
+                + name_size + id_size + rule_size)
+    if len(view) != expected:
+        raise ValueError("Truncated task snapshot")
 
+    offset = BINARY_HEADER.size
 
-class TaskListView:
-    """Task list and task entry component"""
+    def take(size):
+        nonlocal offset
+        offset += size
+        return view[offset - size:offset]
+
+    def column(typecode, length=count):
+        values = array(typecode)
+        values.frombytes(take(values.itemsize * length))
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    start_keys = column('q')
+    end_keys = column('q')
+    flags = bytes(take(count))
+    name_positions = column('I')
+    name_lengths = column('I', name_count)
+    id_lengths = None if raw_ids else column('I')
     
-    def __init__(self, window, task_manager):
-        self.window = window
-        self.task_manager = task_manager
-        self.panel = panel.new_panel(window)
-        self.selected_index = 0
-        self.offset = 0  # For scrolling
-        self.mode = "list"  # "list" or "entry"
+    picked = None
+    if start is not None or end is not None:
+        first = 0 if start is None else bisect.bisect_left(start_keys, epoch_us(start))
+        last = count if end is None else bisect.bisect_left(start_keys, epoch_us(end))
+        recurring = (match.start() for match in re.finditer(b"\x01", flags.translate(RECURRING_MARKS)))
+        picked = sorted(set(recurring).union(range(first, last)))
+        start_keys = [start_keys[i] for i in picked]
+        end_keys = [end_keys[i] for i in picked]
+        flags = bytes(flags[i] for i in picked)
+        name_positions = [name_positions[i] for i in picked]
+    
+    starts = _epoch_datetimes(start_keys)
+    ends = _epoch_datetimes(end_keys)
+    name_text = str(take(name_size), "utf-8", "surrogatepass")
+    try:
+        if picked is None:
+            names = list(map(_split_text(name_text, name_lengths).__getitem__, name_positions))
+        else:
+            # Cutting out only the names of the picked tasks skips building the whole table
+            name_ends = list(itertools.accumulate(name_lengths))
+            names = [name_text[name_ends[position] - name_lengths[position]:name_ends[position]]
+                     for position in name_positions]
+    except IndexError:
+        raise ValueError("Task name outside the name table") from None
+    if raw_ids and picked is not None:
+        id_data = take(id_size)
+        ids = [id_data[i * 8:i * 8 + 8].hex() for i in picked]
+    elif raw_ids:
+        ids = _split_text(take(id_size).hex(), itertools.repeat(16, count))
+    else:
+        ids = _split_text(str(take(id_size), "utf-8", "surrogatepass"), id_lengths)
+        if picked is not None:
+            ids = [ids[i] for i in picked]
+    rules = json.loads(str(take(rule_size), "utf-8"))
+
+    ends = [end if flag & TASK_HAS_END else None for end, flag in zip(ends, flags)]
+    completed = [flag & TASK_COMPLETED == TASK_COMPLETED for flag in flags]
+    tasks = list(map(Task, names, starts, ends, completed, ids))
+    recurring = [task for task, flag in zip(tasks, flags) if flag & TASK_RECURRING]
+    if len(recurring) != len(rules):
+        raise ValueError("Recurrence rules do not match the tasks")
+    for task, rule in zip(recurring, rules):
+        task.recurrence = Recurrence.from_dict(rule)
+    return tasks
+
+
+# Index cache layout: a header naming the snapshot it was derived from by mtime, size and
+# content hash, the sorted start times of the snapshot's tasks as an int64 column in file
+# order, then the JSON {"YYYY-MM-DD": [task count, completed count]} of those tasks
+INDEX_CACHE_MAGIC = b"CHRNIDX\0"
+INDEX_CACHE_VERSION = 1
+INDEX_CACHE_HEADER = struct.Struct("<8sHqQ16sQ")
+
+
+def file_digest(path):
+    """Hash the contents of a file"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def write_index_cache(snapshot_path, keys, stats):
+    """Save the start time keys and day statistics derived from a snapshot that was just written"""
+    stat = os.stat(snapshot_path)
+    header = INDEX_CACHE_HEADER.pack(INDEX_CACHE_MAGIC, INDEX_CACHE_VERSION, stat.st_mtime_ns, stat.st_size,
+                                     file_digest(snapshot_path), len(keys))
+    stats_data = json.dumps({day.isoformat(): day_stats for day, day_stats in stats.items()}).encode()
+    data = header + _pack_column('q', keys) + stats_data
+    write_atomic(INDEX_CACHE_FILE, lambda f: f.write(data), 'wb')
+
+
+def read_index_cache(snapshot_path, count):
+    """Get (start time keys, day statistics) cached for a snapshot of count tasks, or None if stale"""
+    try:
+        with open(INDEX_CACHE_FILE, 'rb') as f:
+            data = f.read()
+        stat = os.stat(snapshot_path)
+    except FileNotFoundError:
+        return None
+    if len(data) < INDEX_CACHE_HEADER.size:
+        return None
+    magic, version, mtime_ns, size, digest, cached_count = INDEX_CACHE_HEADER.unpack_from(data)
+    if (magic, version, mtime_ns, size, cached_count) != (INDEX_CACHE_MAGIC, INDEX_CACHE_VERSION,
+                                                          stat.st_mtime_ns, stat.st_size, count):
+        return None
+    # A snapshot rewritten within the mtime granularity keeps its size and mtime, never its hash
+    if digest != file_digest(snapshot_path):
+        return None
+
+    offset = INDEX_CACHE_HEADER.size + 8 * count
+    keys = array('q')
+    keys.frombytes(data[INDEX_CACHE_HEADER.size:offset])
+    if sys.byteorder == "big":
+        keys.byteswap()
+    try:
+        stats = {datetime.date.fromisoformat(day): tuple(day_stats)
+                 for day, day_stats in json.loads(data[offset:]).items()}
+    except (ValueError, AttributeError, TypeError):
+        return None
+    return (keys, stats) if len(keys) == count else None
+
+
+class JsonBackend(TaskBackend):
+    """Tasks held in a sorted in-memory container, persisted as a JSON snapshot plus journal"""
+    
+    def __init__(self):
+        self.tasks = SortedTaskList()
+        self.by_id = {}
+        self.recurring = {}  # id -> task for tasks with a recurrence rule
+        self._journal = None
+        self._journal_records = 0
+        self._changed = False  # Whether this instance wrote any record, closing only compacts then
+        self._lost_at = None  # time.monotonic() when a change was dropped because its task was deleted elsewhere
+        self.loaded = False  # Unloaded backends only append to the journal and never compact
+        self._lock = threading.RLock()  # Guards tasks and pending records against the saver thread
+        self._io_lock = FileLock()  # Serializes journal and snapshot access across threads and processes
+        self._pending = []  # Journal lines waiting for the write-behind saver
+        self._pending_deletes = {}  # id -> task deleted by one of those lines, for finding its month when merging
+        self._saver = None
+        self._writer = new_task_id()  # Tags our journal records so catching up skips them
+        self._base = None  # Journal header of the snapshot the in-memory tasks were built from
+        self._journal_offset = 0  # Bytes of the journal already applied
+        self._disk_state = None  # (journal, snapshot, manifest) stat signature when the files were last read
+        self.archive = TaskArchive()
+        self.archived_ids = set()  # Tasks in memory that live in an archive segment instead of the snapshot
+        self._paged_months = set()  # Archived months whose segments are loaded into memory
+        self._archive_dropped = {}  # Month -> ids to drop from its segment at the next snapshot
+        self._cached_stats = None  # Day statistics of the snapshot from the index cache, dropped by any change
+    
+    def count(self):
+        """Get the number of stored tasks"""
+        return len(self.tasks)
+    
+    def get_tasks_page(self, offset, limit):
+        """Get up to limit tasks in start time order beginning at offset"""
+        return self.tasks.slice(offset, offset + limit)
+    
+    def get_task(self, task_id):
+        """Get a task by id, or None"""
+        return self.by_id.get(task_id)
+    
+    def index_of(self, task_id):
+        """Get the start time order position of a task by id, or None"""
+        task = self.by_id.get(task_id)
+        return self.tasks.index(task) if task else None
         
-        # Task entry fields
-        self.task_name = ""
-        self.task_date = datetime.date.today().strftime("%Y-%m-%d")
-        self.task_time = datetime.datetime.now().strftime("%H:%M")
-        self.end_time = ""
-        self.entry_field = 0  # 0: name, 1: date, 2: time, 3: end time
+    def add_task(self, task):
+        """Add a new task in sorted position and journal it"""
+        with self._lock:
+            self._insert_task(task)
+            self._append_journal({"op": "add", "task": task.to_dict()})
         
-    def draw(self):
-        """Draw the task list view"""
-        self.window.clear()
-        height, width = self.window.getmaxyx()
+    def add_tasks(self, tasks, on_added=None):
+        """Add many tasks with a single merge and a single snapshot write"""
+        if not self.loaded:
+            self.load_tasks()
+        batch = list(tasks)
+        if batch:
+            with self._lock:
+                for task in batch:
+                    if task.id in self.by_id:
+                        task.id = new_task_id()
+                    self.by_id[task.id] = task
+                    if task.recurrence:
+                        self.recurring[task.id] = task
+                # The existing run is already sorted, so Timsort only has to merge the batch in
+                self.tasks.reset(list(self.tasks) + batch)
+                self._cached_stats = None
+            self.save_tasks()
+            if on_added:
+                on_added(batch)
+        return len(batch)
+    
+    def delete_task(self, task_id):
+        """Delete a task by id"""
+        with self._lock:
+            task = self.by_id.get(task_id)
+            if task is None:
+                return False
+            record = self._thaw(task, {"op": "delete", "id": task_id})
+            self._remove_task(task)
+            if self._saver is not None:
+                self._pending_deletes[task_id] = task
+            self._append_journal(record)
+        return True
+    
+    def toggle_task_completion(self, task_id):
+        """Toggle task completion status"""
+        with self._lock:
+            task = self.by_id.get(task_id)
+            if task is None:
+                return False
+            task.completed = not task.completed
+            self._cached_stats = None
+            # The resulting state rather than a flip, so replaying the record twice changes nothing
+            self._append_journal(self._thaw(task, {"op": "toggle", "id": task_id, "completed": task.completed}))
+        return True
+    
+    def _thaw(self, task, record):
+        """Move an archived task back to the snapshot before it changes, noting its month in record
         
-        # Draw header
-        header = "Task List"
-        self.window.addstr(1, (width - len(header)) // 2, header, curses.A_BOLD)
+        Instances replaying the record page that month in first, so the task is
+        found wherever it lives.
+        """
+        if task.id in self.archived_ids:
+            key = month_key(task.start_time)
+            self.archived_ids.discard(task.id)
+            self._archive_dropped.setdefault(key, set()).add(task.id)
+            record["archived"] = key
+        return record
+    
+    def _insert_task(self, task):
+        """Insert a task keeping tasks sorted by start time"""
+        self.tasks.add(task)
+        self._cached_stats = None
+        self.by_id[task.id] = task
+        if task.recurrence:
+            self.recurring[task.id] = task
+    
+    def _remove_task(self, task):
+        """Remove a stored task"""
+        self.tasks.remove(task)
+        self._cached_stats = None
+        del self.by_id[task.id]
+        self.recurring.pop(task.id, None)
+        self.archived_ids.discard(task.id)
+    
+    def _set_tasks(self, tasks, keys=None, stats=None):
+        """Replace all tasks, giving fresh ids to duplicates; returns whether any id changed
+        
+        Tasks already in start time order can come with their keys and day
+        statistics from the index cache.
+        """
+        self.by_id = {}
+        self.recurring = {}
+        changed = False
+        for task in tasks:
+            if task.id in self.by_id:
+                task.id = new_task_id()
+                changed = True
+            self.by_id[task.id] = task
+            if task.recurrence:
+                self.recurring[task.id] = task
+        self.tasks.reset(tasks, keys)
+        self._cached_stats = stats
+        return changed
+    
+    def get_recurring_tasks(self):
+        """Get every task that has a recurrence rule"""
+        return list(self.recurring.values())
+    
+    def get_tasks_between(self, start, end):
+        """Get all tasks starting in [start, end)"""
+        return self.tasks.slice(self.tasks.bisect_left(start), self.tasks.bisect_left(end))
+    
+    def count_before(self, start):
+        """Get the number of tasks starting before start"""
+        return self.tasks.bisect_left(start)
+    
+    def get_month_counts(self, year, month):
+        """Get a {day: task count} mapping for a whole month in one pass, archived tasks included"""
+        counts = {}
+        for task in self.get_tasks_between(*month_bounds(year, month)):
+            day = task.start_time.day
+            counts[day] = counts.get(day, 0) + 1
+        key = month_key(datetime.date(year, month, 1))
+        if key not in self._paged_months:
+            for day, count in self.archive.day_counts(key).items():
+                counts[day] = counts.get(day, 0) + count
+        return counts
+    
+    def get_day_stats(self, start, end):
+        """Get a {date: (task count, completed count)} mapping in one pass, archived tasks included"""
+        cached = self._cached_stats
+        if cached is not None and start.time() == end.time() == datetime.time.min:
+            # Whole days of a snapshot nothing has changed since loading
+            stats = {}
+            day = start.date()
+            while day < end.date():
+                if day in cached:
+                    stats[day] = cached[day]
+                day += datetime.timedelta(days=1)
+        else:
+            stats = super().get_day_stats(start, end)
+        # Only completed tasks are archived, so the manifest counts are completed counts too
+        for key in self.archive.months():
+            if key in self._paged_months:
+                continue
+            year, month = int(key[:4]), int(key[5:])
+            for day, archived in self.archive.day_counts(key).items():
+                date = datetime.date(year, month, day)
+                if start <= datetime.datetime(year, month, day) < end:
+                    count, completed = stats.get(date, (0, 0))
+                    stats[date] = (count + archived, completed + archived)
+        return stats
+    
+    def page_in(self, start=None, end=None):
+        """Load archived tasks of the months overlapping [start, end), or of every month, returning how many were added"""
+        added = 0
+        with self._lock:
+            for key in self.archive.months():
+                if key in self._paged_months:
+                    continue
+                month_start, month_end = month_bounds(int(key[:4]), int(key[5:]))
+                if (start is None or month_end > start) and (end is None or month_start < end):
+                    added += self._page_in_month(key)
+        return added
+    
+    def _page_in_month(self, key):
+        """Insert the tasks of an archived month, returning how many were added"""
+        self._paged_months.add(key)
+        self._cached_stats = None
+        dropped = self._archive_dropped.get(key, ())
+        # Tasks already in memory were thawed, or archived by a snapshot that was never renamed into place
+        batch = [task for task in self.archive.read(key) if task.id not in self.by_id and task.id not in dropped]
+        for task in batch:
+            self.by_id[task.id] = task
+            self.archived_ids.add(task.id)
+        if len(batch) < SortedTaskList.CHUNK_SIZE:
+            for task in batch:
+                self.tasks.add(task)
+        elif batch:
+            self.tasks.reset(list(self.tasks) + batch)
+        return len(batch)
+        
+    def save_tasks(self):
+        """Write a full snapshot of tasks to JSON file and start a fresh journal"""
+        with self._io_lock:
+            # Merge whatever other instances wrote first, the snapshot replaces their journal
+            if self.loaded:
+                self._sync()
+            self._write_snapshot()
+    
+    def _write_snapshot(self):
+        """Write the in-memory tasks as the new snapshot, the caller holds the file lock"""
+        with self._io_lock:
+            if not os.path.exists(CONFIG_DIR):
+                os.makedirs(CONFIG_DIR)
+            
+            # Pending journal records are covered by the snapshot taken under the same lock
+            with self._lock:
+                stored = [task for task in self.tasks if task.id not in self.archived_ids]
+                snapshot = self._encode_snapshot(stored)
+                if len(stored) == len(self.tasks):
+                    keys = self.tasks.start_keys()
+                else:
+                    keys = array('q', [epoch_us(task.start_time) for task in stored])
+                dropped, self._archive_dropped = self._archive_dropped, {}
+                self._pending = []
+                self._pending_deletes = {}
+            
+            self._close_journal()
+            self._write_snapshot_file(snapshot)
+            # Tasks toggled since the snapshot was taken make these statistics newer than it,
+            # but their journal records also stop a later load from using them
+            write_index_cache(self._snapshot_path(), keys, day_stats(stored))
+            # The new journal is keyed to the new snapshot, so a crash between the two
+            # renames leaves a stale journal that load_tasks ignores instead of replaying twice
+            self._start_journal()
+            self._base = self._journal_base()
+            self._journal_offset = os.path.getsize(JOURNAL_FILE)
+            
+            # Thawed tasks are in the snapshot now, so a crash before this only leaves
+            # duplicates that paging in skips
+            if dropped:
+                for key, ids in dropped.items():
+                    self.archive.update(key, drop=ids)
+                self.archive.save_manifest()
+            self._disk_state = self._stat_disk()
+    
+    def _snapshot_path(self):
+        """Get the path of the snapshot file"""
+        return DATA_FILE
+    
+    def _encode_snapshot(self, tasks):
+        """Convert tasks to what _write_snapshot_file() writes, called under the tasks lock"""
+        return [task.to_dict() for task in tasks]
+    
+    def _write_snapshot_file(self, snapshot):
+        """Replace the snapshot file"""
+        write_atomic(DATA_FILE, lambda f: json.dump(snapshot, f))
+    
+    def _read_snapshot(self):
+        """Read the snapshot file as (tasks, whether ids were assigned), or None if it is unreadable"""
+        if not os.path.exists(DATA_FILE):
+            return [], False
+        try:
+            with open(DATA_FILE, 'r') as f:
+                tasks_data = json.load(f)
+            tasks = share_task_values([Task.from_dict(task_data) for task_data in tasks_data])
+            return tasks, any(not task_data.get("id") for task_data in tasks_data)
+        except (json.JSONDecodeError, KeyError):
+            return None
+    
+    def _read_snapshot_range(self, start, end):
+        """Read the snapshot tasks starting in [start, end) and the recurring ones, or None if it cannot be read by range
+        
+        Records are written in start time order with the id first, and raw quotes
+        only ever delimit strings, so '}, {"id": ' always separates two records
+        and the file is bisected by byte offset instead of parsed whole.
+        """
+        import mmap
+        if not os.path.exists(DATA_FILE):
+            return []
+        with open(DATA_FILE, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                try:
+                    return self._parse_snapshot_range(data, start, end)
+                except (ValueError, KeyError, TypeError):
+                    return None
+    
+    @staticmethod
+    def _parse_snapshot_range(data, start, end):
+        """Get the tasks of the mapped snapshot data that _read_snapshot_range() reads"""
+        record, separator = b'{"id": ', b'}, {"id": '
+        stop = data.rfind(b"]")
+        if data[:1] != b"[" or stop < 0:
+            return None
+        if data.find(b"{", 1, stop) < 0:
+            return []
+        if data[1:1 + len(record)] != record:
+            return None  # Written before tasks had ids
+        
+        def record_end(offset):
+            """Get the end of the record at offset and the offset of the next one"""
+            found = data.find(separator, offset, stop)
+            return (stop, stop) if found < 0 else (found + 1, found + 3)
+        
+        def lower_bound(when):
+            """Get the offset of the first record starting at or after when, or stop"""
+            lo, hi = 1, stop  # Records before lo start before when, the one at hi (if any) does not
+            while lo < hi:
+                found = data.find(separator, max(0, (lo + hi) // 2 - 3), hi)
+                offset = lo if found < 0 else found + 3
+                offset_end, following = record_end(offset)
+                if datetime.datetime.fromisoformat(json.loads(data[offset:offset_end])["start_time"]) >= when:
+                    hi = offset
+                else:
+                    lo = following
+            return lo
+        
+        first = 1 if start is None else lower_bound(start)
+        last = stop if end is None else lower_bound(end)
+        records = json.loads(b"[" + data[first:last].rstrip(b", ") + b"]")
+        # Recurring tasks may have started long before the range
+        found = data.find(b'"recurrence": {', 1, stop)
+        while found >= 0:
+            offset = data.rfind(record, 0, found)
+            offset_end, following = record_end(found)
+            if not first <= offset < last:
+                records.append(json.loads(data[offset:offset_end]))
+            found = data.find(b'"recurrence": {', following, stop)
+        return share_task_values([Task.from_dict(task_data) for task_data in records])
+    
+    def _archive_old_tasks(self):
+        """Move completed one-off tasks of months before archive_cutoff() into the archive, returning whether any moved"""
+        cutoff = archive_cutoff()
+        months = {}
+        with self._lock:
+            for task in self.tasks.slice(0, self.tasks.bisect_left(cutoff)):
+                if task.completed and not task.recurrence and task.id not in self.archived_ids:
+                    months.setdefault(month_key(task.start_time), []).append(task)
+            if not months:
+                return False
+            
+            # Segments are written before the snapshot that drops their tasks, so a crash
+            # in between leaves duplicates rather than losing tasks
+            for key, tasks in months.items():
+                dropped = self._archive_dropped.get(key, set())
+                dropped.difference_update(task.id for task in tasks)
+                self.archive.update(key, add=tasks, drop=dropped)
+                self._archive_dropped.pop(key, None)
+                if key in self._paged_months:
+                    self.archived_ids.update(task.id for task in tasks)
+                else:
+                    for task in tasks:
+                        del self.by_id[task.id]
+            self.archive.save_manifest()
+            self.tasks.reset([task for task in self.tasks if task.id in self.by_id])
+            self._cached_stats = None
+        return True
+    
+    def load_tasks(self):
+        """Load tasks from JSON file and replay the journal on top, archiving old completed tasks"""
+        with self._io_lock:
+            rewrite = self._load()
+            # Archive before any snapshot is written, so the snapshot no longer holds them
+            if self._archive_old_tasks() or rewrite:
+                # Persist newly assigned ids before any journal record refers to them,
+                # and replace a stale or torn journal
+                self._write_snapshot()
+    
+    def _load(self):
+        """Read the snapshot and journal into memory, returning whether a snapshot should be written"""
+        # Nothing read here forms reference cycles, and collections triggered by
+        # allocating a million tasks would only scan them over and over
+        with paused_gc():
+            snapshot = self._read_snapshot()
+            if snapshot is None:
+                self._set_tasks([])
+                self.loaded = True
+                print("Error loading tasks, starting with empty task list")
+                return False
+            tasks, ids_assigned = snapshot
+            # The snapshot is written in start time order, which the cache records with its day statistics
+            index = read_index_cache(self._snapshot_path(), len(tasks))
+            keys, stats = index or (None, None)
+            ids_assigned = self._set_tasks(tasks, keys, stats) or ids_assigned
+            if index is None and tasks and not ids_assigned:
+                # Derived before the journal is replayed, while memory still matches the snapshot
+                stats = day_stats(self.tasks)
+                write_index_cache(self._snapshot_path(), self.tasks.start_keys(), stats)
+                self._cached_stats = stats
+        self.loaded = True
+        return self._replay_journal() is None or ids_assigned
+    
+    def load_range(self, start, end):
+        """Load the tasks starting in [start, end) and every recurring task without writing anything
+        
+        Only the snapshot records of the range are parsed. The backend stays
+        unloaded, so it never writes a snapshot missing the other tasks, and a
+        snapshot or journal that cannot be read by range is loaded whole.
+        """
+        with self._io_lock:
+            with paused_gc():
+                tasks = self._read_snapshot_range(start, end)
+            if tasks is None:
+                self.load_tasks()
+                return
+            self._set_tasks(tasks)
+            if self._replay_journal() is None:
+                self.load_tasks()
+    
+    def _replay_journal(self):
+        """Apply the journal to tasks just read from the snapshot, returning what _catch_up() does"""
+        self.archive.refresh()
+        self.archived_ids = set()
+        self._paged_months = set()
+        self._archive_dropped = {}
+        self._base = self._journal_base()
+        self._journal_offset = 0
+        self._journal_records = 0
+        return self._catch_up(foreign=True)
+    
+    def close(self):
+        """Stop the saver and compact the journal into the snapshot if this instance changed anything"""
+        if self._saver is not None:
+            self._saver.stop()
+            self._saver = None
+        self.flush()
+        if self._changed and self._journal_records and self.loaded:
+            self.save_tasks()
+        self._close_journal()
+    
+    def start_write_behind(self):
+        """Persist changes from a background thread instead of the caller's"""
+        if self._saver is None:
+            self._saver = WriteBehindSaver(self.flush)
+            self._saver.start()
+    
+    def flush(self):
+        """Write journal records queued for the write-behind saver"""
+        with self._io_lock:
+            with self._lock:
+                lines, self._pending = self._pending, []
+                self._pending_deletes = {}
+            if lines:
+                self._write_journal(lines)
+    
+    def save_status(self):
+        """Get "saved", "saving", "save failed" or, for a while after a change was dropped because another instance deleted its task, "edit lost" """
+        saver = self._saver
+        if saver is not None and saver.error:
+            return "save failed"
+        if self._pending or (saver is not None and saver.saving):
+            return "saving"
+        if self._lost_at is not None and time.monotonic() - self._lost_at < LOST_EDIT_NOTICE:
+            return "edit lost"
+        return "saved"
+    
+    def reload_changes(self):
+        """Merge changes other instances made to the task files, returning whether any task changed"""
+        if not self.loaded or self._stat_disk() == self._disk_state:
+            return False
+        # Never wait on another instance from the UI thread, the next poll retries
+        if not self._io_lock.acquire(blocking=False):
+            return False
+        try:
+            changed = self._sync()
+            # Compaction is left to this thread so the saver never rewrites tasks under the UI
+            if self._journal_records >= JOURNAL_COMPACT_THRESHOLD:
+                self._write_snapshot()
+        finally:
+            self._io_lock.release()
+        return changed
+    
+    def _stat_disk(self):
+        """Get a cheap signature of the journal and snapshot that changes whenever either is written"""
+        signature = []
+        for path in (JOURNAL_FILE, self._snapshot_path()):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        signature.append(self.archive.stat())
+        return tuple(signature)
+    
+    def _sync(self):
+        """Bring memory up to date with the files, the caller holds the file lock; returns whether any task changed"""
+        applied = self._catch_up()
+        if applied is not None:
+            # Another instance archiving tasks changes only the counts of months not paged in
+            return self.archive.refresh() or applied > 0
+        # Another instance compacted, or the journal is torn: diff against a fresh read instead
+        return self._merge_from_disk()
+    
+    def _merge_from_disk(self):
+        """Reread the files, re-apply our unsaved records and update only the tasks that differ"""
+        disk = type(self)()
+        rewrite = disk._load()
+        with self._lock:
+            for key in self._paged_months:
+                if key not in disk._paged_months:
+                    disk._page_in_month(key)
+            pending = []
+            for line in self._pending:
+                record = json.loads(line)
+                task = self.by_id.get(record.get("id")) or self._pending_deletes.get(record.get("id"))
+                record = disk._apply_pending(record, task)
+                if record is None:
+                    if json.loads(line)["op"] != "delete":
+                        self._lost_at = time.monotonic()  # Its task was deleted by another instance
+                else:
+                    pending.append(json.dumps(record) + "\n")
+            self._pending = pending
+            
+            changed = False
+            for task_id, task in list(self.by_id.items()):
+                other = disk.by_id.get(task_id)
+                if other is None or other.to_dict() != task.to_dict():
+                    self._remove_task(task)
+                    changed = True
+            for task_id, other in disk.by_id.items():
+                if task_id not in self.by_id:
+                    self._insert_task(other)
+                    changed = True
+        
+        self.archive = disk.archive
+        self.archived_ids = disk.archived_ids
+        self._paged_months = disk._paged_months
+        self._archive_dropped = disk._archive_dropped
+        self._base = disk._base
+        self._journal_offset = disk._journal_offset
+        self._journal_records = disk._journal_records
+        self._disk_state = disk._disk_state
+        if rewrite:
+            self._write_snapshot()
+        return changed
+    
+    def _apply_pending(self, record, task):
+        """Apply another instance's unsaved record while merging, returning it as it should be journaled, or None if its task is gone
+        
+        task is that instance's copy of the task the record changes. A task
+        another instance archived meanwhile is thawed from its month, and the
+        record notes the month so instances replaying it do the same.
+        """
+        if task is not None:
+            key = month_key(task.start_time)
+            if task.id not in self.by_id and key not in self._paged_months:
+                self._page_in_month(key)
+            if task.id in self.archived_ids:
+                record = self._thaw(self.by_id[task.id], record)
+        try:
+            self._apply_record(record)
+        except (KeyError, ValueError, IndexError):
+            return None
+        return record
+    
+    def _journal_base(self):
+        """Identify the snapshot a journal applies to"""
+        path = self._snapshot_path()
+        if not os.path.exists(path):
+            return {"op": "base", "mtime_ns": None, "size": None}
+        stat = os.stat(path)
+        return {"op": "base", "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    
+    def _start_journal(self):
+        """Replace the journal with an empty one keyed to the current snapshot"""
+        write_atomic(JOURNAL_FILE, lambda f: f.write(json.dumps(self._journal_base()) + "\n"))
+        self._journal_records = 0
+    
+    def _append_journal(self, record):
+        """Append a mutation record to the journal, or queue it for the write-behind saver"""
+        self._changed = True
+        line = json.dumps(dict(record, writer=self._writer)) + "\n"
+        if self._saver is not None:
+            with self._lock:
+                self._pending.append(line)
+            self._saver.mark_dirty()
+        else:
+            self._write_journal([line])
+            if self._journal_records >= JOURNAL_COMPACT_THRESHOLD and self.loaded:
+                self.save_tasks()
+    
+    def _write_journal(self, lines):
+        """Append lines to the journal, reopening it if another instance replaced it"""
+        with self._io_lock:
+            if self._journal is not None and not self._journal_is_current():
+                self._close_journal()
+            if self._journal is None:
+                if not os.path.exists(CONFIG_DIR):
+                    os.makedirs(CONFIG_DIR)
+                if not os.path.exists(JOURNAL_FILE):
+                    self._start_journal()
+                self._journal = open(JOURNAL_FILE, 'a')
+            self._journal.writelines(lines)
+            self._journal.flush()
+            self._journal_records += len(lines)
+    
+    def _journal_is_current(self):
+        """Check the open journal handle still refers to the file at JOURNAL_FILE"""
+        try:
+            return os.fstat(self._journal.fileno()).st_ino == os.stat(JOURNAL_FILE).st_ino
+        except FileNotFoundError:
+            return False
+    
+    def _close_journal(self):
+        """Close the journal file handle if open"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+    
+    def _catch_up(self, foreign=False):
+        """Apply journal records appended since the last read, skipping our own
+        
+        Returns how many records were applied, or None if the journal belongs to
+        another snapshot or ends in a torn write and memory must be rebuilt. With
+        foreign, a journal belonging to another snapshot is still replayed, see
+        _replay_foreign_journal().
+        """
+        self._disk_state = self._stat_disk()
+        if not os.path.exists(JOURNAL_FILE):
+            return 0 if self._journal_offset == 0 else None
+        
+        applied = 0
+        with open(JOURNAL_FILE, 'rb') as f:
+            header = f.readline()
+            try:
+                base = json.loads(header or "null")
+            except json.JSONDecodeError:
+                base = None
+            if base != self._base:
+                if foreign:
+                    self._replay_foreign_journal(f)
+                return None  # Journal belongs to another snapshot
+            offset = max(self._journal_offset, len(header))
+            if f.seek(0, os.SEEK_END) < offset:
+                return None
+            f.seek(offset)
+            
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return None  # Torn write from a crash, drop the rest
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    return None
+                self._journal_offset = offset = offset + len(line)
+                if record.get("writer") == self._writer:
+                    continue  # Already applied when it was made
+                self._journal_records += 1
+                try:
+                    self._apply_record(record)
+                except (KeyError, ValueError, IndexError):
+                    continue  # Refers to a task this instance has since removed
+                applied += 1
+        self._journal_offset = offset
+        return applied
+    
+    def _replay_foreign_journal(self, f):
+        """Apply the records of a journal keyed to another snapshot, as far as applying them twice is harmless
+        
+        The snapshot was touched or copied since, or a compaction crashed between
+        writing it and replacing the journal, so it may hold some of the records
+        already. Adds, deletes and toggles that note their result leave the same
+        tasks when replayed again. Older records could not be, the journal is then
+        kept as tasks.journal.orphaned rather than dropped.
+        """
+        skipped = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # Torn write from a crash
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if "index" in record or (record["op"] == "toggle" and "completed" not in record):
+                skipped += 1
+                continue
+            try:
+                self._apply_record(record)
+            except (KeyError, ValueError, IndexError):
+                continue  # Deleted in the snapshot already
+        if skipped:
+            f.seek(0)
+            data = f.read()
+            orphaned = JOURNAL_FILE + ".orphaned"
+            write_atomic(orphaned, lambda out: out.write(data), 'wb')
+            print(f"The journal did not match {self._snapshot_path()}, {skipped} changes not applied were kept in {orphaned}")
+    
+    def _apply_record(self, record):
+        """Apply one journal record without journaling it again"""
+        op = record["op"]
+        if "archived" in record:
+            # The task was archived when the record was made, and is thawed by it
+            if record["archived"] not in self._paged_months:
+                self._page_in_month(record["archived"])
+            self._thaw(self.by_id[record["id"]], {})
+        # Journals written before tasks had ids address them by position
+        task = self.by_id[record["id"]] if "id" in record else None
+        if "index" in record:
+            task = self.tasks[record["index"]]
+        
+        if op == "add":
+            task = Task.from_dict(record["task"])
+            if task.id in self.by_id:
+                self._remove_task(self.by_id[task.id])  # Replayed onto a snapshot that has it already
+            self._insert_task(task)
+        elif op == "delete":
+            self._remove_task(task)
+        elif op == "toggle":
+            # Journals written before toggles recorded their result flip the task
+            task.completed = record["completed"] if "completed" in record else not task.completed
+            self._cached_stats = None
+        else:
+            raise ValueError(f"Unknown journal op: {op}")
+
+
+class SqliteBackend(TaskBackend):
+    """Tasks stored in an indexed SQLite database, queried on demand"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            uid TEXT,
+            name TEXT NOT NULL,
+            start_time TEXT NOT NULL,
+            end_time TEXT,
+            completed INTEGER NOT NULL DEFAULT 0,
+            recurrence TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_start_time ON tasks (start_time);
+        CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+    COLUMNS = "uid, name, start_time, end_time, completed, recurrence"
+    INSERT = ("INSERT INTO tasks (uid, name, start_time, end_time, completed, recurrence) "
+              "VALUES (?, ?, ?, ?, ?, ?)")
+    
+    def __init__(self, path=None):
+        import sqlite3  # Imported lazily, some Python builds ship without it
+        self.path = path or DB_FILE
+        self._sqlite3 = sqlite3
+        self.conn = None
+        self._data_version = None  # Bumped by SQLite whenever another connection commits
+    
+    def load_tasks(self):
+        """Open the database, tasks are queried on demand"""
+        self.open()
+    
+    def open(self):
+        """Open the database, creating the schema and migrating tasks.json once"""
+        if self.conn is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.conn = self._sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self._migrate_uids()
+        self._migrate_recurrence()
+        self._migrate_json()
+        self._data_version = self._read_data_version()
+    
+    def _migrate_uids(self):
+        """Give every row of a database created before tasks had ids a stable id"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tasks)")}
+        if "uid" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE tasks ADD COLUMN uid TEXT")
+                self.conn.execute("UPDATE tasks SET uid = lower(hex(randomblob(8))) WHERE uid IS NULL")
+        self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_uid ON tasks (uid)")
+    
+    def _migrate_recurrence(self):
+        """Add the recurrence column to databases created before tasks could repeat"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tasks)")}
+        if "recurrence" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE tasks ADD COLUMN recurrence TEXT")
+        # Partial index, so finding the rules never scans the one-off tasks
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_recurring ON tasks (start_time) WHERE recurrence IS NOT NULL")
+    
+    def _migrate_json(self):
+        """Import the JSON or binary task store the first time the database is opened
+        
+        A store can be nothing but a journal, as headless commands leave on a fresh
+        install, so loading through the file backends replays it either way.
+        """
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            return
+        if any(os.path.exists(path) for path in (DATA_FILE, BINARY_FILE, JOURNAL_FILE)):
+            source = BinaryBackend() if os.path.exists(BINARY_FILE) else JsonBackend()
+            source.load_tasks()
+            source.page_in()
+            source.close()
+            self.add_tasks(source.tasks)  # Commits the import before it is marked done below
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)",
+                              (datetime.datetime.now().isoformat(),))
+    
+    def save_tasks(self):
+        """Commit pending changes"""
+        self.conn.commit()
+    
+    def close(self):
+        """Close the database connection"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
+    def reload_changes(self):
+        """Detect commits from other connections, tasks are queried on demand so a redraw is enough"""
+        if self.conn is None:
+            return False
+        version = self._read_data_version()
+        changed = version != self._data_version
+        self._data_version = version
+        return changed
+    
+    def _read_data_version(self):
+        """Get SQLite's data_version, which changes when another connection commits"""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _to_row(self, task):
+        """Convert a task to (uid, name, start_time, end_time, completed, recurrence) column values"""
+        return (task.id,
+                task.name,
+                task.start_time.isoformat(),
+                task.end_time.isoformat() if task.end_time else None,
+                int(task.completed),
+                json.dumps(task.recurrence.to_dict()) if task.recurrence else None)
+    
+    def _to_task(self, row):
+        """Convert a (uid, name, start_time, end_time, completed, recurrence) row to a task"""
+        uid, name, start_time, end_time, completed, recurrence = row
+        return Task(name,
+                    datetime.datetime.fromisoformat(start_time),
+                    datetime.datetime.fromisoformat(end_time) if end_time else None,
+                    bool(completed),
+                    task_id=uid,
+                    recurrence=Recurrence.from_dict(json.loads(recurrence)) if recurrence else None)
+    
+    def count(self):
+        """Get the number of stored tasks"""
+        return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+    
+    def get_tasks_page(self, offset, limit):
+        """Get up to limit tasks in start time order beginning at offset"""
+        rows = self.conn.execute(
+            f"SELECT {self.COLUMNS} FROM tasks ORDER BY start_time, id LIMIT ? OFFSET ?", (limit, offset))
+        return [self._to_task(row) for row in rows]
+    
+    def get_tasks_from(self, start, end, limit, after=None):
+        """Get up to limit tasks starting before end in start time order after the task with id after, or from start
+        
+        Seeks the start time index to the position, where get_tasks_page() steps over offset rows.
+        """
+        row = None
+        if after is not None:
+            row = self.conn.execute("SELECT start_time, id FROM tasks WHERE uid = ?", (after,)).fetchone()
+        if row is not None:
+            where, params = "(start_time, id) > (?, ?)", [row[0], row[1]]
+        else:
+            where, params = "start_time >= ?", [start.isoformat() if start is not None else ""]
+        if end is not None:
+            where += " AND start_time < ?"
+            params.append(end.isoformat())
+        rows = self.conn.execute(
+            f"SELECT {self.COLUMNS} FROM tasks WHERE {where} ORDER BY start_time, id LIMIT ?", params + [limit])
+        return [self._to_task(row) for row in rows]
+    
+    def get_tasks_between(self, start, end):
+        """Get all tasks starting in [start, end)"""
+        rows = self.conn.execute(
+            f"SELECT {self.COLUMNS} FROM tasks "
+            "WHERE start_time >= ? AND start_time < ? ORDER BY start_time, id",
+            (start.isoformat(), end.isoformat()))
+        return [self._to_task(row) for row in rows]
+    
+    def get_task(self, task_id):
+        """Get a task by id, or None"""
+        row = self.conn.execute(f"SELECT {self.COLUMNS} FROM tasks WHERE uid = ?", (task_id,)).fetchone()
+        return self._to_task(row) if row else None
+    
+    def index_of(self, task_id):
+        """Get the start time order position of a task by id, or None"""
+        row = self.conn.execute("SELECT start_time, id FROM tasks WHERE uid = ?", (task_id,)).fetchone()
+        if row is None:
+            return None
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE start_time < ? OR (start_time = ? AND id < ?)",
+            (row[0], row[0], row[1])).fetchone()[0]
+    
+    def count_before(self, start):
+        """Get the number of tasks starting before start"""
+        return self.conn.execute("SELECT COUNT(*) FROM tasks WHERE start_time < ?",
+                                 (start.isoformat(),)).fetchone()[0]
+    
+    def get_month_counts(self, year, month):
+        """Get a {day: task count} mapping for a whole month with one grouped query"""
+        start, end = month_bounds(year, month)
+        rows = self.conn.execute(
+            "SELECT CAST(substr(start_time, 9, 2) AS INTEGER), COUNT(*) FROM tasks "
+            "WHERE start_time >= ? AND start_time < ? GROUP BY 1",
+            (start.isoformat(), end.isoformat()))
+        return dict(rows)
+    
+    def get_day_stats(self, start, end):
+        """Get a {date: (task count, completed count)} mapping with one grouped query"""
+        rows = self.conn.execute(
+            "SELECT substr(start_time, 1, 10), COUNT(*), SUM(completed) FROM tasks "
+            "WHERE start_time >= ? AND start_time < ? GROUP BY 1",
+            (start.isoformat(), end.isoformat()))
+        return {datetime.date.fromisoformat(day): (count, completed) for day, count, completed in rows}
+    
+    def get_recurring_tasks(self):
+        """Get every task that has a recurrence rule"""
+        rows = self.conn.execute(f"SELECT {self.COLUMNS} FROM tasks WHERE recurrence IS NOT NULL")
+        return [self._to_task(row) for row in rows]
+    
+    def add_task(self, task):
+        """Add a new task"""
+        with self.conn:
+            self.conn.execute(self.INSERT, self._to_row(task))
+    
+    def add_tasks(self, tasks, on_added=None):
+        """Add many tasks in one transaction, inserting them in batches"""
+        added = 0
+        tasks = iter(tasks)
+        with self.conn:
+            while True:
+                batch = list(itertools.islice(tasks, SQLITE_BATCH_SIZE))
+                if not batch:
+                    break
+                # Give fresh ids to tasks whose id is already taken, e.g. re-imported exports
+                placeholders = ", ".join("?" * len(batch))
+                taken = {row[0] for row in self.conn.execute(
+                    f"SELECT uid FROM tasks WHERE uid IN ({placeholders})", [task.id for task in batch])}
+                for task in batch:
+                    if task.id in taken:
+                        task.id = new_task_id()
+                    taken.add(task.id)
+                self.conn.executemany(self.INSERT, (self._to_row(task) for task in batch))
+                if on_added:
+                    on_added(batch)
+                added += len(batch)
+        return added
+    
+    def delete_task(self, task_id):
+        """Delete a task by id"""
+        with self.conn:
+            return self.conn.execute("DELETE FROM tasks WHERE uid = ?", (task_id,)).rowcount > 0
+    
+    def toggle_task_completion(self, task_id):
+        """Toggle task completion status"""
+        with self.conn:
+            return self.conn.execute("UPDATE tasks SET completed = NOT completed WHERE uid = ?",
+                                     (task_id,)).rowcount > 0
+
+
+class BinaryBackend(JsonBackend):
+    """Tasks held in memory like JsonBackend, persisted as a binary snapshot plus the same journal"""
+    
+    def __init__(self):
+        super().__init__()
+        self._migrating = False  # Reading tasks.json the first time the binary store is opened
+    
+    def _load(self):
+        """Read the snapshot and journal, converting tasks.json if there is no binary snapshot yet"""
+        self._migrating = not os.path.exists(BINARY_FILE) and os.path.exists(DATA_FILE)
+        try:
+            # The journal is still keyed to tasks.json, so it is replayed before the first binary snapshot
+            return super()._load() or self._migrating
+        finally:
+            self._migrating = False
+    
+    def _snapshot_path(self):
+        """Get the path of the snapshot file, tasks.json while migrating from it"""
+        return DATA_FILE if self._migrating else BINARY_FILE
+    
+    def _encode_snapshot(self, tasks):
+        """Pack tasks into snapshot bytes, called under the tasks lock"""
+        return encode_binary_snapshot(tasks)
+    
+    def _write_snapshot_file(self, snapshot):
+        """Replace the snapshot file"""
+        write_atomic(BINARY_FILE, lambda f: f.write(snapshot), 'wb')
+    
+    def _read_snapshot(self):
+        """Read the snapshot file as (tasks, whether ids were assigned), or None if it is unreadable"""
+        if self._migrating:
+            return super()._read_snapshot()
+        if not os.path.exists(BINARY_FILE):
+            return [], False
+        try:
+            with open(BINARY_FILE, 'rb') as f:
+                return decode_binary_snapshot(f.read()), False
+        except (ValueError, KeyError, TypeError):
+            return None
+    
+    def _read_snapshot_range(self, start, end):
+        """Read the snapshot tasks starting in [start, end) and the recurring ones, or None if it cannot be read by range"""
+        if not os.path.exists(BINARY_FILE):
+            # tasks.json is converted by a full load
+            return None if os.path.exists(DATA_FILE) else []
+        try:
+            with open(BINARY_FILE, 'rb') as f:
+                return decode_binary_snapshot(f.read(), start, end)
+        except (ValueError, KeyError, TypeError):
+            return None
+
+
+STORAGE_BACKENDS = {
+    "json": JsonBackend,
+    "binary": BinaryBackend,
+    "sqlite": SqliteBackend,
+}
+
+
+class SearchIndex:
+    """Inverted index from the lowercase words of task names to tasks, searched by word prefix"""
+    
+    WORD = re.compile(r"\w+")
+    
+    def __init__(self, tasks=()):
+        self.tasks = {}  # id -> task
+        self.postings = {}  # word -> ids of the tasks whose name contains it
+        self._vocabulary = None  # Sorted words for prefix lookups, rebuilt after the word set changes
+        self._prefix_cache = {}  # term -> ids of _prefix_ids(term), emptied by every change
+        for task in tasks:
+            self.add(task)
+    
+    def add(self, task):
+        """Index a task"""
+        self.tasks[task.id] = task
+        self._prefix_cache = {}
+        for word in set(self.WORD.findall(task.name.lower())):
+            ids = self.postings.get(word)
+            if ids is None:
+                self.postings[word] = ids = set()
+                self._vocabulary = None
+            ids.add(task.id)
+    
+    def remove(self, task_id):
+        """Drop a task from the index"""
+        task = self.tasks.pop(task_id, None)
+        if task is None:
+            return
+        self._prefix_cache = {}
+        for word in set(self.WORD.findall(task.name.lower())):
+            ids = self.postings[word]
+            ids.discard(task_id)
+            if not ids:
+                del self.postings[word]
+                self._vocabulary = None
+    
+    def search(self, query, within=None, within_query=""):
+        """Get the tasks with a name word starting with every word of query, in start time order
+        
+        within is the result of within_query, a query this one extends. The new query can
+        only match fewer tasks, so that list is filtered by the terms within_query did not
+        already have instead of being collected and sorted again.
+        """
+        terms = set(self.WORD.findall(query.lower()))
+        if not terms:
+            return []
+        if within is not None:
+            for term in terms - set(self.WORD.findall(within_query.lower())):
+                ids = self._prefix_ids(term)
+                within = [task for task in within if task.id in ids]
+            return within
+        
+        # Shortest candidate set first, the others only narrow it down
+        matching = sorted((self._prefix_ids(term) for term in terms), key=len)
+        ids = matching[0].intersection(*matching[1:])
+        tasks = [self.tasks[task_id] for task_id in ids]
+        tasks.sort(key=lambda task: task.start_time)
+        return tasks
+    
+    def _prefix_ids(self, term):
+        """Get the ids of tasks with a name word starting with term, cached until the index changes"""
+        ids = self._prefix_cache.get(term)
+        if ids is None:
+            if self._vocabulary is None:
+                self._vocabulary = sorted(self.postings)
+            ids = set()
+            for i in range(bisect.bisect_left(self._vocabulary, term), len(self._vocabulary)):
+                if not self._vocabulary[i].startswith(term):
+                    break
+                ids.update(self.postings[self._vocabulary[i]])
+            self._prefix_cache[term] = ids
+        return ids
+
+
+class IntervalNode:
+    """Treap node holding one task interval"""
+    
+    __slots__ = ("key", "task", "end", "priority", "max_end", "left", "right")
+    
+    def __init__(self, task):
+        self.key = (task.start_time, task.id)
+        self.task = task
+        self.end = task.end_time
+        self.priority = random.random()
+        self.max_end = task.end_time  # Latest end in this subtree
+        self.left = None
+        self.right = None
+
+
+class IntervalTree:
+    """Treap of task intervals ordered by start time, each node knowing the latest end below it
+    
+    Only tasks with an end time are intervals; tasks without one never overlap anything.
+    """
+    
+    def __init__(self, tasks=()):
+        self.nodes = {}  # id -> node
+        self.root = None
+        
+        nodes = [IntervalNode(task) for task in tasks if self._is_interval(task)]
+        # tasks arrive in start time order, so this sort only orders ties by id and the treap
+        # is then built in O(n) as a Cartesian tree
+        nodes.sort(key=lambda node: node.key)
+        stack = []
+        for node in nodes:
+            self.nodes[node.task.id] = node
+            last = None
+            while stack and stack[-1].priority < node.priority:
+                last = stack.pop()
+            node.left = last
+            if stack:
+                stack[-1].right = node
+            stack.append(node)
+        if stack:
+            self.root = stack[0]
+            self._update_all(self.root)
+    
+    @staticmethod
+    def _is_interval(task):
+        """Check whether a task occupies a span of time"""
+        return task.end_time is not None and task.end_time > task.start_time
+    
+    def __len__(self):
+        """Get the number of intervals"""
+        return len(self.nodes)
+    
+    def add(self, task):
+        """Insert a task interval"""
+        if self._is_interval(task) and task.id not in self.nodes:
+            node = IntervalNode(task)
+            self.nodes[task.id] = node
+            self.root = self._insert(self.root, node)
+    
+    def remove(self, task_id):
+        """Remove a task interval by id"""
+        node = self.nodes.pop(task_id, None)
+        if node is not None:
+            self.root = self._remove(self.root, node.key)
+    
+    def overlapping(self, start, end):
+        """Get the tasks whose [start_time, end_time) overlaps [start, end), in start time order"""
+        found = []
+        self._collect(self.root, start, end, found)
+        return found
+    
+    def _collect(self, node, start, end, found):
+        """Append overlapping tasks below node in order, skipping subtrees that end too early"""
+        if node is None or node.max_end <= start:
+            return
+        self._collect(node.left, start, end, found)
+        if node.key[0] < end:
+            if node.end > start:
+                found.append(node.task)
+            self._collect(node.right, start, end, found)
+    
+    def _insert(self, node, new):
+        """Insert new below node, returning the subtree's root"""
+        if node is None:
+            return new
+        if new.key < node.key:
+            node.left = self._insert(node.left, new)
+            if node.left.priority > node.priority:
+                return self._rotate_right(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.priority > node.priority:
+                return self._rotate_left(node)
+        self._update(node)
+        return node
+    
+    def _remove(self, node, key):
+        """Remove the node with key below node, returning the subtree's root"""
+        if node is None:
+            return None
+        if key < node.key:
+            node.left = self._remove(node.left, key)
+        elif key > node.key:
+            node.right = self._remove(node.right, key)
+        else:
+            return self._merge(node.left, node.right)
+        self._update(node)
+        return node
+    
+    def _merge(self, left, right):
+        """Join two subtrees where every key in left is below every key in right"""
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.priority > right.priority:
+            left.right = self._merge(left.right, right)
+            self._update(left)
+            return left
+        right.left = self._merge(left, right.left)
+        self._update(right)
+        return right
+    
+    def _rotate_right(self, node):
+        """Lift the left child above node"""
+        left = node.left
+        node.left, left.right = left.right, node
+        self._update(node)
+        self._update(left)
+        return left
+    
+    def _rotate_left(self, node):
+        """Lift the right child above node"""
+        right = node.right
+        node.right, right.left = right.left, node
+        self._update(node)
+        self._update(right)
+        return right
+    
+    def _update(self, node):
+        """Recompute the latest end below node from its children"""
+        max_end = node.end
+        if node.left is not None and node.left.max_end > max_end:
+            max_end = node.left.max_end
+        if node.right is not None and node.right.max_end > max_end:
+            max_end = node.right.max_end
+        node.max_end = max_end
+    
+    def _update_all(self, node):
+        """Compute the latest end of every subtree bottom up"""
+        if node.left is not None:
+            self._update_all(node.left)
+        if node.right is not None:
+            self._update_all(node.right)
+        self._update(node)
+
+
+class ChangeLog:
+    """Append-only log of task changes numbered by a monotonic revision, the basis of delta sync
+    
+    The first line holds a random origin that names this store. Every other
+    line records one change: its revision, the wall clock time and origin of
+    the store that made it, and the task as it was afterwards, flagged deleted
+    if the change removed it. Time and origin decide conflicts, last writer
+    wins. Revisions only grow down the file, so the changes after a revision
+    are found by bisecting for it and reading on to the end. Once the log has
+    doubled since it was last compacted, lines superseded by a later change of
+    the same task are dropped; the revisions of the rest stay as they were.
+    
+    Nothing is logged until the first serve or sync creates the log, since a
+    store's first sync with a peer sends every task anyway.
+    """
+    
+    def __init__(self):
+        self._io_lock = FileLock(f"{CHANGES_FILE}.lock")
+        self._lock = threading.Lock()  # Guards pending changes against the saver thread
+        self._pending = []  # Changes waiting for the write-behind saver
+        self._saver = None
+        self._file = None  # Kept open for appending while it is the file at CHANGES_FILE
+        self._header = None  # Parsed first line of the open file
+        self._header_size = 0
+        self._tail = None  # (inode, size, revision) of the log after our last append
+        self._stamps = {}  # task id -> (time, origin) of its latest change, see stamps()
+        self._offsets = {}  # task id -> offset of the line of its latest change
+        self._stamps_read = None  # (inode, offset) of the log the stamps were read up to
+        self._active = False  # Whether the log was seen to exist, it is never removed once created
+    
+    def active(self):
+        """Check whether the log exists, that is whether this store ever synced"""
+        if not self._active:
+            self._active = os.path.exists(CHANGES_FILE)
+        return self._active
+    
+    def origin(self):
+        """Get the random id naming this store, creating the log on first use"""
+        with self._io_lock:
+            self._writable()
+            return self._header["origin"]
+    
+    def revision(self):
+        """Get the revision of the latest change, 0 before the first"""
+        try:
+            f = open(CHANGES_FILE, 'rb')
+        except FileNotFoundError:
+            return 0
+        with f:
+            line, end = self._last_line(f, len(f.readline()))
+        return json.loads(line)["rev"] if line else 0
+    
+    def record(self, tasks, deleted=False):
+        """Log a change made here to each of tasks, as they are now, once the store has synced"""
+        if not self.active():
+            return
+        now = time.time()
+        changes = [{"time": now, "origin": None, "deleted": deleted, "task": task.to_dict()} for task in tasks]
+        if not changes:
+            return
+        if self._saver is not None:
+            with self._lock:
+                self._pending.extend(changes)
+            self._saver.mark_dirty()
+        else:
+            self._append(changes)
+    
+    def append(self, changes):
+        """Log changes another store made, keeping their time and origin"""
+        if changes:
+            self._append(changes)
+    
+    def read_since(self, revision):
+        """Yield each change after revision in revision order, with its "rev" """
+        try:
+            f = open(CHANGES_FILE, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            start = len(f.readline())
+            f.seek(self._seek_after(f, start, f.seek(0, os.SEEK_END), revision))
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return  # Torn by a crash, or still being written
+                yield json.loads(line)
+    
+    def changes_since(self, revision):
+        """Get the latest change of each task changed after revision, oldest first, as sync records"""
+        changes = {}
+        for change in self.read_since(revision):
+            del change["rev"]
+            changes.pop(change["task"]["id"], None)
+            changes[change["task"]["id"]] = change
+        return list(changes.values())
+    
+    def stamps_since(self, revision):
+        """Get {task id: (time, origin)} of the latest change of each task changed after revision"""
+        return {change["task"]["id"]: (change["time"], change["origin"]) for change in self.read_since(revision)}
+    
+    def stamps(self):
+        """Get {task id: (time, origin)} of the latest change of every task in the log
+        
+        The first call reads the whole log, later ones only what was appended since.
+        """
+        try:
+            f = open(CHANGES_FILE, 'rb')
+        except FileNotFoundError:
+            self._stamps, self._offsets, self._stamps_read = {}, {}, None
+            return self._stamps
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            header = f.readline()
+            if self._stamps_read is None or self._stamps_read[0] != inode:
+                # Compacted since, which moves every line
+                self._stamps, self._offsets = {}, {}
+                offset = len(header)
+            else:
+                offset = self._stamps_read[1]
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                change = json.loads(line)
+                self._stamps[change["task"]["id"]] = (change["time"], change["origin"])
+                self._offsets[change["task"]["id"]] = offset
+                offset += len(line)
+        self._stamps_read = (inode, offset)
+        return self._stamps
+    
+    def latest(self, task_ids):
+        """Get the latest change of each of task_ids, which must be in stamps(), as sync records"""
+        changes = []
+        with self._io_lock:
+            self.stamps()  # Offsets only hold until the next compaction, which waits for the lock
+            with open(CHANGES_FILE, 'rb') as f:
+                for task_id in task_ids:
+                    f.seek(self._offsets[task_id])
+                    change = json.loads(f.readline())
+                    del change["rev"]
+                    changes.append(change)
+        return changes
+    
+    def start_write_behind(self):
+        """Write changes from a background thread instead of the caller's"""
+        if self._saver is None:
+            self._saver = WriteBehindSaver(self.flush)
+            self._saver.start()
+    
+    def flush(self):
+        """Write changes queued for the write-behind saver"""
+        with self._lock:
+            changes, self._pending = self._pending, []
+        if changes:
+            self._append(changes)
+    
+    def save_status(self):
+        """Get "saved", "saving" or "save failed" """
+        saver = self._saver
+        if saver is not None and saver.error:
+            return "save failed"
+        if self._pending or (saver is not None and saver.saving):
+            return "saving"
+        return "saved"
+    
+    def close(self):
+        """Stop the saver and write any queued changes"""
+        if self._saver is not None:
+            self._saver.stop()
+            self._saver = None
+        self.flush()
+        self._close_file()
+    
+    def _writable(self):
+        """Get the log open for reading and writing, the caller holds the file lock
+        
+        Creates the log under a new origin if missing, and reopens it if another
+        process compacted it into a new file.
+        """
+        if self._file is not None:
+            try:
+                current = os.fstat(self._file.fileno()).st_ino == os.stat(CHANGES_FILE).st_ino
+            except FileNotFoundError:
+                current = False
+            if not current:
+                self._close_file()
+        if self._file is None:
+            if not os.path.exists(CHANGES_FILE):
+                if not os.path.exists(CONFIG_DIR):
+                    os.makedirs(CONFIG_DIR)
+                header = {"origin": new_task_id(), "compacted": 0}
+                write_atomic(CHANGES_FILE, lambda f: f.write(json.dumps(header) + "\n"))
+            self._file = open(CHANGES_FILE, 'rb+')
+            line = self._file.readline()
+            self._header, self._header_size = json.loads(line), len(line)
+        return self._file
+    
+    def _close_file(self):
+        """Close the log file handle if open"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def _append(self, changes):
+        """Number changes on from the latest revision and append them"""
+        with self._io_lock:
+            f = self._writable()
+            stat = os.fstat(f.fileno())
+            if self._tail is not None and self._tail[:2] == (stat.st_ino, stat.st_size):
+                end, revision = stat.st_size, self._tail[2]
+            else:
+                # Another process appended since, read its last revision
+                line, end = self._last_line(f, self._header_size)
+                revision = json.loads(line)["rev"] if line else 0
+                f.truncate(end)  # Drops a line torn by a crash
+            f.seek(end)
+            for change in changes:
+                revision += 1
+                origin = self._header["origin"] if change["origin"] is None else change["origin"]
+                line = {"rev": revision, "time": change["time"], "origin": origin}
+                if change.get("deleted"):
+                    line["deleted"] = True
+                line["task"] = change["task"]
+                f.write(json.dumps(line).encode() + b"\n")
+            f.flush()
+            end = f.tell()
+            self._tail = (stat.st_ino, end, revision)
+            if end - self._header_size > max(2 * self._header["compacted"], CHANGES_COMPACT_SIZE):
+                self._compact()
+    
+    def _compact(self):
+        """Rewrite the log keeping only the latest change of each task, the caller holds the file lock"""
+        with open(CHANGES_FILE, 'rb') as f:
+            header = json.loads(f.readline())
+            start = offset = f.tell()
+            latest = {}  # task id -> (offset, length) of its latest line
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                latest[json.loads(line)["task"]["id"]] = (offset, len(line))
+                offset += len(line)
+            keep = {line_offset for line_offset, length in latest.values()}
+            header["compacted"] = sum(length for line_offset, length in latest.values())
+            del latest
+            
+            def write(out):
+                out.write(json.dumps(header).encode() + b"\n")
+                f.seek(start)
+                position = start
+                for line in f:
+                    if position in keep:
+                        out.write(line)
+                    position += len(line)
+                    if position > offset:
+                        break
+            write_atomic(CHANGES_FILE, write, 'wb')
+        self._close_file()
+        self._tail = None
+    
+    @staticmethod
+    def _last_line(f, start):
+        """Get the last complete line after offset start and the offset it ends at, or (None, start)"""
+        end = f.seek(0, os.SEEK_END)
+        size = 4096
+        while True:
+            pos = max(start, end - size)
+            f.seek(pos)
+            data = f.read(end - pos)
+            last = data.rfind(b"\n")
+            if last >= 0:
+                first = data.rfind(b"\n", 0, last)
+                if first >= 0 or pos == start:
+                    return data[first + 1:last + 1], pos + last + 1
+            elif pos == start:
+                return None, start
+            size *= 4
+    
+    @staticmethod
+    def _seek_after(f, start, end, revision):
+        """Bisect for the offset of the first line after start whose revision is above revision"""
+        lo, hi = start, end  # Lines before lo are at or below revision, the one at hi is above it
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(mid - 1)
+            f.readline()  # Moves to the first line starting at or after mid
+            pos = f.tell()
+            if pos >= hi:
+                hi = mid
+                continue
+            line = f.readline()
+            if not line.endswith(b"\n") or json.loads(line)["rev"] > revision:
+                hi = pos
+            else:
+                lo = pos + len(line)
+        return lo
+
+
+class TaskManager:
+    """Manages task data and persistence through a storage backend"""
+    
+    def __init__(self, backend=None, load=True):
+        if backend is None:
+            storage = load_config()["storage"]
+            if storage not in STORAGE_BACKENDS:
+                raise ValueError(f"Unknown storage backend in {CONFIG_FILE}: {storage}")
+            backend = STORAGE_BACKENDS[storage]()
+        self.backend = backend
+        self.revision = 0  # Bumped on every change so views can skip redraws of unchanged data
+        self._rules = None  # id -> recurring task, fetched on first use
+        self._occurrences = {}  # (year, month) -> expanded occurrences of every rule in that month
+        self._search_index = None  # Built by the first search, then kept up to date
+        self._intervals = None  # IntervalTree of one-off tasks, built on first use, then kept up to date
+        self._conflicts = {}  # (id, start_time) -> whether that task overlaps another
+        self._conflict_days = {}  # (year, month) -> days on which an overlap begins
+        self._day_stats = {}  # (year, month) -> {day: (task count, completed count)}
+        self.changes = ChangeLog()  # Every change made through this manager, numbered for sync
+        if load:
+            self.load_tasks()
+        else:
+            self.backend.open()
+    
+    def add_task(self, task):
+        """Add a new task"""
+        self.backend.add_task(task)
+        self.changes.record([task])
+        self._forget_day_stats(task)
+        if task.recurrence:
+            self._invalidate_occurrences()
+        if self._search_index is not None:
+            self._search_index.add(task)
+        if self._intervals is not None and not task.recurrence:
+            self._intervals.add(task)
+        self._forget_conflicts()
+        self.revision += 1
+    
+    def add_tasks(self, tasks):
+        """Add many tasks with one sort and one persist, returning how many were added"""
+        added = self.backend.add_tasks(tasks, self.changes.record)
+        self._invalidate_occurrences()
+        self._search_index = None
+        self._intervals = None
+        self.revision += 1
+        return added
+    
+    def delete_task(self, task_id):
+        """Delete a task by id"""
+        task = self.backend.get_task(task_id)
+        if self.backend.delete_task(task_id):
+            if task is not None:
+                self.changes.record([task], deleted=True)
+            self._forget_day_stats(task)
+            if self._search_index is not None:
+                self._search_index.remove(task_id)
+            if self._intervals is not None:
+                self._intervals.remove(task_id)
+            self._forget_conflicts()
+            self._task_changed(task_id)
+            return True
+        return False
+    
+    def toggle_task_completion(self, task_id):
+        """Toggle task completion status"""
+        if self.backend.toggle_task_completion(task_id):
+            # Backends that return copies only have the toggled task after the change
+            task = self.backend.get_task(task_id)
+            self.changes.record([task])
+            self._forget_day_stats(task)
+            if self._search_index is not None:
+                self._search_index.remove(task_id)
+                self._search_index.add(task)
+            self._task_changed(task_id)
+            return True
+        return False
+    
+    def search(self, query, within=None, within_query=""):
+        """Get the tasks whose name has a word starting with each word of query, in start time order
+        
+        Pass the result of a query that this one extends as within, and that query as
+        within_query, to refine it instead of searching again. This keeps
+        search-as-you-type proportional to the matches.
+        """
+        if self._search_index is None:
+            self.page_in()
+            self._search_index = SearchIndex(self.iter_tasks())
+        return self._search_index.search(query, within, within_query)
+    
+    def page_in(self, start=None, end=None):
+        """Load archived tasks of the months overlapping [start, end), or of every month, returning whether any were added"""
+        if not self.backend.page_in(start, end):
+            return False
+        self._day_stats = {}
+        self._search_index = None
+        self._intervals = None
+        self._forget_conflicts()
+        self.revision += 1
+        return True
+    
+    def _task_changed(self, task_id):
+        """Bump the revision, dropping expanded occurrences if the task was a recurring one"""
+        if self._rules and task_id in self._rules:
+            self._invalidate_occurrences()
+        self.revision += 1
+    
+    def _invalidate_occurrences(self):
+        """Forget the recurring tasks and every month expanded from them"""
+        self._rules = None
+        self._occurrences = {}
+        self._day_stats = {}
+        self._forget_conflicts()
+    
+    def _forget_day_stats(self, task):
+        """Drop the cached day statistics of the month a task starts in"""
+        if task is not None:
+            self._day_stats.pop((task.start_time.year, task.start_time.month), None)
+    
+    def _forget_conflicts(self):
+        """Drop cached overlap results after tasks were added or removed"""
+        self._conflicts = {}
+        self._conflict_days = {}
+    
+    def get_occurrences(self, year, month):
+        """Get the occurrences of every recurring task in a month, expanded once and cached"""
+        occurrences = self._occurrences.get((year, month))
+        if occurrences is None:
+            self._has_rules()
+            start, end = month_bounds(year, month)
+            occurrences = [task.occurrence(start_time)
+                           for task in self._rules.values() if task.start_time < end
+                           for start_time in task.recurrence.occurrences(task.start_time, start, end)]
+            occurrences.sort(key=lambda task: task.start_time)
+            if len(self._occurrences) >= MAX_CACHED_MONTHS:
+                self._occurrences = {}
+            self._occurrences[(year, month)] = occurrences
+        return occurrences
+    
+    def get_task(self, task_id):
+        """Get a task by id, or None"""
+        return self.backend.get_task(task_id)
+    
+    def index_of(self, task_id):
+        """Get the position of a task in start time order, or None"""
+        return self.backend.index_of(task_id)
+    
+    def count(self):
+        """Get the number of tasks"""
+        return self.backend.count()
+    
+    def get_tasks_page(self, offset, limit):
+        """Get up to limit tasks in start time order beginning at offset"""
+        return self.backend.get_tasks_page(offset, limit)
+    
+    def iter_tasks(self, page_size=EXPORT_PAGE_SIZE):
+        """Yield every task in start time order, one page in memory at a time"""
+        return self._stored_tasks(None, None, page_size=page_size)
+    
+    def query(self, start=None, end=None, completed=None, text=None, limit=None, cursor=None, expand=False):
+        """Lazily yield the tasks starting in [start, end) in start time order
+        
+        completed keeps only completed (True) or pending (False) tasks, text only
+        the tasks search() finds for it, and limit stops after that many. Storage
+        is read a page at a time as the result is consumed. A recurring task is
+        yielded once as stored, or with expand, which needs start and end, as its
+        occurrences in the range. Pass the last task of a previous query with the
+        same filters as cursor to continue right after it. Archived months are
+        not paged in, except by text.
+        """
+        if expand and (start is None or end is None):
+            raise ValueError("Expanding recurring tasks needs both start and end")
+        if cursor is not None and (start is None or cursor.start_time >= start):
+            start = cursor.start_time
+        else:
+            cursor = None  # The range begins after it anyway
+        page_size = min(limit or EXPORT_PAGE_SIZE, EXPORT_PAGE_SIZE)
+        
+        if expand:
+            tasks = self._expanded_tasks(start, end, page_size)
+            if text:
+                ids = {task.id for task in self.search(text)}
+                tasks = (task for task in tasks if task.id in ids)
+        elif text:
+            tasks = self._search_results(text, start, end)
+        else:
+            # Stored tasks resume exactly after the cursor, however many share its start time
+            tasks = self._stored_tasks(start, end, cursor.id if cursor else None, page_size)
+            cursor = None
+        if cursor is not None:
+            tasks = self._after_cursor(tasks, cursor)
+        if completed is not None:
+            tasks = (task for task in tasks if task.completed == completed)
+        return itertools.islice(tasks, limit)
+    
+    def _stored_tasks(self, start, end, after=None, page_size=EXPORT_PAGE_SIZE):
+        """Get an iterator over stored tasks starting in [start, end), after the task with id after if given"""
+        return itertools.chain.from_iterable(self._stored_pages(start, end, after, page_size))
+    
+    def _stored_pages(self, start, end, after, page_size):
+        """Yield pages of stored tasks starting in [start, end), each read when the previous one is used up"""
+        while True:
+            page = self.backend.get_tasks_from(start, end, page_size, after)
+            yield page
+            if len(page) < page_size:
+                return
+            # Continue from the last task rather than an offset, so changes between pages shift nothing
+            after, start = page[-1].id, page[-1].start_time
+    
+    def _expanded_tasks(self, start, end, page_size=EXPORT_PAGE_SIZE):
+        """Get an iterator over the tasks and recurring task occurrences starting in [start, end)"""
+        tasks = self._stored_tasks(start, end, page_size=page_size)
+        if not self._has_rules():
+            return tasks
+        # Stored recurring tasks stand for their whole series, their first occurrence included
+        tasks = (task for task in tasks if task.recurrence is None)
+        return heapq.merge(tasks, self._occurrences_between(start, end), key=lambda task: task.start_time)
+    
+    def _occurrences_between(self, start, end):
+        """Yield the occurrences of every recurring task starting in [start, end), a month at a time"""
+        year, month = start.year, start.month
+        while datetime.datetime(year, month, 1) < end:
+            for occurrence in self.get_occurrences(year, month):
+                if start <= occurrence.start_time < end:
+                    yield occurrence
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    
+    def _search_results(self, text, start, end):
+        """Yield the tasks search() finds for text that start in [start, end)"""
+        for task in self.search(text):
+            if start is not None and task.start_time < start:
+                continue
+            if end is not None and task.start_time >= end:
+                return
+            yield task
+    
+    @staticmethod
+    def _after_cursor(tasks, cursor):
+        """Yield the tasks that come after cursor, a task listed earlier in the same order"""
+        tasks = iter(tasks)
+        for task in tasks:
+            if task.start_time > cursor.start_time:
+                yield task
+                break
+            if task.start_time == cursor.start_time and task.id == cursor.id:
+                break
+        yield from tasks
+    
+    def get_tasks_between(self, start, end):
+        """Get all tasks and recurring task occurrences starting in [start, end)
+        
+        Reads the range in one slice, for short ranges such as a day, where
+        query() paging costs more than it saves.
+        """
+        tasks = self.backend.get_tasks_between(start, end)
+        if not self._has_rules():
+            return tasks
+        return list(heapq.merge((task for task in tasks if task.recurrence is None),
+                                self._occurrences_between(start, end), key=lambda task: task.start_time))
+    
+    def get_tasks_for_date(self, date):
+        """Get all tasks for a specific date"""
+        start = datetime.datetime.combine(date, datetime.time.min)
+        return self.get_tasks_between(start, start + datetime.timedelta(days=1))
+    
+    def get_month_counts(self, year, month):
+        """Get a {day: task count} mapping for a whole month, recurring task occurrences included"""
+        return {day: count for day, (count, completed) in self.get_month_stats(year, month)[0].items()}
+    
+    def get_month_stats(self, year, month, months=1):
+        """Get a {day: (task count, completed count)} mapping for each of months months from year/month
+        
+        Months are cached until a task in them changes. The ones missing are
+        aggregated together in one pass over storage, so a year costs one range
+        scan rather than one per month or per day.
+        """
+        keys = []
+        for _ in range(months):
+            keys.append((year, month))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        
+        missing = [key for key in keys if key not in self._day_stats]
+        if missing and len(self._day_stats) + len(missing) > MAX_CACHED_MONTHS:
+            self._day_stats = {}
+            missing = keys
+        if missing:
+            first, last = keys.index(missing[0]), keys.index(missing[-1])
+            stats = {key: {} for key in keys[first:last + 1]}
+            for date, day_stats in self.backend.get_day_stats(month_bounds(*missing[0])[0],
+                                                               month_bounds(*missing[-1])[1]).items():
+                stats[(date.year, date.month)][date.day] = day_stats
+            if self._has_rules():
+                for key, days in stats.items():
+                    self._add_occurrence_stats(key, days)
+            self._day_stats.update(stats)
+        return [self._day_stats[key] for key in keys]
+    
+    def _add_occurrence_stats(self, key, days):
+        """Count a month's recurring task occurrences in days instead of the stored series"""
+        start, end = month_bounds(*key)
+        for task in self._rules.values():
+            if start <= task.start_time < end:
+                # Counted again below if it is an occurrence
+                count, completed = days[task.start_time.day]
+                days[task.start_time.day] = (count - 1, completed - task.completed)
+        for occurrence in self.get_occurrences(*key):
+            count, completed = days.get(occurrence.start_time.day, (0, 0))
+            days[occurrence.start_time.day] = (count + 1, completed + occurrence.completed)
+        for day in [day for day, (count, completed) in days.items() if not count]:
+            del days[day]
+    
+    def get_overlapping(self, start, end):
+        """Get the tasks and recurring task occurrences whose time span overlaps [start, end), in start order"""
+        if self._intervals is None:
+            self._intervals = IntervalTree(task for task in self.iter_tasks() if not task.recurrence)
+        tasks = self._intervals.overlapping(start, end)
+        if not self._has_rules():
+            return tasks
+        
+        # Occurrences starting the day before may still be running at start
+        first = start - datetime.timedelta(days=1)
+        year, month = first.year, first.month
+        while datetime.datetime(year, month, 1) < end:
+            tasks.extend(occurrence for occurrence in self.get_occurrences(year, month)
+                         if occurrence.end_time and occurrence.start_time < end and occurrence.end_time > start)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        tasks.sort(key=lambda task: task.start_time)
+        return tasks
+    
+    def find_conflicts(self, start, end, task_id=None):
+        """Get the tasks overlapping [start, end), other than the task with task_id"""
+        if end is None:
+            return []
+        return [task for task in self.get_overlapping(start, end) if task.id != task_id]
+    
+    def has_conflict(self, task):
+        """Check whether a task overlaps any other, cached until tasks are added or removed"""
+        key = (task.id, task.start_time)
+        conflict = self._conflicts.get(key)
+        if conflict is None:
+            conflict = self._conflicts[key] = bool(self.find_conflicts(task.start_time, task.end_time, task.id))
+        return conflict
+    
+    def get_conflict_days(self, year, month):
+        """Get the days of a month on which an overlap begins, from one sweep over the month's intervals"""
+        days = self._conflict_days.get((year, month))
+        if days is None:
+            start, end = month_bounds(year, month)
+            days = set()
+            latest_end = None
+            for task in self.get_overlapping(start, end):
+                if latest_end is not None and task.start_time < latest_end and task.start_time >= start:
+                    days.add(task.start_time.day)
+                if latest_end is None or task.end_time > latest_end:
+                    latest_end = task.end_time
+            self._conflict_days[(year, month)] = days
+        return days
+    
+    def find_free_slot(self, date, minutes, after=None):
+        """Get the start of the first gap of minutes on date, no earlier than after, or None if there is none"""
+        cursor = datetime.datetime.combine(date, datetime.time.min)
+        day_end = cursor + datetime.timedelta(days=1)
+        if after is not None and after > cursor:
+            cursor = after
+        length = datetime.timedelta(minutes=minutes)
+        for task in self.get_overlapping(cursor, day_end):
+            if task.start_time - cursor >= length:
+                return cursor
+            if task.end_time > cursor:
+                cursor = task.end_time
+        return cursor if day_end - cursor >= length else None
+    
+    def _has_rules(self):
+        """Check whether any task recurs, fetching the rules on first use"""
+        if self._rules is None:
+            self._rules = {task.id: task for task in self.backend.get_recurring_tasks()}
+        return bool(self._rules)
+    
+    def count_before(self, start):
+        """Get the index of the first task starting at or after start"""
+        return self.backend.count_before(start)
+    
+    def save_tasks(self):
+        """Persist any pending changes"""
+        self.backend.save_tasks()
+    
+    def load_range(self, start, end):
+        """Load only the tasks queries of [start, end) need, for commands that only read"""
+        self.backend.load_range(start, end)
+        self._invalidate_occurrences()
+        self._search_index = None
+        self._intervals = None
+        self.revision += 1
+    
+    def load_tasks(self):
+        """Load tasks from storage"""
+        self.backend.load_tasks()
+        self._invalidate_occurrences()
+        self._search_index = None
+        self._intervals = None
+        self.revision += 1
+    
+    def start_write_behind(self):
+        """Persist changes from a background thread so the UI never waits on disk"""
+        self.backend.start_write_behind()
+        self.changes.start_write_behind()
+    
+    def save_status(self):
+        """Get "saved", "saving", "save failed" or "edit lost", covering the task store and the change log"""
+        statuses = (self.backend.save_status(), self.changes.save_status())
+        for status in ("save failed", "saving", "edit lost"):
+            if status in statuses:
+                return status
+        return "saved"
+    
+    def reload_changes(self):
+        """Pick up changes other processes made to storage, returning whether anything changed"""
+        if self.backend.reload_changes():
+            self._invalidate_occurrences()
+            self._search_index = None
+            self._intervals = None
+            self.revision += 1
+            return True
+        return False
+    
+    def changes_since(self, revision=None):
+        """Get sync records of the tasks changed after revision, or of every task if revision is None
+        
+        Every task includes those stored before the change log began, as
+        changed at time 0 by no origin, older than any logged change.
+        """
+        changes = self.changes.changes_since(revision or 0)
+        if revision is None:
+            self.page_in()
+            logged = {change["task"]["id"] for change in changes}
+            changes.extend({"time": 0.0, "origin": "", "task": task.to_dict()}
+                           for task in self.iter_tasks() if task.id not in logged)
+        return changes
+    
+    def apply_changes(self, changes, stamps):
+        """Apply sync records from another store, last writer wins per task, returning the ones applied
+        
+        stamps maps task ids to the (time, origin) of their latest change here.
+        A stored task missing from it counts as older than any logged change. A
+        record replaces the task only if it is newer, and is then logged under
+        its own time and origin, so it wins or loses the same way everywhere.
+        """
+        incoming = [(change, Task.from_dict(change["task"])) for change in changes]
+        # Replaced tasks may be archived, and every record carries the task's start time
+        for key in {(task.start_time.year, task.start_time.month) for change, task in incoming}:
+            self.page_in(*month_bounds(*key))
+        
+        applied, added = [], []
+        for change, task in incoming:
+            local = self.backend.get_task(task.id)
+            stamp = stamps.get(task.id)
+            if stamp is None and local is not None:
+                stamp = (0.0, "")
+            if stamp is not None and tuple(stamp) >= (change["time"], change["origin"]):
+                continue
+            if local is not None:
+                self.backend.delete_task(task.id)
+            if not change.get("deleted"):
+                added.append(task)
+            applied.append(change)
+        # Past a journal's worth of records, one merge and one snapshot is cheaper
+        if len(added) > JOURNAL_COMPACT_THRESHOLD:
+            self.backend.add_tasks(added)
+        else:
+            for task in added:
+                self.backend.add_task(task)
+        
+        if applied:
+            # Records from no origin are logged too, it is how stores that already
+            # synced with this one learn of tasks another store had before its log began
+            self.changes.append(applied)
+            self._invalidate_occurrences()
+            self._search_index = None
+            self._intervals = None
+            self.revision += 1
+        return applied
+    
+    def close(self):
+        """Flush and close storage"""
+        self.backend.close()
+        self.changes.close()
+
+
+class DamageTracker:
+    """Remembers what each region of a window shows so unchanged output is never rewritten"""
+    
+    def __init__(self, window):
+        self.window = window
+        self.regions = {}  # (y, x) -> (text, attr) last written there
+    
+    def invalidate(self):
+        """Blank the window and forget all regions, forcing a full repaint"""
+        self.window.erase()
+        self.regions = {}
+        self.window.box()
+    
+    def put(self, y, x, text, attr=0, width=None):
+        """Write text at (y, x), padded to width, unless the region already shows it"""
+        if width is not None:
+            text = text[:width].ljust(width)
+        if self.regions.get((y, x)) == (text, attr):
+            return False
+        self.window.addstr(y, x, text, attr)
+        self.regions[(y, x)] = (text, attr)
+        return True
+
+
+class CalendarView:
+    """Calendar visualization component: a month, a three month strip or a year heatmap"""
+    
+    VIEWS = ["month", "quarter", "year"]  # Cycled through with 'v'
+    VIEW_NAMES = {"month": "month", "quarter": "3 months", "year": "year"}
+    STEPS = {"month": 1, "quarter": 3, "year": 12}  # Months moved by 'p' and 'n'
+    DENSITY = "░▒▓█"  # Heatmap shades for the busiest quarter of days last
+    
+    def __init__(self, window, task_manager):
+        self.window = window
+        self.task_manager = task_manager
+        self.current_date = datetime.date.today()
+        self.view = "month"
+        self.panel = panel.new_panel(window)
+        self.screen = DamageTracker(window)
+        self._layout = None  # (view, year, month, height, width) of the drawn frame
+        self._revision = None  # Task data revision the drawn counts came from
+        self._grids = {}  # (year, month, width) -> month grid geometry, kept until the window resizes
+        
+    def resize(self, height, width, y, x):
+        """Fit the window to a new pane in place, laying the calendar out again on the next draw"""
+        # Taking the new size before moving keeps the window inside the screen at its new corner
+        self.window.resize(height, width)
+        self.panel.move(y, x)
+        self._layout = None
+        self._grids = {}
+    
+    def draw(self):
+        """Draw the calendar view, touching only cells whose task counts changed"""
+        height, width = self.window.getmaxyx()
+        layout = (self.view, self.current_date.year, self.current_date.month, height, width)
+        if layout == self._layout and self.task_manager.revision == self._revision:
+            return
+        
+        if self.view == "month":
+            self._draw_month(layout, height, width)
+        else:
+            self._draw_overview(layout, height, width)
+        self._revision = self.task_manager.revision
+        
+        self.window.noutrefresh()
+    
+    def _draw_month(self, layout, height, width):
+        """Draw one month with a task count per day"""
+        day_width, cells = self._month_grid(self.current_date.year, self.current_date.month, width)
+        
+        if layout != self._layout:
+            self._draw_frame(width, height, day_width, cells)
+            self._layout = layout
+        
+        # Task counts for every day of the month in a single lookup
+        task_counts = self.task_manager.get_month_counts(self.current_date.year, self.current_date.month)
+        conflict_days = self.task_manager.get_conflict_days(self.current_date.year, self.current_date.month)
+        
+        for day, day_str, y, day_x, indicator_x, indicator_width in cells:
+            day_count = task_counts.get(day, 0)
+            conflict = bool(day_count) and day in conflict_days
+            task_indicator = self._day_indicator(day_count, conflict, indicator_width) if day_count else ""
+            indicator_attr = curses.A_BOLD | (curses.A_REVERSE if conflict else 0)
+            self.screen.put(y, indicator_x, task_indicator, indicator_attr, indicator_width)
+    
+    @staticmethod
+    def _day_indicator(count, conflict, width):
+        """Get the widest of "[n]", "n" and a lone mark that fits width, "!" marking an overlap
+        
+        Narrow cells drop the brackets, then the count, but never cut digits off it.
+        """
+        mark = "!" if conflict else ""
+        for indicator in (f"[{count}{mark}]", f"{count}{mark}", mark or "*"):
+            if len(indicator) <= width:
+                return indicator
+        return ""
+    
+    def _month_grid(self, year, month, width):
+        """Get the cell width and the (day, label, y, x, indicator x, indicator width) of each day of a month
+        
+        The geometry only depends on the month and the window width, so it is
+        worked out once per month shown and reused by every redraw of counts.
+        """
+        key = (year, month, width)
+        grid = self._grids.get(key)
+        if grid is None:
+            # Keeping the border out of the last column leaves Sunday's indicator as much room as the others'
+            day_width = (width - 2) // 7
+            offset = datetime.date(year, month, 1).weekday()  # 0 = Monday, 6 = Sunday
+            cells = []
+            for day in range(1, self._days_in_month(year, month) + 1):
+                week, weekday = divmod(offset + day - 1, 7)
+                day_str = str(day)
+                x = weekday * day_width + 2
+                indicator_x = x + len(day_str) + 1
+                # The indicator may run up to a space before the next day's label
+                indicator_width = x + day_width - 1 - indicator_x
+                cells.append((day, day_str, week * 3 + 5, x, indicator_x, max(0, indicator_width)))
+            grid = self._grids[key] = (day_width, cells)
+        return grid
+    
+    def _draw_frame(self, width, height, day_width, cells):
+        """Draw the parts of the month that only change with the month or window size"""
+        self.screen.invalidate()
+        
+        # Draw calendar header
+        month_year = self.current_date.strftime("%B %Y")
+        self.window.addstr(1, (width - len(month_year)) // 2, month_year, curses.A_BOLD)
+        
+        # Draw weekday headers
+        weekdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+        for i, day in enumerate(weekdays):
+            x = i * day_width + (day_width - len(day)) // 2
+            self.window.addstr(3, x, day)
+        
+        # Draw day numbers
+        for day, day_str, y, x, indicator_x, indicator_width in cells:
+            if day == self.current_date.day and self.current_date.month == datetime.date.today().month:
+                self.window.addstr(y, x, day_str, curses.A_REVERSE)
+            else:
+                self.window.addstr(y, x, day_str)
+        
+        self._draw_navigation(width, height)
+    
+    def _draw_navigation(self, width, height):
+        """Draw the key help on the bottom line"""
+        nav_text = f"< Prev [p] | Next [n] > | [v] {self.VIEW_NAMES[self._following_view()]}"
+        self.window.addstr(height - 2, max(1, (width - len(nav_text)) // 2), nav_text[:max(0, width - 2)])
+    
+    def _overview_months(self):
+        """Get the (year, month) pairs shown by the strip or year view"""
+        if self.view == "year":
+            return [(self.current_date.year, month) for month in range(1, 13)]
+        # The strip is centred on the current month
+        index = self.current_date.year * 12 + self.current_date.month - 2
+        return [((index + i) // 12, (index + i) % 12 + 1) for i in range(3)]
+    
+    def _overview_grid(self, width, height, months):
+        """Get the cell width, block width and the (y, x) corner of each month block that fits the window
+        
+        A block is a title line, a weekday line and six week lines. The year
+        view packs up to three months per row with two column cells, the strip
+        stacks its months with cells wide enough for day numbers.
+        """
+        if self.view == "year":
+            columns, cell = max(1, min(3, (width - 2) // 17)), 2
+        else:
+            columns, cell = 1, max(3, (width - 4) // 7)
+        column_width = (width - 2) // columns
+        corners = []
+        for i in range(len(months)):
+            row, column = divmod(i, columns)
+            y, x = 3 + row * 9, 2 + column * column_width
+            corners.append((y, x) if y + 7 <= height - 3 else None)
+        return cell, max(cell * 7, column_width - 2), corners
+    
+    def _draw_overview(self, layout, height, width):
+        """Draw several months as day cells shaded by task density and marked by completion"""
+        months = self._overview_months()
+        cell, block_width, corners = self._overview_grid(width, height, months)
+        if layout != self._layout:
+            self._draw_overview_frame(width, height, months, cell, corners)
+            self._layout = layout
+        
+        # Every month comes from the per-month cache, the missing ones from a single aggregation pass
+        stats = self.task_manager.get_month_stats(*months[0], len(months))
+        busiest = max((count for days in stats for count, completed in days.values()), default=0)
+        today = datetime.date.today()
+        
+        for (year, month), days, corner in zip(months, stats, corners):
+            if corner is None:
+                continue
+            y, x = corner
+            total = sum(count for count, completed in days.values())
+            done = sum(completed for count, completed in days.values())
+            first = datetime.date(year, month, 1)
+            if cell >= 5:
+                title = f"{first:%B %Y}  " + (f"{total} tasks, {done * 100 // total}% done" if total else "no tasks")
+            else:
+                title = f"{first:%b} {total:>4} {done * 100 // total if total else 0:>3}%"
+            self.screen.put(y, x, title, curses.A_BOLD, block_width)
+            
+            offset = datetime.date(year, month, 1).weekday()
+            for day in range(1, self._days_in_month(year, month) + 1):
+                week, weekday = divmod(offset + day - 1, 7)
+                count, completed = days.get(day, (0, 0))
+                text, attr = self._heat_cell(count, completed, busiest)
+                if datetime.date(year, month, day) == today:
+                    attr |= curses.A_REVERSE
+                if cell >= 5:
+                    # Day numbers are part of the frame, the shade fills the rest of the cell
+                    self.screen.put(y + 2 + week, x + weekday * cell + 3, text * (cell - 4), attr)
+                else:
+                    self.screen.put(y + 2 + week, x + weekday * cell, text, attr)
+    
+    def _heat_cell(self, count, completed, busiest):
+        """Get the shade and attribute of a day: density relative to the busiest day, bold while work is pending, dim once all is done"""
+        if not count:
+            return "·", curses.A_DIM
+        shade = self.DENSITY[min(len(self.DENSITY) - 1, (count * len(self.DENSITY) - 1) // busiest)]
+        if completed == count:
+            return shade, curses.A_DIM
+        return shade, curses.A_BOLD if not completed else 0
+    
+    def _draw_overview_frame(self, width, height, months, cell, corners):
+        """Draw the parts of the strip or year view that only change with the months shown or window size"""
+        self.screen.invalidate()
+        
+        if self.view == "year":
+            title = str(self.current_date.year)
+        else:
+            first, last = datetime.date(*months[0], 1), datetime.date(*months[-1], 1)
+            title = f"{first:%b %Y} - {last:%b %Y}"
+        self.window.addstr(1, max(1, (width - len(title)) // 2), title, curses.A_BOLD)
+        
+        weekdays = ["Mo", "Tu", "We", "Th", "Fr", "Sa", "Su"]
+        for (year, month), corner in zip(months, corners):
+            if corner is None:
+                continue
+            y, x = corner
+            for i, day in enumerate(weekdays):
+                self.window.addstr(y + 1, x + i * cell, day[:max(1, cell - 1)])
+            if cell >= 5:
+                offset = datetime.date(year, month, 1).weekday()
+                for day in range(1, self._days_in_month(year, month) + 1):
+                    week, weekday = divmod(offset + day - 1, 7)
+                    self.window.addstr(y + 2 + week, x + weekday * cell, f"{day:>2}")
+        
+        self._draw_navigation(width, height)
+    
+    def _following_view(self):
+        """Get the view 'v' switches to"""
+        return self.VIEWS[(self.VIEWS.index(self.view) + 1) % len(self.VIEWS)]
+    
+    def next_view(self):
+        """Switch between the month, strip and year views; returns whether archived tasks were paged in"""
+        self.view = self._following_view()
+        return self._moved()
+    
+    def next_month(self):
+        """Move to the next month, or the next three months or year in the overviews"""
+        self._shift(self.STEPS[self.view])
+        return self._moved()
+    
+    def prev_month(self):
+        """Move to the previous month, or the previous three months or year in the overviews"""
+        self._shift(-self.STEPS[self.view])
+        return self._moved()
+    
+    def _shift(self, months):
+        """Move the current date by months, keeping the day within the new month"""
+        index = self.current_date.year * 12 + self.current_date.month - 1 + months
+        year, month = index // 12, index % 12 + 1
+        self.current_date = datetime.date(year, month, min(self.current_date.day, self._days_in_month(year, month)))
+    
+    def _moved(self):
+        """Redraw after navigating, paging in archived tasks of a shown month; returns whether any were added
+        
+        The overviews count archived days from the archive manifest, only the month
+        view needs the tasks themselves for its overlap marks.
+        """
+        paged_in = False
+        if self.view == "month":
+            paged_in = self.task_manager.page_in(*month_bounds(self.current_date.year, self.current_date.month))
+        self.draw()
+        return paged_in
+    
+    def _days_in_month(self, year, month):
+        """Helper method to get the number of days in a month"""
+        if month == 12:
+            return 31
+        return (datetime.date(year, month + 1, 1) - datetime.timedelta(days=1)).day
+
+
+class TaskListModel:
+    """Virtualized task list: fetches only the visible page and caches formatted rows"""
+    
+    MAX_CACHED_ROWS = 4096
+    
+    def __init__(self, task_manager):
+        self.task_manager = task_manager
+        self._rows = {}  # (name, start_time, completed) -> formatted row text
+        self._width = None
+        self._page_key = None  # (offset, limit, revision) the cached page was fetched for
+        self._page = []
+        self._page_tasks = []
+        self._count_revision = None
+        self._count = 0
+        self.results = None  # Start time ordered search results shown instead of every task
+    
+    def set_results(self, tasks):
+        """Show only tasks, a start time ordered list, or every task again when None"""
+        self.results = tasks
+        self._page_key = None
+        self._count_revision = None
+    
+    def count(self):
+        """Get the number of tasks, cached until the data changes"""
+        if self.results is not None:
+            return len(self.results)
+        if self._count_revision != self.task_manager.revision:
+            self._count = self.task_manager.count()
+            self._count_revision = self.task_manager.revision
+        return self._count
+    
+    def visible_rows(self, offset, limit, width):
+        """Get the formatted rows for the page starting at offset"""
+        if width != self._width:
+            self._rows = {}
+            self._width = width
+            self._page_key = None
+        
+        page_key = (offset, limit, self.task_manager.revision)
+        if page_key != self._page_key:
+            self._page_tasks = self._fetch(offset, limit)
+            self._page = [self._format_row(task, self.task_manager.has_conflict(task))
+                          for task in self._page_tasks]
+            self._page_key = page_key
+        return self._page
+    
+    def task_at(self, index):
+        """Get the task at a list position, from the visible page when possible"""
+        if self._page_key and self._page_key[2] == self.task_manager.revision:
+            offset = self._page_key[0]
+            if offset <= index < offset + len(self._page_tasks):
+                return self._page_tasks[index - offset]
+        page = self._fetch(index, 1)
+        return page[0] if page else None
+    
+    def _fetch(self, offset, limit):
+        """Get up to limit tasks beginning at offset from the search results or storage"""
+        if self.results is not None:
+            return self.results[offset:offset + limit]
+        if self._page_key and self._page_key[2] == self.task_manager.revision:
+            # Scrolling: continue from the task above the page instead of counting offset tasks
+            above = offset - 1 - self._page_key[0]
+            if 0 <= above < len(self._page_tasks):
+                return list(self.task_manager.query(limit=limit, cursor=self._page_tasks[above]))
+        return self.task_manager.get_tasks_page(offset, limit)
+    
+    def _format_row(self, task, conflict=False):
+        """Format a task for display, reusing the cached text when the task is unchanged"""
+        key = (task.name, task.start_time, task.completed, task.recurrence, conflict)
+        row = self._rows.get(key)
+        if row is None:
+            # Format task display
+            checkbox = "[X]" if task.completed else "[ ]"
+            date_str = task.start_time.strftime("%Y-%m-%d %H:%M")
+            marks = f" ↻ {task.recurrence.describe()}" if task.recurrence else ""
+            if conflict:
+                marks += " (overlaps)"
+            
+            # Truncate task name if needed
+            max_name_len = self._width - 25 - len(marks)
+            task_name = task.name[:max_name_len] + "..." if len(task.name) > max_name_len else task.name
+            
+            row = f"{checkbox} {date_str} {task_name}{marks}"
+            if len(self._rows) >= self.MAX_CACHED_ROWS:
+                self._rows = {}
+            self._rows[key] = row
+        return row
+
+
+class TaskListView:
+    """Task list and task entry component"""
+    
+    def __init__(self, window, task_manager):
+        self.window = window
+        self.task_manager = task_manager
+        self.model = TaskListModel(task_manager)
+        self.panel = panel.new_panel(window)
+        self.selected_index = 0
+        self.offset = 0  # For scrolling
+        self.mode = "list"  # "list" or "entry"
+        self.screen = DamageTracker(window)
+        self._layout = None  # (mode, height, width) of the drawn frame
+        self._page_rows = max(0, window.getmaxyx()[0] - 10)  # Task rows that fit, worked out again on resize
+        self.error_message = ""
+        self.message_expires = None  # time.monotonic() at which error_message is cleared
+        
+        # Search mode state
+        self.search_query = ""
+        self._search_stack = []  # (query, results) for each query typed since the search began
+        self._list_position = (0, 0)  # (selected_index, offset) restored when a search is cancelled
+        
+        # Task entry fields
+        self.task_name = ""
+        self.task_date = datetime.date.today().strftime("%Y-%m-%d")
+        self.task_time = datetime.datetime.now().strftime("%H:%M")
+        self.end_time = ""
+        self.entry_field = 0  # 0: name, 1: date, 2: time, 3: end time
+        self._confirmed_overlap = None  # (start, end) the user chose to save despite overlaps
+        
+    def resize(self, height, width, y, x):
+        """Fit the window to a new pane in place, keeping the selection in view of the new page size"""
+        self.window.resize(height, width)
+        self.panel.move(y, x)
+        self._layout = None
+        self._page_rows = max(0, height - 10)
+        self._select(self.selected_index)
+    
+    def draw(self):
+        """Draw the task list view, rewriting only rows that changed"""
+        height, width = self.window.getmaxyx()
+        line_width = max(0, width - 4)
+        
+        layout = (self.mode, height, width)
+        if layout != self._layout:
+            self._draw_frame(width, height)
+            self._layout = layout
         
         # Draw tasks
-        if self.mode == "list":
-            tasks_per_page = height - 10
+        if self.mode in ("list", "search"):
+            tasks_per_page = self._page_size()
+            rows = self.model.visible_rows(self.offset, tasks_per_page, width)
             
-            if self.task_manager.tasks:
-                for i in range(min(tasks_per_page, len(self.task_manager.tasks) - self.offset)):
-                    task_idx = i + self.offset
-                    task = self.task_manager.tasks[task_idx]
-                    
-                    # Format task display
-                    checkbox = "[X]" if task.completed else "[ ]"
-                    date_str = task.start_time.strftime("%Y-%m-%d")
-                    time_str = task.start_time.strftime("%H:%M")
-                    
-                    # Truncate task name if needed
-                    max_name_len = width - 25
-                    task_name = task.name[:max_name_len] + "..." if len(task.name) > max_name_len else task.name
-                    
-                    task_display = f"{checkbox} {date_str} {time_str} {task_name}"
+            for i in range(tasks_per_page):
+                task_idx = i + self.offset
+                attr = 0
+                if i < len(rows):
+                    line = rows[i]
                     
                     # Highlight selected task
                     attr = curses.A_REVERSE if task_idx == self.selected_index else 0
-                    self.window.addstr(3 + i, 2, task_display, attr)
-            else:
-                self.window.addstr(3, 2, "No tasks. Press 'a' to add a task.")
-            
-            # Draw controls
-            controls = "[a]dd | [d]elete | [Space] toggle | [↑/↓] navigate"
-            self.window.addstr(height - 6, (width - len(controls)) // 2, controls)
+                elif i == 0 and self.offset == 0:
+                    line = "No matching tasks." if self.mode == "search" else "No tasks. Press 'a' to add a task."
+                else:
+                    line = ""
+                self.screen.put(3 + i, 2, line, attr, line_width)
             
+            if self.mode == "search":
+                matches = "" if self.model.results is None else f"  ({len(self.model.results)} found)"
+                self.screen.put(height - 4, 2, f"/{self.search_query}{matches}", curses.A_BOLD, line_width)
+        
         # Draw task entry form
         elif self.mode == "entry":
-            self.window.addstr(3, 2, "Task Name:")
-            self.window.addstr(4, 4, self.task_name)
-            
-            self.window.addstr(6, 2, "Date (YYYY-MM-DD):")
-            self.window.addstr(7, 4, self.task_date)
-            
-            self.window.addstr(9, 2, "Time (HH:MM):")
-            self.window.addstr(10, 4, self.task_time)
-            
-            self.window.addstr(12, 2, "End Time (HH:MM, optional):")
-            self.window.addstr(13, 4, self.end_time)
+            self.screen.put(4, 4, self.task_name, 0, max(0, width - 6))
+            self.screen.put(7, 4, self.task_date, 0, max(0, width - 6))
+            self.screen.put(10, 4, self.task_time, 0, max(0, width - 6))
+            self.screen.put(13, 4, self.end_time, 0, max(0, width - 6))
             
             # Highlight current field
             y_positions = [4, 7, 10, 13]
-            self.window.addstr(y_positions[self.entry_field], 2, ">")
+            for field, y in enumerate(y_positions):
+                self.screen.put(y, 2, ">" if field == self.entry_field else " ")
             
-            # Draw controls
+            self.screen.put(height - 4, 2, self.error_message, curses.A_BOLD, line_width)
+        
+        self.window.noutrefresh()
+    
+    def _draw_frame(self, width, height):
+        """Draw the parts of the view that only change with the mode or window size"""
+        self.screen.invalidate()
+        
+        # Draw header
+        header = "Task List"
+        self.window.addstr(1, (width - len(header)) // 2, header, curses.A_BOLD)
+        
+        if self.mode == "list":
+            controls = "[a]dd | [d]elete | [Space] toggle | [↑/↓] navigate"
+        elif self.mode == "search":
+            controls = "Type to search | [Enter] go to task | [Esc] cancel"
+        else:
+            self.window.addstr(3, 2, "Task Name:")
+            self.window.addstr(6, 2, "Date (YYYY-MM-DD):")
+            self.window.addstr(9, 2, "Time (HH:MM):")
+            self.window.addstr(12, 2, "End Time (HH:MM, optional):")
             controls = "[Enter] next field | [Esc] cancel | [Tab] save"
-            self.window.addstr(height - 6, (width - len(controls)) // 2, controls)
         
-        self.window.box()
-        self.window.refresh()
+        # Draw controls, cut to narrow panes
+        self.window.addstr(height - 6, max(1, (width - len(controls)) // 2), controls[:max(0, width - 2)])
     
     def handle_key(self, key):
         """Handle key presses"""
         if self.mode == "list":
             return self._handle_list_key(key)
+        elif self.mode == "search":
+            return self._handle_search_key(key)
         elif self.mode == "entry":
             return self._handle_entry_key(key)
     
@@ -344,47 +3625,160 @@ class TaskListView:
             self.task_time = datetime.datetime.now().strftime("%H:%M")
             self.end_time = ""
             self.entry_field = 0
+            self._confirmed_overlap = None
             self.draw()
             return True
         
         elif key == ord('d'):
-            if self.task_manager.tasks:
-                self.task_manager.delete_task(self.selected_index)
-                if self.selected_index >= len(self.task_manager.tasks) and self.selected_index > 0:
-                    self.selected_index -= 1
+            task = self.model.task_at(self.selected_index)
+            if task:
+                self.task_manager.delete_task(task.id)
+                self._select(self.selected_index)
                 self.draw()
             return True
         
         elif key == ord(' '):
-            if self.task_manager.tasks:
-                self.task_manager.toggle_task_completion(self.selected_index)
+            task = self.model.task_at(self.selected_index)
+            if task:
+                self.task_manager.toggle_task_completion(task.id)
                 self.draw()
             return True
         
-        elif key == curses.KEY_UP:
-            if self.task_manager.tasks and self.selected_index > 0:
-                self.selected_index -= 1
-                # Adjust offset for scrolling
-                if self.selected_index < self.offset:
-                    self.offset = self.selected_index
-                self.draw()
+        elif key == ord('/'):
+            # Searches cover archived months, page them in while the selection can still be kept
+            selected = self.model.task_at(self.selected_index)
+            if self.task_manager.page_in():
+                self.keep_selected(selected)
+            self.mode = "search"
+            self._list_position = (self.selected_index, self.offset)
+            self._search_stack = []
+            self._update_search("")
+            self.draw()
+            return True
+        
+        return self._handle_navigation_key(key)
+    
+    def _handle_search_key(self, key):
+        """Handle keys in search mode, filtering the list on every keystroke"""
+        if key in (27, 10):  # Escape cancels, Enter jumps to the selected match
+            task = self.model.task_at(self.selected_index) if key == 10 else None
+            self.mode = "list"
+            self.model.set_results(None)
+            self.selected_index, self.offset = self._list_position
+            if task:
+                self._select(self.task_manager.index_of(task.id))
+            else:
+                self._select(self.selected_index)
+            self.draw()
+            return True
+        
+        elif key == curses.KEY_BACKSPACE or key == 127:
+            self._update_search(self.search_query[:-1])
+            self.draw()
+            return True
+        
+        elif 32 <= key <= 126:  # Printable characters
+            self._update_search(self.search_query + chr(key))
+            self.draw()
             return True
         
-        elif key == curses.KEY_DOWN:
-            if self.task_manager.tasks and self.selected_index < len(self.task_manager.tasks) - 1:
-                self.selected_index += 1
-                # Adjust offset for scrolling
-                height = self.window.getmaxyx()[0]
-                if self.selected_index >= self.offset + (height - 10):
-                    self.offset += 1
+        return self._handle_navigation_key(key)
+    
+    def _update_search(self, query):
+        """Filter the list to query, refining the previous results while the query only grows"""
+        # Backspace returns to results already computed for a shorter query
+        while self._search_stack and not query.startswith(self._search_stack[-1][0]):
+            self._search_stack.pop()
+        
+        if self._search_stack and self._search_stack[-1][0] == query:
+            results = self._search_stack[-1][1]
+        elif not query.strip():
+            results = None
+        else:
+            within_query, within = self._search_stack[-1] if self._search_stack else ("", None)
+            results = self.task_manager.search(query, within, within_query)
+            self._search_stack.append((query, results))
+        
+        self.search_query = query
+        self.model.set_results(results)
+        self.selected_index = self.offset = 0
+    
+    def _handle_navigation_key(self, key):
+        """Move the selection for arrow and paging keys"""
+        # Navigation, every jump is O(1) and only fetches the visible page
+        jumps = {
+            curses.KEY_UP: self.selected_index - 1,
+            curses.KEY_DOWN: self.selected_index + 1,
+            curses.KEY_PPAGE: self.selected_index - self._page_size(),
+            curses.KEY_NPAGE: self.selected_index + self._page_size(),
+            curses.KEY_HOME: 0,
+            curses.KEY_END: self.model.count() - 1,
+        }
+        if key in jumps:
+            if self._select(jumps[key]):
                 self.draw()
             return True
         
         return False
     
+    def reload_changes(self):
+        """Merge changes made by other instances, keeping the selected task selected"""
+        selected = self.model.task_at(self.selected_index)
+        if not self.task_manager.reload_changes():
+            return False
+        if self.mode == "search":
+            # Results hold tasks from before the reload, search again from scratch
+            self._search_stack = []
+            self._update_search(self.search_query)
+        else:
+            self.keep_selected(selected)
+        self.draw()
+        return True
+    
+    def keep_selected(self, task):
+        """Select task again after tasks were added or removed around it"""
+        index = self.task_manager.index_of(task.id) if task else None
+        self._select(self.selected_index if index is None else index)
+    
+    def _page_size(self):
+        """Get the number of task rows that fit in the window"""
+        return self._page_rows
+    
+    def _select(self, index):
+        """Select the task at index (clamped), scrolling it into view; returns whether anything moved"""
+        index = max(0, min(index, self.model.count() - 1))
+        page_size = max(1, self._page_size())
+        
+        # Adjust offset for scrolling
+        offset = self.offset
+        if index < offset:
+            offset = index
+        elif index >= offset + page_size:
+            offset = index - page_size + 1
+        
+        moved = (index, offset) != (self.selected_index, self.offset)
+        self.selected_index, self.offset = index, offset
+        return moved
+    
+    def move_selection(self, rows):
+        """Move the selection by rows at once, so a burst of arrow keys costs a single draw"""
+        if self.mode == "entry":
+            return False
+        if self._select(self.selected_index + rows):
+            self.draw()
+        return True
+    
+    def expire_message(self):
+        """Clear the error message once its time is up"""
+        if self.message_expires is not None and time.monotonic() >= self.message_expires:
+            self.error_message = ""
+            self.message_expires = None
+            self.draw()
+    
     def _handle_entry_key(self, key):
         """Handle keys in entry mode"""
-        height, width = self.window.getmaxyx()
+        self.error_message = ""
+        self.message_expires = None
         
         if key == 27:  # Escape
             self.mode = "list"
@@ -400,23 +3794,30 @@ class TaskListView:
                 if self.end_time:
                     end_datetime = datetime.datetime.strptime(f"{self.task_date} {self.end_time}", "%Y-%m-%d %H:%M")
                     if end_datetime <= start_datetime:
-                        self.window.addstr(height - 4, 2, "Error: End time must be after start time", curses.A_BOLD)
-                        self.window.refresh()
-                        time.sleep(2)
+                        self._show_error("Error: End time must be after start time")
                         return True
                 
+                # Flag overlapping tasks, a second Tab with the same times saves anyway
+                conflicts = self.task_manager.find_conflicts(start_datetime, end_datetime)
+                if conflicts and self._confirmed_overlap != (start_datetime, end_datetime):
+                    self._confirmed_overlap = (start_datetime, end_datetime)
+                    more = f" and {len(conflicts) - 1} more" if len(conflicts) > 1 else ""
+                    self.error_message = (f"Overlaps '{conflicts[0].name}' at "
+                                          f"{conflicts[0].start_time:%H:%M}{more}, [Tab] again to save")
+                    self.draw()
+                    return True
+                
                 # Create and save task
                 task = Task(self.task_name, start_datetime, end_datetime)
                 self.task_manager.add_task(task)
                 
-                # Reset and go back to list mode
+                # Reset and go back to list mode with the new task selected
                 self.mode = "list"
+                self._select(self.task_manager.index_of(task.id))
                 self.draw()
                 
             except ValueError:
-                self.window.addstr(height - 4, 2, "Error: Invalid date or time format", curses.A_BOLD)
-                self.window.refresh()
-                time.sleep(2)
+                self._show_error("Error: Invalid date or time format")
                 
             return True
         
@@ -452,14 +3853,118 @@ class TaskListView:
             return True
         
         return False
+    
+    def _show_error(self, message):
+        """Show an error below the entry form until the next key or MESSAGE_TIMEOUT seconds pass"""
+        self.error_message = message
+        self.message_expires = time.monotonic() + MESSAGE_TIMEOUT
+        self.draw()
+
+
+class FrameProfiler:
+    """Per key event phase timings and latency percentiles for --profile"""
+    
+    PHASES = ["key_read", "handle_key", "data", "draw_list", "draw_calendar", "refresh"]
+    DATA_METHODS = ["add_task", "add_tasks", "delete_task", "toggle_task_completion", "get_task", "index_of",
+                    "count", "get_tasks_page", "get_tasks_from", "get_tasks_between", "count_before", "get_month_counts", "get_day_stats",
+                    "save_tasks", "reload_changes", "page_in"]
+    
+    def __init__(self, hud=False, cprofile_path=None):
+        self.hud = hud
+        self.cprofile_path = cprofile_path
+        self.cprofile = None
+        self.samples = {phase: [] for phase in self.PHASES + ["total"]}
+        self.frame = {}
+        self._child_time = []  # Time spent in timed calls nested inside each open timed call
+    
+    def wrap(self, phase, func):
+        """Wrap func so its exclusive run time is charged to phase in the current frame"""
+        def timed(*args, **kwargs):
+            self._child_time.append(0.0)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                exclusive = elapsed - self._child_time.pop()
+                self.frame[phase] = self.frame.get(phase, 0.0) + exclusive
+                if self._child_time:
+                    self._child_time[-1] += elapsed
+        return timed
+    
+    def instrument(self, app):
+        """Wrap the views and storage backend of a ChronCLI instance"""
+        app.task_list_view.handle_key = self.wrap("handle_key", app.task_list_view.handle_key)
+        app.task_list_view.draw = self.wrap("draw_list", app.task_list_view.draw)
+        app.calendar_view.draw = self.wrap("draw_calendar", app.calendar_view.draw)
+        backend = app.task_manager.backend
+        for name in self.DATA_METHODS:
+            setattr(backend, name, self.wrap("data", getattr(backend, name)))
+    
+    def start(self):
+        """Start cProfile collection if requested"""
+        if self.cprofile_path:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+    
+    def stop(self):
+        """Stop cProfile collection and dump its stats"""
+        if self.cprofile:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.cprofile_path)
+            self.cprofile = None
+    
+    def end_frame(self):
+        """Record the phases of the key event that just finished"""
+        for phase in self.PHASES:
+            self.samples[phase].append(self.frame.get(phase, 0.0))
+        # Waiting for the key is idle time, not latency
+        self.samples["total"].append(sum(t for phase, t in self.frame.items() if phase != "key_read"))
+        self.frame = {}
+    
+    def discard_frame(self):
+        """Drop the phases timed since the last frame, for loop iterations that handled no event"""
+        self.frame = {}
+    
+    def percentiles(self, phase):
+        """Get (p50, p95, p99, max) of a phase in seconds"""
+        samples = sorted(self.samples[phase])
+        if not samples:
+            return (0.0, 0.0, 0.0, 0.0)
+        def rank(p):
+            return samples[min(len(samples) - 1, int(p * len(samples)))]
+        return (rank(0.50), rank(0.95), rank(0.99), samples[-1])
+    
+    def hud_text(self):
+        """Get a one line latency summary for the on-screen HUD"""
+        total = self.samples["total"]
+        if not total:
+            return "profile: no frames yet"
+        p50, p95, p99, _ = self.percentiles("total")
+        return (f"frame {total[-1] * 1000:.1f}ms  p50 {p50 * 1000:.1f}  "
+                f"p95 {p95 * 1000:.1f}  p99 {p99 * 1000:.1f}  n={len(total)}")
+    
+    def report(self):
+        """Format the per-phase latency table printed on exit"""
+        lines = [f"Frame latency over {len(self.samples['total'])} key events (ms)",
+                 f"{'phase':<14}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"]
+        for phase in self.PHASES + ["total"]:
+            p50, p95, p99, worst = self.percentiles(phase)
+            lines.append(f"{phase:<14}{p50 * 1000:>9.3f}{p95 * 1000:>9.3f}{p99 * 1000:>9.3f}{worst * 1000:>9.3f}")
+        if self.cprofile_path:
+            lines.append(f"cProfile stats written to {self.cprofile_path}")
+        return "\n".join(lines)
 
 
 class ChronCLI:
     """Main application class"""
     
-    def __init__(self, stdscr):
+    def __init__(self, stdscr, profiler=None):
         self.stdscr = stdscr
         self.task_manager = TaskManager()
+        self.task_manager.start_write_behind()
+        self.profiler = profiler
         
         # Initialize colors
         curses.start_color()
@@ -470,23 +3975,48 @@ class ChronCLI:
         # Hide cursor
         curses.curs_set(0)
         
-        # Create windows
-        height, width = stdscr.getmaxyx()
-        
-        # Split screen horizontally
-        task_list_height = height
-        task_list_width = width // 2
-        calendar_height = height
-        calendar_width = width - task_list_width
-        
-        # Create windows
-        self.task_list_win = curses.newwin(task_list_height, task_list_width, 0, 0)
-        self.calendar_win = curses.newwin(calendar_height, calendar_width, 0, task_list_width)
+        # Create windows once, resizes fit them to the new panes in place
+        task_list_pane, calendar_pane = self._panes(*stdscr.getmaxyx())
+        self.task_list_win = curses.newwin(*task_list_pane)
+        self.calendar_win = curses.newwin(*calendar_pane)
+        self.fits = True  # Whether the terminal is large enough to draw the panes
         
         # Create views
         self.task_list_view = TaskListView(self.task_list_win, self.task_manager)
         self.calendar_view = CalendarView(self.calendar_win, self.task_manager)
         
+        if profiler:
+            profiler.instrument(self)
+        
+    @staticmethod
+    def _panes(height, width):
+        """Get the (height, width, y, x) of the task list and calendar panes, splitting the screen horizontally"""
+        task_list_width = width // 2
+        return (height, task_list_width, 0, 0), (height, width - task_list_width, 0, task_list_width)
+    
+    def resize(self):
+        """Lay both panes out for the terminal's current size and redraw them once
+        
+        curses turns SIGWINCH into KEY_RESIZE and has already resized the screen,
+        the windows and views are only fitted to it here.
+        """
+        height, width = self.stdscr.getmaxyx()
+        self.fits = height >= MIN_SCREEN_HEIGHT and width >= MIN_SCREEN_WIDTH
+        self.stdscr.erase()
+        if not self.fits:
+            message = f"Terminal too small, {MIN_SCREEN_WIDTH}x{MIN_SCREEN_HEIGHT} needed"
+            self.stdscr.addstr(height // 2, max(0, (width - len(message)) // 2), message[:max(0, width - 1)])
+            self.stdscr.noutrefresh()
+            return
+        self.stdscr.noutrefresh()
+        
+        task_list_pane, calendar_pane = self._panes(height, width)
+        self.task_list_view.resize(*task_list_pane)
+        self.calendar_view.resize(*calendar_pane)
+        self.task_list_view.draw()
+        self.calendar_view.draw()
+        self._draw_save_status()
+    
     def draw_banner(self):
         """Draw the AD DEV banner"""
         self.stdscr.clear()
@@ -496,48 +4026,1031 @@ class ChronCLI:
         banner_lines = ASCII_BANNER.strip().split('\n')
         for i, line in enumerate(banner_lines):
             if i < height:
-                self.stdscr.addstr(i, max(0, (width - len(line)) // 2), line)
+                x = max(0, (width - len(line)) // 2)
+                self.stdscr.addstr(i, x, line[:max(0, width - x - 1)])
         
         self.stdscr.refresh()
-        time.sleep(1.5)  # Show banner for 1.5 seconds
+        
+        # Any key skips the rest of the banner
+        self.stdscr.timeout(int(BANNER_TIMEOUT * 1000))
+        self.stdscr.getch()
     
     def run(self):
         """Run the main application loop"""
         self.draw_banner()
         
         # Draw initial views
-        self.task_list_view.draw()
-        self.calendar_view.draw()
+        self.resize()
+        curses.doupdate()
         
-        # Main event loop
+        # Timing wrappers only exist when profiling, so the loop pays nothing otherwise
+        profiler = self.profiler
+        read_key = self.stdscr.getch
+        update_screen = curses.doupdate
+        if profiler:
+            read_key = profiler.wrap("key_read", read_key)
+            update_screen = profiler.wrap("refresh", update_screen)
+            profiler.start()
+        
+        try:
+            self._event_loop(read_key, update_screen)
+        finally:
+            # Runs on 'q', exceptions and SIGTERM alike so queued changes always reach disk
+            if profiler:
+                profiler.stop()
+            self.task_manager.close()
+    
+    def _event_loop(self, read_key, update_screen):
+        """Handle keys until quit"""
+        profiler = self.profiler
+        calendar_keys = {
+            ord('p'): self.calendar_view.prev_month,
+            ord('n'): self.calendar_view.next_month,
+            ord('v'): self.calendar_view.next_view,
+        }
+        next_reload = 0
         while True:
-            key = self.stdscr.getch()
+            # Wake up to check for other instances' changes, faster while a background
+            # save is in flight so its status updates without a key press, and in time
+            # to clear an expiring error message
+            saved = self.task_manager.save_status() == "saved"
+            timeout = RELOAD_POLL_INTERVAL if saved else 0.25
+            if self.task_list_view.message_expires is not None:
+                timeout = min(timeout, max(0.0, self.task_list_view.message_expires - time.monotonic()))
+            keys = self._read_keys(read_key, timeout)
+            repainted = False  # Whether a resize or other instances' changes redrew the panes
+            if curses.KEY_RESIZE in keys:
+                keys = self._settle_resize(read_key, keys)
+                self.resize()
+                repainted = True
             
-            # Global quit
-            if key == ord('q'):
-                break
+            if not self.fits:
+                # Nothing is drawn until the terminal is large enough again
+                if ord('q') in keys and self.task_list_view.mode == "list":
+                    return
+                update_screen()
+                if profiler:
+                    profiler.discard_frame()
+                continue
+            
+            self.task_list_view.expire_message()
+            if time.monotonic() >= next_reload:
+                next_reload = time.monotonic() + RELOAD_POLL_INTERVAL
+                if self.task_list_view.reload_changes():
+                    self.calendar_view.draw()
+                    repainted = True
+            
+            for key, rows in self._coalesce_keys(keys):
+                if rows:
+                    self.task_list_view.move_selection(rows)
+                    continue
+                
+                # Global quit, 'q' is ordinary text while typing a task or a search
+                if key == ord('q') and self.task_list_view.mode == "list":
+                    return
+                
+                # Task list handling
+                if self.task_list_view.handle_key(key):
+                    self.calendar_view.draw()  # No-op unless task data changed
+                
+                # Calendar navigation
+                elif key in calendar_keys:  # Previous/next month and view switching
+                    selected = self.task_list_view.model.task_at(self.task_list_view.selected_index)
+                    if calendar_keys[key]():
+                        # Archived tasks were paged in above or below the selection
+                        self.task_list_view.keep_selected(selected)
+                        self.task_list_view.draw()
+            
+            self._draw_save_status()
+            if profiler and profiler.hud:
+                self._draw_hud()
+            
+            # Flush all pending window updates to the terminal at once
+            update_screen()
             
-            # Task list handling
-            if self.task_list_view.handle_key(key):
-                self.calendar_view.draw()  # Refresh calendar if task list changes
+            if profiler:
+                # Idle polls that found nothing to do would only dilute the percentiles
+                if keys or repainted:
+                    profiler.end_frame()
+                else:
+                    profiler.discard_frame()
+    
+    def _read_keys(self, read_key, timeout):
+        """Wait up to timeout seconds for a key, then take every key already queued behind it with read_key
+        
+        The wait itself is idle time, so only draining the queue is charged to
+        key_read when profiling.
+        """
+        self.stdscr.timeout(int(timeout * 1000))
+        key = self.stdscr.getch()
+        if key == -1:
+            return []
+        
+        keys = [key]
+        self.stdscr.timeout(0)
+        while True:
+            key = read_key()
+            if key == -1:
+                return keys
+            keys.append(key)
+    
+    def _settle_resize(self, read_key, keys):
+        """Drop the resize events from keys, reading on until the terminal stops resizing
+        
+        Dragging a window edge sends a resize for every intermediate size. Laying
+        out once the burst pauses for RESIZE_SETTLE, or every RESIZE_MAX_DELAY
+        while it goes on, follows the drag without redrawing each step of it.
+        """
+        keys = [key for key in keys if key != curses.KEY_RESIZE]
+        deadline = time.monotonic() + RESIZE_MAX_DELAY
+        while time.monotonic() < deadline:
+            more = self._read_keys(read_key, RESIZE_SETTLE)
+            keys.extend(key for key in more if key != curses.KEY_RESIZE)
+            if curses.KEY_RESIZE not in more:
+                break
+        return keys
+    
+    def _coalesce_keys(self, keys):
+        """Yield (key, 0) for each key, merging runs of up/down arrows into one (None, rows) move
+        
+        A held arrow key repeats faster than frames can be drawn; moving once by the
+        net distance keeps the screen on the latest position instead of replaying
+        every stale step.
+        """
+        steps = {curses.KEY_UP: -1, curses.KEY_DOWN: 1}
+        rows = 0
+        for key in keys:
+            if key in steps and self.task_list_view.mode != "entry":
+                rows += steps[key]
                 continue
+            if rows:
+                yield None, rows
+                rows = 0
+            yield key, 0
+        if rows:
+            yield None, rows
+    
+    def _draw_save_status(self):
+        """Show whether changes have reached disk on the task list border"""
+        width = self.task_list_win.getmaxyx()[1]
+        status = self.task_manager.save_status()
+        attr = curses.A_BOLD if status in ("save failed", "edit lost") else curses.A_DIM
+        self.task_list_view.screen.put(0, max(1, width - 15), f" {status} ".rjust(13, "─"), attr)
+        self.task_list_win.noutrefresh()
+    
+    def _draw_hud(self):
+        """Draw the profiler summary on the bottom line of the task list"""
+        height, width = self.task_list_win.getmaxyx()
+        self.task_list_view.screen.put(height - 2, 2, self.profiler.hud_text(), curses.A_DIM, max(0, width - 4))
+        self.task_list_win.noutrefresh()
+
+
+def guess_format(path):
+    """Guess an import/export format from a file extension"""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return {"jsonl": "ndjson", "ical": "ics", "ifb": "ics"}.get(extension, extension)
+
+
+COMPLETED_VALUES = {"1": True, "true": True, "yes": True, "x": True,
+                    "": False, "0": False, "false": False, "no": False}
+
+
+def _import_datetime(value, field):
+    """Parse an imported ISO 8601 time, converting one with a UTC offset to naive local time like stored tasks"""
+    if not isinstance(value, str) or not value:
+        raise ValueError(f"missing {field}")
+    when = datetime.datetime.fromisoformat(value)
+    if when.tzinfo is not None:
+        when = when.astimezone().replace(tzinfo=None)
+    return when
+
+
+def _import_completed(value):
+    """Parse an imported completed flag, rejecting values that are neither true nor false"""
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in COMPLETED_VALUES:
+        return COMPLETED_VALUES[value.strip().lower()]
+    raise ValueError(f"completed must be true or false, not {value!r}")
+
+
+def import_task(data):
+    """Create a task from an imported record, checking what Task.from_dict takes on trust from the store"""
+    if not isinstance(data, dict):
+        raise ValueError("not an object")
+    name = data.get("name")
+    if not isinstance(name, str) or not name:
+        raise ValueError("missing name")
+    task_id = data.get("id") or None
+    if task_id is not None and not isinstance(task_id, str):
+        raise ValueError(f"id must be a string, not {task_id!r}")
+    return Task(
+        name=name,
+        start_time=_import_datetime(data.get("start_time"), "start_time"),
+        end_time=_import_datetime(data["end_time"], "end_time") if data.get("end_time") else None,
+        completed=_import_completed(data.get("completed")),
+        task_id=task_id,
+        recurrence=Recurrence.from_dict(data["recurrence"]) if data.get("recurrence") else None
+    )
+
+
+def read_json(f):
+    """Read tasks from a JSON list in the tasks.json format"""
+    records = json.load(f)
+    if not isinstance(records, list):
+        raise ValueError("expected a JSON list of tasks")
+    for number, data in enumerate(records, 1):
+        try:
+            yield import_task(data)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"record {number}: invalid task ({e})")
+
+
+def read_ndjson(f):
+    """Lazily read tasks from newline-delimited JSON, one task dict per line"""
+    for line_number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield import_task(json.loads(line))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"line {line_number}: invalid task ({e})")
+
+
+def read_csv(f):
+    """Lazily read tasks from CSV with name,start_time,end_time,completed and optional id and recurrence columns"""
+    import csv
+    reader = csv.DictReader(f)
+    for row in reader:
+        try:
+            row["recurrence"] = json.loads(row["recurrence"]) if row.get("recurrence") else None
+            yield import_task(row)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"line {reader.line_num}: invalid task ({e})")
+
+
+def write_json(tasks, f):
+    """Stream tasks as a JSON list in the tasks.json format"""
+    f.write("[")
+    for i, task in enumerate(tasks):
+        if i:
+            f.write(", ")
+        f.write(json.dumps(task.to_dict()))
+    f.write("]\n")
+
+
+def write_ndjson(tasks, f):
+    """Stream tasks as newline-delimited JSON"""
+    for task in tasks:
+        f.write(json.dumps(task.to_dict()) + "\n")
+
+
+def write_csv(tasks, f):
+    """Stream tasks as CSV with a header row"""
+    import csv
+    writer = csv.DictWriter(f, fieldnames=["id", "name", "start_time", "end_time", "completed", "recurrence"])
+    writer.writeheader()
+    for task in tasks:
+        row = task.to_dict()
+        row["recurrence"] = json.dumps(row["recurrence"]) if task.recurrence else ""
+        writer.writerow(row)
+
+
+def _ics_unescape(value):
+    """Undo iCalendar TEXT escaping"""
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def _ics_escape(value):
+    """Apply iCalendar TEXT escaping"""
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\n", "\\n"))
+
+
+def _ics_datetime(value, params):
+    """Parse an iCalendar DATE or DATE-TIME value into a naive local datetime"""
+    if "VALUE=DATE" in params or len(value) == 8:
+        return datetime.datetime.strptime(value, "%Y%m%d")
+    if value.endswith("Z"):
+        utc = datetime.datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=datetime.timezone.utc)
+        return utc.astimezone().replace(tzinfo=None)
+    return datetime.datetime.strptime(value, "%Y%m%dT%H%M%S")
+
+
+def _ics_rrule(recurrence, start_time):
+    """Format a recurrence rule as iCalendar RRULE and EXDATE lines"""
+    rule = f"RRULE:FREQ={recurrence.freq.upper()};INTERVAL={recurrence.interval}"
+    if recurrence.until:
+        rule += f";UNTIL={recurrence.until.strftime('%Y%m%d')}T235959"
+    if recurrence.count:
+        rule += f";COUNT={recurrence.count}"
+    lines = [rule]
+    if recurrence.exceptions:
+        # EXDATE values carry the time of day of DTSTART
+        lines.append("EXDATE:" + ",".join(datetime.datetime.combine(date, start_time.time()).strftime("%Y%m%dT%H%M%S")
+                                          for date in sorted(recurrence.exceptions)))
+    return lines
+
+
+def _ics_parse_rrule(value, exceptions):
+    """Parse an iCalendar RRULE value into a Recurrence; YEARLY becomes every 12 months and BY* parts are ignored"""
+    parts = dict(part.partition("=")[::2] for part in value.upper().split(";") if part)
+    freq = parts.get("FREQ", "")
+    interval = int(parts.get("INTERVAL", 1))
+    if freq == "YEARLY":
+        freq, interval = "MONTHLY", interval * 12
+    until = _ics_datetime(parts["UNTIL"], "").date() if parts.get("UNTIL") else None
+    count = int(parts["COUNT"]) if parts.get("COUNT") else None
+    return Recurrence(freq.lower(), interval, until, count, exceptions)
+
+
+def _ics_lines(f):
+    """Yield unfolded iCalendar content lines"""
+    pending = None
+    for line in f:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending:
+        yield pending
+
+
+def read_ics(f):
+    """Lazily read VEVENT and VTODO components from an iCalendar file"""
+    component = None
+    for line in _ics_lines(f):
+        name_params, _, value = line.partition(":")
+        name, _, params = name_params.partition(";")
+        name = name.upper()
+        
+        if name == "BEGIN" and value.upper() in ("VEVENT", "VTODO"):
+            component = {"id": None, "name": "", "start_time": None, "end_time": None, "completed": False,
+                         "rrule": None, "exceptions": []}
+        elif component is None:
+            continue
+        elif name == "END" and value.upper() in ("VEVENT", "VTODO"):
+            if component["start_time"] is None:
+                raise ValueError(f"iCalendar component '{component['name']}' has no DTSTART")
+            recurrence = None
+            if component["rrule"]:
+                try:
+                    recurrence = _ics_parse_rrule(component["rrule"], component["exceptions"])
+                except ValueError:
+                    raise ValueError(f"unsupported iCalendar RRULE: {component['rrule']}")
+            yield Task(component["name"], component["start_time"], component["end_time"], component["completed"],
+                       task_id=component["id"], recurrence=recurrence)
+            component = None
+        else:
+            try:
+                if name == "UID":
+                    component["id"] = value[:-len("@chroncli")] if value.endswith("@chroncli") else value
+                elif name == "SUMMARY":
+                    component["name"] = _ics_unescape(value)
+                elif name == "DTSTART":
+                    component["start_time"] = _ics_datetime(value, params.upper())
+                elif name in ("DTEND", "DUE"):
+                    component["end_time"] = _ics_datetime(value, params.upper())
+                elif name == "STATUS" and value.upper() == "COMPLETED":
+                    component["completed"] = True
+                elif name == "COMPLETED" or (name == "X-CHRONCLI-COMPLETED" and value.upper() == "TRUE"):
+                    component["completed"] = True
+                elif name == "RRULE":
+                    component["rrule"] = value
+                elif name == "EXDATE":
+                    component["exceptions"].extend(_ics_datetime(date, params.upper()).date()
+                                                   for date in value.split(","))
+            except ValueError:
+                raise ValueError(f"invalid iCalendar line: {line}")
+
+
+def _ics_fold(line):
+    """Fold a content line to the 75 character limit"""
+    folded = line[:75]
+    for i in range(75, len(line), 74):
+        folded += "\r\n " + line[i:i + 74]
+    return folded + "\r\n"
+
+
+def write_ics(tasks, f):
+    """Stream tasks as VEVENTs of an iCalendar file"""
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//AD_DEV//ChronCLI " + VERSION + "//EN\r\n")
+    for task in tasks:
+        f.write("BEGIN:VEVENT\r\n")
+        f.write(f"UID:{task.id}@chroncli\r\n")
+        f.write(f"DTSTAMP:{stamp}\r\n")
+        f.write(f"DTSTART:{task.start_time.strftime('%Y%m%dT%H%M%S')}\r\n")
+        if task.end_time:
+            f.write(f"DTEND:{task.end_time.strftime('%Y%m%dT%H%M%S')}\r\n")
+        f.write(_ics_fold(f"SUMMARY:{_ics_escape(task.name)}"))
+        if task.recurrence:
+            for line in _ics_rrule(task.recurrence, task.start_time):
+                f.write(_ics_fold(line))
+        if task.completed:
+            f.write("X-CHRONCLI-COMPLETED:TRUE\r\n")
+        f.write("END:VEVENT\r\n")
+    f.write("END:VCALENDAR\r\n")
+
+
+TASK_READERS = {
+    "json": read_json,
+    "ndjson": read_ndjson,
+    "csv": read_csv,
+    "ics": read_ics,
+}
+
+TASK_WRITERS = {
+    "json": write_json,
+    "ndjson": write_ndjson,
+    "csv": write_csv,
+    "ics": write_ics,
+}
+
+
+def parse_date_range(text):
+    """Parse 'today', 'tomorrow', YYYY-MM-DD or START..END into [start, end) datetimes"""
+    def parse_day(value):
+        today = datetime.date.today()
+        if value == "today":
+            return today
+        if value == "tomorrow":
+            return today + datetime.timedelta(days=1)
+        return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+    
+    first, _, last = text.partition("..")
+    start = parse_day(first)
+    end = parse_day(last) if last else start
+    return (datetime.datetime.combine(start, datetime.time.min),
+            datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min))
+
+
+def format_task_line(task):
+    """Format a task as a single line of headless command output"""
+    checkbox = "[X]" if task.completed else "[ ]"
+    when = task.start_time.strftime("%Y-%m-%d %H:%M")
+    if task.end_time:
+        when += task.end_time.strftime("-%H:%M")
+    repeat = f"  ({task.recurrence.describe()})" if task.recurrence else ""
+    return f"{task.id}  {checkbox} {when}  {task.name}{repeat}"
+
+
+class ReminderQueue:
+    """Upcoming task starts in a min-heap, filled from a sliding window of storage
+    
+    Only tasks starting within the lead time plus REMINDER_WINDOW_HOURS are held,
+    so the heap stays small however many future tasks there are. Refreshing
+    after a change diffs that window and pushes only new entries; entries of
+    tasks that were removed, moved or completed are dropped when they surface.
+    """
+    
+    def __init__(self, task_manager, lead):
+        self.task_manager = task_manager
+        self.lead = lead
+        self.window = lead + datetime.timedelta(hours=REMINDER_WINDOW_HOURS)
+        self.heap = []  # (start_time, task id), stale unless the key is still in pending
+        self.pending = {}  # (start_time, task id) -> task to remind of
+        self.fired = set()  # Keys already reminded of, so a refresh does not queue them again
+        self.refresh_at = None  # When the window has to slide forward
+    
+    def refresh(self, now):
+        """Sync the heap with the tasks starting in [now, now + window)"""
+        current = {}
+        for task in self.task_manager.get_tasks_between(now, now + self.window):
+            key = (task.start_time, task.id)
+            if not task.completed and key not in self.fired:
+                current[key] = task
+        for key in current.keys() - self.pending.keys():
+            heapq.heappush(self.heap, key)
+        self.pending = current
+        self.fired = {key for key in self.fired if key[0] >= now}
+        # Rebuild once stale entries outnumber live ones
+        if len(self.heap) > 2 * len(self.pending) + 64:
+            self.heap = list(self.pending)
+            heapq.heapify(self.heap)
+        # Half the window ahead, every reminder due before then is still inside it
+        self.refresh_at = now + (self.window - self.lead) / 2
+    
+    def next_reminder(self):
+        """Get when the next reminder is due, or None if nothing is pending"""
+        self._drop_stale()
+        return self.heap[0][0] - self.lead if self.heap else None
+    
+    def pop_due(self, now):
+        """Remove and return the tasks whose reminder is due at now"""
+        due = []
+        while self._drop_stale() and self.heap[0][0] - self.lead <= now:
+            key = heapq.heappop(self.heap)
+            self.fired.add(key)
+            due.append(self.pending.pop(key))
+        return due
+    
+    def _drop_stale(self):
+        """Pop entries that no longer match a pending task, returning whether the heap has any left"""
+        while self.heap and self.heap[0] not in self.pending:
+            heapq.heappop(self.heap)
+        return bool(self.heap)
+
+
+def bell_hook(task):
+    """Ring the terminal bell"""
+    sys.stdout.write("\a")
+    sys.stdout.flush()
+
+
+def log_hook(task):
+    """Print a timestamped reminder line"""
+    print(f"{datetime.datetime.now():%Y-%m-%d %H:%M:%S} Reminder: {format_task_line(task)}", flush=True)
+
+
+def command_hook(command):
+    """Make a hook that starts command without waiting for it, passing the task in environment variables"""
+    def run(task):
+        env = dict(os.environ,
+                   CHRONCLI_TASK_ID=task.id,
+                   CHRONCLI_TASK_NAME=task.name,
+                   CHRONCLI_TASK_START=task.start_time.isoformat(),
+                   CHRONCLI_TASK_END=task.end_time.isoformat() if task.end_time else "")
+        try:
+            subprocess.Popen(command, shell=True, env=env)
+        except OSError as e:
+            print(f"Error: Reminder command failed ({e})", file=sys.stderr, flush=True)
+    return run
+
+
+def sync_exchange(task_manager, request):
+    """Answer one sync request: apply the client's changes, then return ours since its last pull
+    
+    The request holds the origin of the log the client last pulled from, the
+    revision it pulled up to and its changes since its last push. The response
+    holds this log's origin and revision, the latest change of each task
+    changed since the client's revision, or every task on its first sync,
+    except those it just sent and won, and our change of each task it sent and
+    lost.
+    """
+    task_manager.reload_changes()
+    log = task_manager.changes
+    origin = log.origin()
+    since = request["since"]
+    if request.get("origin") != origin or since is None or since > log.revision():
+        since = None  # The client last pulled from another log, or never
+    
+    stamps = log.stamps()
+    lost = [change["task"]["id"] for change in request["changes"]
+            if change["task"]["id"] in stamps and stamps[change["task"]["id"]] > (change["time"], change["origin"])]
+    won = {change["task"]["id"] for change in task_manager.apply_changes(request["changes"], stamps)}
+    # Read after applying, so the client's own changes are not sent back next time, and before
+    # collecting ours, so one made in between is sent again rather than never
+    revision = log.revision()
+    changes = [change for change in task_manager.changes_since(since) if change["task"]["id"] not in won]
+    listed = {change["task"]["id"] for change in changes}
+    changes.extend(log.latest([task_id for task_id in lost if task_id not in listed]))
+    return {"origin": origin, "revision": revision, "changes": changes}
+
+
+def make_sync_server(task_manager, host, port, token=None):
+    """Create an HTTP server that answers sync requests for task_manager one at a time"""
+    import http.server
+    import zlib
+    
+    class SyncHandler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/sync":
+                self.send_error(404)
+                return
+            if token and self.headers.get("Authorization") != f"Bearer {token}":
+                self.send_error(403)
+                return
+            try:
+                request = json.loads(gzip.decompress(self.rfile.read(int(self.headers["Content-Length"]))))
+            except (OSError, EOFError, TypeError, ValueError, zlib.error):
+                self.send_error(400, "Expected a gzipped JSON sync request")
+                return
+            try:
+                response = sync_exchange(task_manager, request)
+            except (KeyError, TypeError, ValueError) as e:
+                self.send_error(400, f"Malformed sync request ({e})")
+                return
+            
+            body = gzip.compress(json.dumps(response).encode())
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            print(f"Synced with {self.client_address[0]}: received {len(request['changes'])} changes, "
+                  f"sent {len(response['changes'])}", flush=True)
+        
+        def log_message(self, format, *args):
+            pass  # Each sync prints its own summary line instead
+    
+    return http.server.HTTPServer((host, port), SyncHandler)
+
+
+def _post_sync(url, request, token=None):
+    """Send a sync request to a chroncli serve instance and return its response"""
+    import urllib.request
+    headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = gzip.compress(json.dumps(request).encode())
+    with urllib.request.urlopen(urllib.request.Request(f"{url.rstrip('/')}/sync", data, headers),
+                                timeout=SYNC_TIMEOUT) as response:
+        return json.loads(gzip.decompress(response.read()))
+
+
+def load_sync_state():
+    """Load {server url: revisions last pushed to and pulled from it} from SYNC_FILE"""
+    try:
+        with open(SYNC_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}  # Syncs everything again, which changes nothing that is already in sync
+
+
+def sync_with(task_manager, url, token=None):
+    """Push our changes to the chroncli serve at url and apply its changes, returning (sent, received)
+    
+    The revisions pushed and pulled are kept per server in SYNC_FILE, so both
+    ways only the changes since the last sync are sent.
+    """
+    states = load_sync_state()
+    log = task_manager.changes
+    local = log.origin()
+    state = states.get(url, {})
+    if state.get("local") != local or state.get("pushed", 0) > log.revision():
+        state = {}  # Our log was replaced, so the server may lack any of it
+    while True:
+        pushed = log.revision()
+        changes = task_manager.changes_since(state.get("pushed"))
+        response = _post_sync(url, {"origin": state.get("origin"), "since": state.get("pulled"),
+                                    "changes": changes}, token)
+        if state.get("origin") in (None, response["origin"]):
+            break
+        state = {}  # The server's log was replaced, so it may lack what we pushed before
+    
+    applied = task_manager.apply_changes(response["changes"], log.stamps_since(pushed))
+    # What we just took from the server need not go back to it, unless other changes came in between
+    taken = {(change["task"]["id"], change["time"], change["origin"]) for change in applied}
+    for change in log.read_since(pushed):
+        if (change["task"]["id"], change["time"], change["origin"]) not in taken:
+            break
+        pushed = change["rev"]
+    states[url] = {"local": local, "pushed": pushed, "origin": response["origin"], "pulled": response["revision"]}
+    write_atomic(SYNC_FILE, lambda f: json.dump(states, f, indent=2))
+    return len(changes), len(applied)
+
+
+def command_add(args):
+    """Add a task without loading the existing ones"""
+    try:
+        start_datetime = datetime.datetime.strptime(f"{args.date} {args.time}", "%Y-%m-%d %H:%M")
+        end_datetime = None
+        if args.end:
+            end_datetime = datetime.datetime.strptime(f"{args.date} {args.end}", "%Y-%m-%d %H:%M")
+    except ValueError:
+        print("Error: Invalid date or time format", file=sys.stderr)
+        return 1
+    if end_datetime and end_datetime <= start_datetime:
+        print("Error: End time must be after start time", file=sys.stderr)
+        return 1
+    
+    recurrence = None
+    if args.repeat:
+        try:
+            until = datetime.date.fromisoformat(args.until) if args.until else None
+            exceptions = [datetime.date.fromisoformat(date) for date in args.skip or ()]
+            recurrence = Recurrence(args.repeat, args.every, until, args.count, exceptions)
+        except ValueError as e:
+            print(f"Error: Invalid recurrence ({e})", file=sys.stderr)
+            return 1
+    
+    task_manager = TaskManager(load=False)
+    task = Task(args.name, start_datetime, end_datetime, recurrence=recurrence)
+    task_manager.add_task(task)
+    task_manager.close()
+    print(f"Added: {format_task_line(task)}")
+    return 0
+
+
+def command_agenda(args):
+    """Print the tasks in a date range with their ids"""
+    try:
+        start, end = parse_date_range(args.range)
+    except ValueError:
+        print("Error: Expected YYYY-MM-DD or YYYY-MM-DD..YYYY-MM-DD", file=sys.stderr)
+        return 1
+    
+    task_manager = TaskManager(load=False)
+    task_manager.load_range(start, end)
+    task_manager.page_in(start, end)
+    printed = False
+    for task in task_manager.query(start, end, expand=True):
+        print(format_task_line(task))
+        printed = True
+    if not printed:
+        print("No tasks.")
+    task_manager.close()
+    return 0
+
+
+def command_done(args):
+    """Mark a task (by the id printed by agenda) completed"""
+    task_manager = TaskManager()
+    try:
+        task = task_manager.get_task(args.id)
+        if task is None and task_manager.page_in():
+            task = task_manager.get_task(args.id)
+        if task is None:
+            print(f"Error: No task with id {args.id}", file=sys.stderr)
+            return 1
+        if not task.completed:
+            task_manager.toggle_task_completion(task.id)
+            task.completed = True
+        print(f"Done: {format_task_line(task)}")
+        return 0
+    finally:
+        task_manager.close()
+
+
+def command_free(args):
+    """Print the first free slot of the given length in a day or range, from now on"""
+    try:
+        start, end = parse_date_range(args.range)
+    except ValueError:
+        print("Error: Expected YYYY-MM-DD or YYYY-MM-DD..YYYY-MM-DD", file=sys.stderr)
+        return 1
+    if args.minutes <= 0:
+        print("Error: Minutes must be positive", file=sys.stderr)
+        return 1
+    
+    # Tasks starting the day before may still be running at the start of the range
+    task_manager = TaskManager(load=False)
+    task_manager.load_range(start - datetime.timedelta(days=1), end)
+    try:
+        now = datetime.datetime.now()
+        day = start
+        while day < end:
+            slot = task_manager.find_free_slot(day.date(), args.minutes, after=now)
+            if slot is not None:
+                slot_end = slot + datetime.timedelta(minutes=args.minutes)
+                print(f"Free: {slot:%Y-%m-%d %H:%M}-{slot_end:%H:%M}")
+                return 0
+            day += datetime.timedelta(days=1)
+        print(f"No free slot of {args.minutes} minutes in {args.range}")
+        return 1
+    finally:
+        task_manager.close()
+
+
+def command_import(args):
+    """Bulk import tasks from an NDJSON, CSV, iCalendar or JSON file"""
+    file_format = args.format or guess_format(args.file)
+    if file_format not in TASK_READERS:
+        print(f"Error: Unknown import format for {args.file}, use --format", file=sys.stderr)
+        return 1
+    
+    task_manager = TaskManager()
+    started = time.perf_counter()
+    try:
+        with open(args.file, 'r', newline='') as f:
+            added = task_manager.add_tasks(TASK_READERS[file_format](f))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        task_manager.close()
+    
+    elapsed = time.perf_counter() - started
+    rate = added / elapsed if elapsed > 0 else 0
+    print(f"Imported {added} tasks in {elapsed:.2f}s ({rate:,.0f} tasks/s)")
+    return 0
+
+
+def command_export(args):
+    """Stream all tasks to a file or stdout without materializing the whole list"""
+    file_format = args.format or (guess_format(args.output) if args.output else "json")
+    if file_format not in TASK_WRITERS:
+        print(f"Error: Unknown export format for {args.output}, use --format", file=sys.stderr)
+        return 1
+    
+    # Read like agenda, so exporting never archives tasks or rewrites the store
+    task_manager = TaskManager(load=False)
+    task_manager.load_range(None, None)
+    task_manager.page_in()
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        TASK_WRITERS[file_format](task_manager.query(), out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        task_manager.close()
+    return 0
+
+
+def command_daemon(args):
+    """Run reminder hooks before tasks start, sleeping until the next reminder is due"""
+    config = load_config()
+    minutes = args.before if args.before is not None else config["reminder_minutes"]
+    command = args.hook_command or config["reminder_command"]
+    names = args.hook or (["command"] if args.hook_command else config["reminder_hooks"])
+    
+    hooks = []
+    for name in names:
+        if name == "bell":
+            hooks.append(bell_hook)
+        elif name == "log":
+            hooks.append(log_hook)
+        elif name == "command" and command:
+            hooks.append(command_hook(command))
+        elif name == "command":
+            print("Error: The command hook needs --command or reminder_command in the config", file=sys.stderr)
+            return 1
+        else:
+            print(f"Error: Unknown reminder hook {name}", file=sys.stderr)
+            return 1
+    if minutes < 0:
+        print("Error: Minutes must not be negative", file=sys.stderr)
+        return 1
+    
+    # Exit cleanly on SIGTERM so storage is closed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    
+    task_manager = TaskManager()
+    queue = ReminderQueue(task_manager, datetime.timedelta(minutes=minutes))
+    queue.refresh(datetime.datetime.now())
+    print(f"Reminding {minutes} minutes before tasks start, press Ctrl-C to stop", flush=True)
+    try:
+        while True:
+            now = datetime.datetime.now()
+            for task in queue.pop_due(now):
+                for hook in hooks:
+                    hook(task)
             
-            # Calendar navigation
-            if key == ord('p'):  # Previous month
-                self.calendar_view.prev_month()
-            elif key == ord('n'):  # Next month
-                self.calendar_view.next_month()
+            # Sleeping only until the next reminder keeps the daemon idle between them.
+            # Waking once per poll interval catches edits made meanwhile, which costs a
+            # stat of the task files unless something changed
+            if task_manager.reload_changes() or now >= queue.refresh_at:
+                queue.refresh(now)
+            wake = min(queue.refresh_at, now + datetime.timedelta(seconds=RELOAD_POLL_INTERVAL))
+            reminder = queue.next_reminder()
+            if reminder is not None and reminder < wake:
+                wake = reminder
+            time.sleep(max(0.0, (wake - datetime.datetime.now()).total_seconds()))
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        task_manager.close()
+
+
+def command_serve(args):
+    """Serve the task store to chroncli sync until stopped"""
+    token = args.token or load_config()["sync_token"]
+    if not token and args.host not in ("127.0.0.1", "localhost", "::1"):
+        print("Warning: Serving without a token, anyone who can reach this port can change tasks",
+              file=sys.stderr)
+    
+    # Exit cleanly on SIGTERM so storage is closed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    
+    task_manager = TaskManager()
+    try:
+        server = make_sync_server(task_manager, args.host, args.port, token)
+    except OSError as e:
+        print(f"Error: Cannot listen on {args.host}:{args.port} ({e})", file=sys.stderr)
+        task_manager.close()
+        return 1
+    print(f"Serving tasks on http://{args.host}:{server.server_port}, press Ctrl-C to stop", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        server.server_close()
+        task_manager.close()
+
+
+def command_sync(args):
+    """Exchange the changes since the last sync with a chroncli serve instance"""
+    url = args.url if "://" in args.url else f"http://{args.url}"
+    token = args.token or load_config()["sync_token"]
+    task_manager = TaskManager()
+    try:
+        started = time.perf_counter()
+        sent, received = sync_with(task_manager, url, token)
+        elapsed = time.perf_counter() - started
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Error: Sync with {url} failed ({e})", file=sys.stderr)
+        return 1
+    finally:
+        task_manager.close()
+    print(f"Synced with {url}: sent {sent} changes, received {received} in {elapsed:.2f}s")
+    return 0
+
 
+def parse_args(argv=None):
+    """Parse command line arguments, no subcommand starts the interactive UI"""
+    parser = argparse.ArgumentParser(prog="chroncli", description="Terminal calendar and task scheduler")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {VERSION}")
+    parser.add_argument("--profile", action="store_true", help="time each key event and print latency percentiles on exit")
+    parser.add_argument("--hud", action="store_true", help="show frame latency on screen (implies --profile)")
+    parser.add_argument("--cprofile", metavar="FILE", help="also dump cProfile stats to FILE (implies --profile)")
+    commands = parser.add_subparsers(dest="command")
+    
+    add = commands.add_parser("add", help="add a task")
+    add.add_argument("name")
+    add.add_argument("--date", default=datetime.date.today().strftime("%Y-%m-%d"), help="YYYY-MM-DD, default today")
+    add.add_argument("--time", default=datetime.datetime.now().strftime("%H:%M"), help="HH:MM, default now")
+    add.add_argument("--end", help="end time HH:MM")
+    add.add_argument("--repeat", choices=Recurrence.FREQUENCIES, help="repeat the task")
+    add.add_argument("--every", type=int, default=1, metavar="N", help="repeat every N days, weeks or months")
+    add.add_argument("--until", metavar="DATE", help="last date to repeat on, YYYY-MM-DD")
+    add.add_argument("--count", type=int, metavar="N", help="stop after N occurrences")
+    add.add_argument("--skip", action="append", metavar="DATE", help="skip the occurrence on DATE, repeatable")
+    add.set_defaults(func=command_add)
+    
+    agenda = commands.add_parser("agenda", help="list tasks for a day or range")
+    agenda.add_argument("range", nargs="?", default="today",
+                        help="today, tomorrow, YYYY-MM-DD or YYYY-MM-DD..YYYY-MM-DD (default today)")
+    agenda.set_defaults(func=command_agenda)
+    
+    done = commands.add_parser("done", help="mark a task completed")
+    done.add_argument("id", help="task id as shown by agenda")
+    done.set_defaults(func=command_done)
+    
+    free = commands.add_parser("free", help="find the next free slot")
+    free.add_argument("minutes", type=int, help="length of the slot")
+    free.add_argument("range", nargs="?", default="today",
+                      help="today, tomorrow, YYYY-MM-DD or YYYY-MM-DD..YYYY-MM-DD (default today)")
+    free.set_defaults(func=command_free)
+    
+    daemon = commands.add_parser("daemon", help="remind of tasks before they start")
+    daemon.add_argument("--before", type=int, metavar="MINUTES",
+                        help="minutes before the start to remind (default reminder_minutes from the config, 10)")
+    daemon.add_argument("--hook", action="append", choices=["bell", "log", "command"],
+                        help="reminder to fire, repeatable (default reminder_hooks from the config, log)")
+    # Its own dest, "command" holds the subcommand name
+    daemon.add_argument("--command", dest="hook_command",
+                        help="shell command for the command hook, implies --hook command")
+    daemon.set_defaults(func=command_daemon)
+    
+    serve = commands.add_parser("serve", help="serve tasks to chroncli sync on other machines")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (default 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=SYNC_PORT, help=f"port to listen on (default {SYNC_PORT})")
+    serve.add_argument("--token", help="secret clients must send (default sync_token from the config)")
+    serve.set_defaults(func=command_serve)
+    
+    sync = commands.add_parser("sync", help="exchange changes with chroncli serve")
+    sync.add_argument("url", help=f"server address, e.g. http://localhost:{SYNC_PORT}")
+    sync.add_argument("--token", help="secret the server requires (default sync_token from the config)")
+    sync.set_defaults(func=command_sync)
+    
+    export = commands.add_parser("export", help="export all tasks")
+    export.add_argument("-o", "--output", help="output file, default stdout")
+    export.add_argument("--format", choices=sorted(TASK_WRITERS), help="default from the file extension, else json")
+    export.set_defaults(func=command_export)
+    
+    import_ = commands.add_parser("import", help="bulk import tasks from a file")
+    import_.add_argument("file")
+    import_.add_argument("--format", choices=sorted(TASK_READERS), help="default from the file extension")
+    import_.set_defaults(func=command_import)
+    
+    return parser.parse_args(argv)
 
-def main():
+
+def main(argv=None):
     """Entry point"""
+    args = parse_args(argv)
+    
+    # Headless subcommands skip curses entirely
+    if args.command:
+        return args.func(args)
+    
     # Create config directory if it doesn't exist
     if not os.path.exists(CONFIG_DIR):
         os.makedirs(CONFIG_DIR)
     
+    profiler = None
+    if args.profile or args.hud or args.cprofile:
+        profiler = FrameProfiler(hud=args.hud, cprofile_path=args.cprofile)
+    
+    # Exit cleanly on SIGTERM so queued changes are flushed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    
     # Run the application
-    curses.wrapper(lambda stdscr: ChronCLI(stdscr).run())
+    load_curses()
+    curses.wrapper(lambda stdscr: ChronCLI(stdscr, profiler).run())
+    
+    if profiler:
+        print(profiler.report(), file=sys.stderr)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
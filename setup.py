@@ -7,8 +7,18 @@ import os
 import sys
 import shutil
 import subprocess
+import py_compile
 from pathlib import Path
 
+# Runs the installed module instead of the script itself: Python only caches the
+# bytecode of imported modules, so this skips recompiling chroncli.py on every run
+LAUNCHER = """#!/usr/bin/env python3
+import sys
+sys.path.insert(0, {install_dir!r})
+import chroncli
+sys.exit(chroncli.main())
+"""
+
 
 def main():
     """Main installation function"""
@@ -42,18 +52,21 @@ def main():
     
     shutil.copy2(source_script, dest_script)
     os.chmod(dest_script, 0o755)  # Make executable
+    py_compile.compile(dest_script)  # Cache the bytecode now, in case the directory is read-only later
     
-    # Create symlink
+    # Create launcher
     bin_dir = os.path.expanduser("~/bin")
     os.makedirs(bin_dir, exist_ok=True)
     
-    symlink_path = os.path.join(bin_dir, "chroncli")
+    launcher_path = os.path.join(bin_dir, "chroncli")
     
-    # Remove existing symlink if it exists
-    if os.path.exists(symlink_path):
-        os.remove(symlink_path)
+    # Remove an existing launcher, or the symlink older installers made
+    if os.path.lexists(launcher_path):
+        os.remove(launcher_path)
     
-    os.symlink(dest_script, symlink_path)
+    with open(launcher_path, 'w') as f:
+        f.write(LAUNCHER.format(install_dir=install_dir))
+    os.chmod(launcher_path, 0o755)
     
     # Update PATH if needed
     shell_profile = None
@@ -77,7 +90,7 @@ def main():
     print("\nTo start AD_DEV_ChronCLI, run:")
     print("    chroncli")
     print("\nOr if you haven't updated your PATH:")
-    print(f"    {dest_script}")
+    print(f"    {launcher_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,26 @@
+import shutil
+import tempfile
+import unittest
+
+import benchmark
+import chroncli
+
+DATA_PATHS = ("CONFIG_DIR", "DATA_FILE", "BINARY_FILE", "INDEX_CACHE_FILE", "JOURNAL_FILE", "DB_FILE",
+              "CONFIG_FILE", "LOCK_FILE", "ARCHIVE_DIR", "CHANGES_FILE", "SYNC_FILE")
+
+
+class StoreTestCase(unittest.TestCase):
+    """Test case whose task store lives in a scratch directory, removed afterwards"""
+    
+    def setUp(self):
+        saved = {name: getattr(chroncli, name) for name in DATA_PATHS}
+        self.addCleanup(lambda: [setattr(chroncli, name, path) for name, path in saved.items()])
+        self.data_dir = tempfile.mkdtemp(prefix="chroncli-test-")
+        self.addCleanup(shutil.rmtree, self.data_dir, ignore_errors=True)
+        benchmark.use_data_dir(self.data_dir)
+    
+    def open_manager(self, storage="json"):
+        """Get a TaskManager over an empty store of the given storage backend"""
+        manager = chroncli.TaskManager(chroncli.STORAGE_BACKENDS[storage]())
+        self.addCleanup(manager.close)
+        return manager
@@ -0,0 +1,90 @@
+import datetime
+import os
+import unittest
+
+import chroncli
+from chroncli import Task
+from tests.helpers import StoreTestCase
+
+
+class ArchiveTest(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        first = datetime.date.today().replace(day=1) - datetime.timedelta(days=200)
+        self.month = (first.year, first.month)
+        start = datetime.datetime(first.year, first.month, 3, 9)
+        self.done = [Task(f"Done {i}", start + datetime.timedelta(days=i % 3, hours=i), completed=True)
+                     for i in range(6)]
+        self.pending = Task("Still open", start)
+        # A finished series in an earlier month, kept in tasks.json like every recurring task
+        self.recurring = Task("Weekly", start - datetime.timedelta(days=100), completed=True,
+                              recurrence=chroncli.Recurrence("weekly", count=2))
+        self.recent = Task("Recent", datetime.datetime.combine(datetime.date.today(), datetime.time(9)),
+                           completed=True)
+        manager = self.load()
+        manager.add_tasks(self.done + [self.pending, self.recurring, self.recent])
+        manager.close()
+        self.counts = {3: 3, 4: 2, 5: 2}  # Every task of the month by day
+    
+    def load(self):
+        manager = chroncli.TaskManager(chroncli.JsonBackend())
+        self.addCleanup(manager.close)
+        return manager
+    
+    def hot_ids(self):
+        """Get the ids of the tasks in tasks.json"""
+        backend = chroncli.JsonBackend()
+        tasks, _ = backend._read_snapshot()
+        return {task.id for task in tasks}
+    
+    def test_load_freezes_old_completed_tasks(self):
+        self.load().close()
+        self.assertEqual(self.hot_ids(), {self.pending.id, self.recurring.id, self.recent.id})
+        key = chroncli.month_key(datetime.date(*self.month, 1))
+        self.assertTrue(os.path.exists(os.path.join(self.data_dir, "archive", f"{key}.json.gz")))
+        manager = self.load()
+        self.assertIsNone(manager.get_task(self.done[0].id))
+        # Counts of archived months come from the manifest without reading the segment
+        self.assertEqual(manager.get_month_counts(*self.month), self.counts)
+    
+    def test_page_in(self):
+        self.load().close()
+        manager = self.load()
+        bounds = chroncli.month_bounds(*self.month)
+        self.assertTrue(manager.page_in(*bounds))
+        self.assertFalse(manager.page_in(*bounds))
+        self.assertEqual(manager.get_task(self.done[0].id).name, "Done 0")
+        self.assertEqual(manager.get_month_counts(*self.month), self.counts)
+        self.assertEqual(len(list(manager.query(*bounds))), len(self.done) + 1)
+        self.assertEqual(len(manager.backend.by_id), manager.count())
+        self.assertEqual([task.name for task in manager.search("done 4")], ["Done 4"])
+    
+    def test_changing_an_archived_task_thaws_it(self):
+        self.load().close()
+        manager = self.load()
+        manager.page_in(*chroncli.month_bounds(*self.month))
+        manager.toggle_task_completion(self.done[0].id)
+        manager.delete_task(self.done[1].id)
+        counts = dict(self.counts)
+        counts[self.done[1].start_time.day] -= 1
+        self.assertEqual(manager.get_month_counts(*self.month), counts)
+        
+        # Replayed from the journal by an instance that has not paged the month in
+        other = self.load()
+        self.assertFalse(other.get_task(self.done[0].id).completed)
+        self.assertEqual(other.get_month_counts(*self.month), counts)
+        other.page_in()
+        self.assertIsNone(other.get_task(self.done[1].id))
+        self.assertEqual(len(other.backend.by_id), other.count())
+        other.close()
+        
+        manager.close()
+        self.assertIn(self.done[0].id, self.hot_ids())
+        fresh = self.load()
+        fresh.page_in()
+        self.assertEqual(fresh.count(), len(self.done) - 1 + 3)
+        self.assertEqual(fresh.get_month_counts(*self.month), counts)
+
+
+if __name__ == "__main__":
+    unittest.main()
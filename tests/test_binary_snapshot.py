@@ -0,0 +1,78 @@
+import datetime
+import unittest
+
+from chroncli import BINARY_HEADER, Recurrence, Task, decode_binary_snapshot, encode_binary_snapshot
+
+
+def sample_tasks(task_id=None):
+    """Get tasks in start time order covering every field the format stores"""
+    base = datetime.datetime(2026, 1, 30, 9)
+    tasks = []
+    for i in range(40):
+        start = base + datetime.timedelta(hours=7 * i)
+        tasks.append(Task(
+            "Standup" if i % 3 else f"Task {i} é\U0001f4c5",
+            start,
+            start + datetime.timedelta(minutes=30) if i % 2 else None,
+            completed=i % 5 == 0,
+            task_id=task_id(i) if task_id else None,
+            recurrence=Recurrence("weekly", exceptions=[start.date()]) if i % 11 == 4 else None,
+        ))
+    return tasks
+
+
+def fields(tasks):
+    return [task.to_dict() for task in tasks]
+
+
+class BinarySnapshotTest(unittest.TestCase):
+    def test_round_trip(self):
+        # Random hex ids are stored raw, others as text with their lengths
+        for task_id in (None, lambda i: f"legacy-{i}"):
+            tasks = sample_tasks(task_id)
+            self.assertEqual(fields(decode_binary_snapshot(encode_binary_snapshot(tasks))), fields(tasks))
+        self.assertEqual(decode_binary_snapshot(encode_binary_snapshot([])), [])
+    
+    def test_range_decode(self):
+        for task_id in (None, lambda i: f"legacy-{i}"):
+            tasks = sample_tasks(task_id)
+            data = encode_binary_snapshot(tasks)
+            start, end = tasks[10].start_time, tasks[20].start_time
+            expected = [task for task in tasks if start <= task.start_time < end or task.recurrence]
+            self.assertEqual(fields(decode_binary_snapshot(data, start, end)), fields(expected))
+            self.assertEqual(fields(decode_binary_snapshot(data, start=start)),
+                             fields([task for task in tasks if start <= task.start_time or task.recurrence]))
+    
+    def test_truncated_snapshot(self):
+        data = encode_binary_snapshot(sample_tasks())
+        for size in range(len(data)):
+            with self.assertRaises(ValueError):
+                decode_binary_snapshot(data[:size])
+        with self.assertRaises(ValueError):
+            decode_binary_snapshot(data + b"\0")
+    
+    def test_foreign_data(self):
+        data = bytearray(encode_binary_snapshot(sample_tasks()))
+        with self.assertRaisesRegex(ValueError, "Not a binary task snapshot"):
+            decode_binary_snapshot(b"[" + bytes(data[1:]))
+        data[8] += 1  # Version, right after the magic
+        with self.assertRaisesRegex(ValueError, "Unsupported binary task snapshot version"):
+            decode_binary_snapshot(bytes(data))
+    
+    def test_corrupt_blocks(self):
+        tasks = sample_tasks()
+        data = encode_binary_snapshot(tasks)
+        # The rule block is last, replace its JSON with a list missing a rule
+        rules = data[data.rindex(b"[{"):]
+        shorter = b"[" + b" " * (len(rules) - 2) + b"]"
+        with self.assertRaises(ValueError):
+            decode_binary_snapshot(data[:-len(rules)] + shorter)
+        # Point the first task at a name past the end of the name table
+        positions = BINARY_HEADER.size + len(tasks) * (8 + 8 + 1)
+        broken = data[:positions] + (1000).to_bytes(4, "little") + data[positions + 4:]
+        with self.assertRaises(ValueError):
+            decode_binary_snapshot(broken)
+
+
+if __name__ == "__main__":
+    unittest.main()
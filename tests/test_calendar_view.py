@@ -0,0 +1,101 @@
+import datetime
+import unittest
+
+import benchmark
+import chroncli
+from chroncli import Task
+from tests.helpers import StoreTestCase
+
+MONTH = datetime.date(2026, 3, 1)
+
+
+class TextWindow(benchmark.FakeWindow):
+    """Fake window that keeps the characters written to it"""
+    
+    def __init__(self, height, width):
+        super().__init__(height, width)
+        self.rows = [[" "] * width for _ in range(height)]
+    
+    def addstr(self, y, x, text, attr=0):
+        super().addstr(y, x, text, attr)
+        if x + len(text) > self.width:
+            raise ValueError(f"addstr past the right edge at ({y}, {x})")
+        self.rows[y][x:x + len(text)] = text
+    
+    def text(self, y, x, width):
+        return "".join(self.rows[y][x:x + width])
+
+
+class CalendarViewTest(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        # The views draw with the real curses attributes, into fake windows and panels
+        self.addCleanup(setattr, chroncli, "curses", chroncli.curses)
+        self.addCleanup(setattr, chroncli, "panel", chroncli.panel)
+        chroncli.load_curses()
+        chroncli.panel = benchmark.FakePanels
+        self.manager = self.open_manager()
+        tasks = [Task(f"Errand {i}", datetime.datetime(2026, 3, 5, 9 + i)) for i in range(3)]
+        tasks += [Task(f"Call {i}", datetime.datetime(2026, 3, 15, 8, 5 * i)) for i in range(12)]
+        tasks.append(Task("Review", datetime.datetime(2026, 3, 29, 18)))
+        self.manager.add_tasks(tasks)
+    
+    def draw(self, screen_width, height=chroncli.MIN_SCREEN_HEIGHT):
+        """Draw the month in the calendar pane of a screen_width wide screen, getting {day: indicator}"""
+        _, (pane_height, pane_width, _, _) = chroncli.ChronCLI._panes(height, screen_width)
+        window = TextWindow(pane_height, pane_width)
+        view = chroncli.CalendarView(window, self.manager)
+        view.current_date = MONTH
+        view.draw()
+        self.window = window
+        _, cells = view._month_grid(MONTH.year, MONTH.month, pane_width)
+        for day, day_str, y, x, indicator_x, indicator_width in cells:
+            self.assertEqual(window.text(y, x, len(day_str)), day_str)
+        return {day: window.text(y, indicator_x, indicator_width).strip()
+                for day, day_str, y, x, indicator_x, indicator_width in cells}
+    
+    def test_counts_at_120_columns(self):
+        indicators = self.draw(120)
+        self.assertEqual((indicators[5], indicators[15], indicators[29]), ("[3]", "[12]", "[1]"))
+        self.assertEqual(indicators[6], "")
+    
+    def test_narrow_cells_never_cut_a_count(self):
+        indicators = self.draw(80)
+        # Two-digit days have a single column left, too few for a two-digit count
+        self.assertEqual((indicators[5], indicators[15], indicators[29]), ("3", "*", "1"))
+        for screen_width in range(80, 141):
+            for day, indicator in self.draw(screen_width).items():
+                count = str(len(self.manager.get_tasks_for_date(datetime.date(2026, 3, day)))) if indicator else ""
+                self.assertIn(indicator, ("", "*", count, f"[{count}]", "!", f"{count}!", f"[{count}!]"),
+                              (screen_width, day))
+    
+    def test_overlap_mark_survives_narrow_cells(self):
+        for day in (3, 22):
+            self.manager.add_task(Task("Standup", datetime.datetime(2026, 3, day, 9),
+                                       datetime.datetime(2026, 3, day, 10)))
+            self.manager.add_task(Task("Dentist", datetime.datetime(2026, 3, day, 9, 30),
+                                       datetime.datetime(2026, 3, day, 11)))
+        indicators = self.draw(120)
+        self.assertEqual((indicators[3], indicators[22]), ("[2!]", "[2!]"))
+        indicators = self.draw(80)
+        self.assertEqual((indicators[3], indicators[22]), ("2!", "!"))
+        for screen_width in range(80, 141):
+            indicators = self.draw(screen_width)
+            self.assertTrue("!" in indicators[3] and "!" in indicators[22], screen_width)
+
+    
+    def test_minimum_screen_shows_every_count(self):
+        # March 2026 starts on a Sunday and spans six weeks, the tallest a month gets
+        indicators = self.draw(chroncli.MIN_SCREEN_WIDTH, chroncli.MIN_SCREEN_HEIGHT)
+        for day, indicator in indicators.items():
+            count = len(self.manager.get_tasks_for_date(datetime.date(2026, 3, day)))
+            self.assertEqual(bool(indicator), bool(count), day)
+        self.assertEqual((indicators[5], indicators[29]), ("3", "1"))
+        # The last week stays above the key help line and the bottom border
+        height, width = self.window.height, self.window.width
+        self.assertEqual(self.window.text(height - 3, 2, 2), "30")
+        self.assertIn("Prev", self.window.text(height - 2, 0, width))
+
+
+if __name__ == "__main__":
+    unittest.main()
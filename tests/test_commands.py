@@ -0,0 +1,55 @@
+import contextlib
+import datetime
+import io
+import json
+import os
+
+import chroncli
+from chroncli import Task
+from tests.helpers import StoreTestCase
+
+
+class ReadOnlyCommandTest(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        today = datetime.datetime.combine(datetime.date.today(), datetime.time(9))
+        # Completed tasks a year old are archived by the next full load
+        self.tasks = [Task(f"Old {i}", today - datetime.timedelta(days=365 + i), completed=True) for i in range(5)]
+        self.tasks += [Task(f"Soon {i}", today + datetime.timedelta(days=i)) for i in range(5)]
+        manager = self.open_manager()
+        manager.add_tasks(self.tasks)
+        manager.close()
+    
+    def store_files(self):
+        """Get the name, size and mtime of every file of the store"""
+        files = {}
+        for root, _, names in os.walk(self.data_dir):
+            for name in names:
+                stat = os.stat(os.path.join(root, name))
+                files[os.path.relpath(os.path.join(root, name), self.data_dir)] = (stat.st_size, stat.st_mtime_ns)
+        return files
+    
+    def run_command(self, *argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(chroncli.main(list(argv)), 0)
+        return out.getvalue()
+    
+    def export_ids(self):
+        return [json.loads(line)["id"] for line in self.run_command("export", "--format", "ndjson").splitlines()]
+    
+    def test_export_and_agenda_leave_the_store_alone(self):
+        files = self.store_files()
+        self.assertEqual(sorted(self.export_ids()), sorted(task.id for task in self.tasks))
+        self.assertIn("Soon 0", self.run_command("agenda"))
+        self.assertEqual(self.store_files(), files)
+    
+    def test_export_includes_archived_and_journaled_tasks(self):
+        self.open_manager().close()  # A full load archives the old tasks
+        self.assertTrue(os.path.isdir(os.path.join(self.data_dir, "archive")))
+        self.run_command("add", "Added headless", "--date", datetime.date.today().isoformat(), "--time", "12:00")
+        files = self.store_files()
+        exported = self.export_ids()
+        self.assertEqual(len(exported), len(self.tasks) + 1)
+        self.assertTrue({task.id for task in self.tasks} <= set(exported))
+        self.assertEqual(self.store_files(), files)
@@ -0,0 +1,118 @@
+import contextlib
+import datetime
+import io
+import json
+import os
+import unittest
+
+import chroncli
+from chroncli import Task
+from tests.helpers import StoreTestCase
+
+START = datetime.datetime(2026, 10, 20, 9)
+
+
+class ImportTest(StoreTestCase):
+    def write(self, name, text):
+        path = os.path.join(self.data_dir, name)
+        with open(path, 'w', newline='') as f:
+            f.write(text)
+        return path
+    
+    def run_command(self, *argv):
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            status = chroncli.main(list(argv))
+        return status, out.getvalue() + err.getvalue()
+    
+    def stored(self, storage="json"):
+        manager = self.open_manager(storage)
+        tasks = sorted((task.name, task.id) for task in manager.iter_tasks())
+        manager.close()
+        return tasks
+    
+    def read(self, reader, text):
+        return list(reader(io.StringIO(text)))
+    
+    def check_taken_ids_are_reassigned(self, storage):
+        manager = self.open_manager(storage)
+        kept = Task("Kept", START, task_id="taken")
+        manager.add_tasks([kept])
+        # One clashes with the store, the other two with each other
+        batch = [Task("Clash", START, task_id="taken"), Task("Twin 1", START, task_id="twin"),
+                 Task("Twin 2", START, task_id="twin")]
+        self.assertEqual(manager.add_tasks(batch), 3)
+        manager.close()
+        tasks = dict(self.stored(storage))
+        self.assertEqual(tasks["Kept"], "taken")
+        self.assertEqual(len(set(tasks.values())), 4)
+        self.assertEqual({tasks[task.name] for task in batch}, {task.id for task in batch})
+    
+    def test_taken_ids_are_reassigned_json(self):
+        self.check_taken_ids_are_reassigned("json")
+    
+    def test_taken_ids_are_reassigned_binary(self):
+        self.check_taken_ids_are_reassigned("binary")
+    
+    def test_taken_ids_are_reassigned_sqlite(self):
+        self.check_taken_ids_are_reassigned("sqlite")
+    
+    def test_reimported_export_gets_new_ids(self):
+        manager = self.open_manager()
+        manager.add_tasks([Task(f"Task {i}", START + datetime.timedelta(hours=i)) for i in range(3)])
+        manager.close()
+        original = self.stored()
+        path = os.path.join(self.data_dir, "export.ndjson")
+        self.assertEqual(self.run_command("export", "-o", path)[0], 0)
+        self.assertEqual(self.run_command("import", path)[0], 0)
+        tasks = self.stored()
+        self.assertEqual([name for name, _ in tasks], [name for name, _ in original for _ in range(2)])
+        self.assertEqual(len({task_id for _, task_id in tasks}), 6)
+    
+    def test_invalid_record_imports_nothing(self):
+        lines = [{"name": "Fine", "start_time": START.isoformat()}, {"start_time": START.isoformat()}]
+        path = self.write("tasks.ndjson", "\n".join(json.dumps(line) for line in lines) + "\n")
+        status, output = self.run_command("import", path)
+        self.assertEqual(status, 1)
+        self.assertIn("line 2: invalid task (missing name)", output)
+        self.assertEqual(self.stored(), [])
+    
+    def test_records_are_validated(self):
+        good = {"name": "Task", "start_time": START.isoformat()}
+        for change, error in [({"name": ""}, "missing name"),
+                              ({"start_time": None}, "missing start_time"),
+                              ({"start_time": "tomorrow"}, "Invalid isoformat"),
+                              ({"id": 5}, "id must be a string"),
+                              ({"completed": "maybe"}, "completed must be true or false"),
+                              ({"completed": 2}, "completed must be true or false"),
+                              ({"recurrence": {"freq": "weekly", "until": "never"}}, "Invalid isoformat")]:
+            with self.subTest(change):
+                with self.assertRaisesRegex(ValueError, f"record 2: invalid task .*{error}"):
+                    self.read(chroncli.read_json, json.dumps([good, {**good, **change}]))
+        with self.assertRaisesRegex(ValueError, "expected a JSON list"):
+            self.read(chroncli.read_json, json.dumps(good))
+        with self.assertRaisesRegex(ValueError, "line 1: invalid task \\(not an object\\)"):
+            self.read(chroncli.read_ndjson, "[]\n")
+    
+    def test_csv_values(self):
+        rows = ["name,start_time,end_time,completed",
+                f"Open,{START.isoformat()},,",
+                f"Done,{START.isoformat()},{(START + datetime.timedelta(hours=1)).isoformat()},Yes",
+                f"Undone,{START.isoformat()},,false"]
+        tasks = self.read(chroncli.read_csv, "\n".join(rows) + "\n")
+        self.assertEqual([(task.name, task.completed) for task in tasks],
+                         [("Open", False), ("Done", True), ("Undone", False)])
+        self.assertEqual(tasks[1].end_time, START + datetime.timedelta(hours=1))
+        with self.assertRaisesRegex(ValueError, "line 3: invalid task \\(completed must be"):
+            self.read(chroncli.read_csv, "\n".join(rows[:2] + [f"Odd,{START.isoformat()},,done"]) + "\n")
+    
+    def test_times_with_an_offset_become_local(self):
+        aware = datetime.datetime(2026, 10, 20, 9, tzinfo=datetime.timezone(datetime.timedelta(hours=-5)))
+        task, = self.read(chroncli.read_ndjson, json.dumps({"name": "Call", "start_time": aware.isoformat()}))
+        self.assertIsNone(task.start_time.tzinfo)
+        self.assertEqual(task.start_time, aware.astimezone().replace(tzinfo=None))
+        self.assertEqual(task.start_time.astimezone(), aware)
+
+
+if __name__ == "__main__":
+    unittest.main()
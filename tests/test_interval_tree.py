@@ -0,0 +1,85 @@
+import datetime
+import random
+import unittest
+
+from chroncli import IntervalTree, Recurrence, Task
+from tests.helpers import StoreTestCase
+
+BASE = datetime.datetime(2026, 3, 1)
+
+
+def random_task(rng):
+    """Get a task that may lack an end, end when it starts, or span midnight"""
+    start = BASE + datetime.timedelta(minutes=15 * rng.randrange(4 * 24 * 10))
+    end = rng.choice((None, start, start + datetime.timedelta(minutes=15 * rng.randrange(1, 200))))
+    return Task(f"Task at {start}", start, end)
+
+
+def brute_force(tasks, start, end):
+    """Get the tasks with a span that overlap [start, end), in the order IntervalTree.overlapping() gives"""
+    found = [task for task in tasks if task.end_time and task.end_time > task.start_time
+             and task.start_time < end and task.end_time > start]
+    return sorted(found, key=lambda task: (task.start_time, task.id))
+
+
+class IntervalTreeTest(unittest.TestCase):
+    def test_overlapping_matches_brute_force(self):
+        rng = random.Random(0)
+        tasks = [random_task(rng) for _ in range(500)]
+        tree = IntervalTree(sorted(tasks, key=lambda task: task.start_time))
+        self.assertEqual(len(tree), sum(1 for task in tasks if task.end_time and task.end_time > task.start_time))
+        for _ in range(200):
+            start = BASE + datetime.timedelta(minutes=5 * rng.randrange(12 * 24 * 11))
+            end = start + datetime.timedelta(minutes=5 * rng.randrange(1, 300))
+            self.assertEqual(tree.overlapping(start, end), brute_force(tasks, start, end))
+    
+    def test_add_and_remove(self):
+        rng = random.Random(1)
+        tree = IntervalTree()
+        tasks = {}
+        for step in range(1000):
+            if tasks and rng.random() < 0.4:
+                task = tasks.pop(rng.choice(sorted(tasks)))
+                tree.remove(task.id)
+            else:
+                task = random_task(rng)
+                tasks[task.id] = task
+                tree.add(task)
+            if step % 50 == 0:
+                start = BASE + datetime.timedelta(hours=rng.randrange(24 * 10))
+                end = start + datetime.timedelta(hours=rng.randrange(1, 30))
+                self.assertEqual(tree.overlapping(start, end), brute_force(tasks.values(), start, end))
+        self.assertEqual(tree.overlapping(BASE, BASE + datetime.timedelta(days=12)),
+                         brute_force(tasks.values(), BASE, BASE + datetime.timedelta(days=12)))
+    
+    def test_touching_intervals_do_not_overlap(self):
+        task = Task("Meeting", BASE.replace(hour=10), BASE.replace(hour=11))
+        tree = IntervalTree([task])
+        self.assertEqual(tree.overlapping(BASE.replace(hour=11), BASE.replace(hour=12)), [])
+        self.assertEqual(tree.overlapping(BASE.replace(hour=9), BASE.replace(hour=10)), [])
+        self.assertEqual(tree.overlapping(BASE.replace(hour=10, minute=59), BASE.replace(hour=12)), [task])
+
+
+class GetOverlappingTest(StoreTestCase):
+    def test_includes_occurrences_running_into_the_range(self):
+        manager = self.open_manager()
+        # A nightly shift that starts before midnight and runs into the next day
+        shift = Task("Night shift", datetime.datetime(2026, 1, 1, 22), datetime.datetime(2026, 1, 2, 6),
+                     recurrence=Recurrence("daily"))
+        meeting = Task("Meeting", datetime.datetime(2026, 3, 1, 5), datetime.datetime(2026, 3, 1, 9))
+        reminder = Task("Reminder", datetime.datetime(2026, 3, 1, 5, 30))
+        for task in (shift, meeting, reminder):
+            manager.add_task(task)
+        
+        # March 1st begins with February 28th's shift still running
+        found = manager.get_overlapping(datetime.datetime(2026, 3, 1), datetime.datetime(2026, 3, 1, 8))
+        self.assertEqual([(task.name, task.start_time) for task in found],
+                         [("Night shift", datetime.datetime(2026, 2, 28, 22)),
+                          ("Meeting", datetime.datetime(2026, 3, 1, 5))])
+        self.assertEqual([task.name for task in manager.find_conflicts(meeting.start_time, meeting.end_time,
+                                                                         meeting.id)],
+                         ["Night shift"])
+
+
+if __name__ == "__main__":
+    unittest.main()
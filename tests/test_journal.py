@@ -0,0 +1,97 @@
+import datetime
+import json
+import os
+import shutil
+
+import chroncli
+from chroncli import Task
+from tests.helpers import StoreTestCase
+
+START = datetime.datetime(2026, 10, 20, 9)
+
+
+class JournalTest(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        manager = chroncli.TaskManager(chroncli.JsonBackend())
+        manager.add_tasks([Task(f"Task {i}", START + datetime.timedelta(hours=i)) for i in range(5)])
+        manager.close()
+        self.snapshot = os.path.join(self.data_dir, "tasks.json")
+        self.journal = os.path.join(self.data_dir, "tasks.journal")
+    
+    def load(self):
+        manager = chroncli.TaskManager(chroncli.JsonBackend())
+        self.addCleanup(manager.close)
+        return {task.id: (task.name, task.completed) for task in manager.iter_tasks()}
+    
+    def add_headless(self, name):
+        """Add a task the way the add command does, to the journal only"""
+        manager = chroncli.TaskManager(chroncli.JsonBackend(), load=False)
+        task = Task(name, START + datetime.timedelta(days=1))
+        manager.add_task(task)
+        manager.close()
+        return task.id
+    
+    def test_journal_replayed_after_snapshot_touched(self):
+        task_id = self.add_headless("Added from the command line")
+        os.utime(self.snapshot, ns=(0, 0))
+        tasks = self.load()
+        self.assertEqual(tasks[task_id], ("Added from the command line", False))
+        self.assertEqual(len(tasks), 6)
+        # The load compacted the journal into the snapshot, the task is kept from then on
+        self.assertEqual(self.load(), tasks)
+    
+    def test_journal_replayed_after_snapshot_copied(self):
+        task_id = self.add_headless("Added before a restore")
+        shutil.copyfile(self.snapshot, self.snapshot + ".bak")
+        os.replace(self.snapshot + ".bak", self.snapshot)
+        self.assertIn(task_id, self.load())
+    
+    def test_replay_onto_snapshot_that_holds_the_records(self):
+        manager = chroncli.TaskManager(chroncli.JsonBackend())
+        ids = [task.id for task in manager.iter_tasks()]
+        manager.toggle_task_completion(ids[0])
+        manager.toggle_task_completion(ids[1])
+        manager.toggle_task_completion(ids[1])
+        manager.delete_task(ids[2])
+        added = Task("Added", START)
+        manager.add_task(added)
+        with open(self.journal, "rb") as f:
+            journal = f.read()
+        manager.close()
+        expected = self.load()
+        # A compaction that crashed before replacing the journal
+        with open(self.journal, "wb") as f:
+            f.write(journal)
+        tasks = self.load()
+        self.assertEqual(tasks, expected)
+        self.assertEqual((tasks[ids[0]][1], tasks[ids[1]][1], ids[2] in tasks), (True, False, False))
+        self.assertEqual(list(tasks).count(added.id), 1)
+        self.assertFalse(os.path.exists(self.journal + ".orphaned"))
+    
+    def test_matching_journal_replayed_as_it_was_written(self):
+        manager = chroncli.TaskManager(chroncli.JsonBackend())
+        task_id = next(manager.iter_tasks()).id
+        manager.toggle_task_completion(task_id)
+        manager.toggle_task_completion(task_id)
+        manager.toggle_task_completion(task_id)
+        with open(self.journal) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record.get("completed") for record in records[1:]], [True, False, True])
+        self.assertTrue(self.load()[task_id][1])
+        manager.close()
+    
+    def test_old_records_of_a_mismatched_journal_are_kept(self):
+        task_ids = list(self.load())
+        with open(self.journal, "a") as f:
+            # A flip from before toggles recorded their result cannot be replayed safely
+            f.write(json.dumps({"op": "toggle", "id": task_ids[0]}) + "\n")
+            f.write(json.dumps({"op": "delete", "id": task_ids[1]}) + "\n")
+        with open(self.journal, "rb") as f:
+            journal = f.read()
+        os.utime(self.snapshot, ns=(0, 0))
+        tasks = self.load()
+        self.assertFalse(tasks[task_ids[0]][1])
+        self.assertNotIn(task_ids[1], tasks)
+        with open(self.journal + ".orphaned", "rb") as f:
+            self.assertEqual(f.read(), journal)
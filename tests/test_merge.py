@@ -0,0 +1,106 @@
+import datetime
+import multiprocessing
+import unittest
+
+import chroncli
+from chroncli import Task
+from tests.helpers import StoreTestCase
+
+START = datetime.datetime(2026, 10, 18, 9)
+
+
+def add_headless(worker, count):
+    """Add tasks from another process the way the add command does"""
+    for i in range(count):
+        manager = chroncli.TaskManager(chroncli.JsonBackend(), load=False)
+        manager.add_task(Task(f"Worker {worker} task {i}", START + datetime.timedelta(minutes=i)))
+        manager.close()
+
+
+class MergeTest(StoreTestCase):
+    def open_json(self):
+        manager = chroncli.TaskManager(chroncli.JsonBackend())
+        self.addCleanup(manager.close)
+        return manager
+    
+    def hold_saves(self, manager):
+        """Queue the manager's changes for the write-behind saver without ever writing them"""
+        manager.start_write_behind()
+        manager.backend._saver.mark_dirty = lambda: None
+    
+    def names(self, manager):
+        return sorted((task.name, task.completed) for task in manager.iter_tasks())
+    
+    def test_instances_see_each_others_changes(self):
+        a, b = self.open_json(), self.open_json()
+        a.add_task(Task("From A", START))
+        self.assertTrue(b.reload_changes())
+        task = b.get_task(next(b.iter_tasks()).id)
+        b.toggle_task_completion(task.id)
+        b.add_task(Task("From B", START))
+        self.assertTrue(a.reload_changes())
+        self.assertEqual(self.names(a), [("From A", True), ("From B", False)])
+        self.assertFalse(a.reload_changes())
+    
+    def test_pending_changes_survive_another_instance_compacting(self):
+        a, b = self.open_json(), self.open_json()
+        a.add_task(Task("Shared", START))
+        b.reload_changes()
+        self.hold_saves(b)
+        b.add_task(Task("Unsaved in B", START))
+        b.toggle_task_completion(a.get_task(next(a.iter_tasks()).id).id)
+        a.add_task(Task("From A", START))
+        a.backend.save_tasks()  # Compacts, so B must diff against a fresh read
+        self.assertTrue(b.reload_changes())
+        expected = [("From A", False), ("Shared", True), ("Unsaved in B", False)]
+        self.assertEqual(self.names(b), expected)
+        self.assertEqual(b.save_status(), "saving")
+        b.close()
+        self.assertEqual(self.names(self.open_json()), expected)
+    
+    def test_edit_to_a_task_archived_elsewhere_is_reapplied(self):
+        old = datetime.datetime.combine(datetime.date.today(), datetime.time(9)) - datetime.timedelta(days=200)
+        a = self.open_json()
+        tasks = [Task(f"Old {i}", old + datetime.timedelta(hours=i)) for i in range(4)]
+        a.add_tasks(tasks)
+        b = self.open_json()
+        self.hold_saves(b)
+        b.toggle_task_completion(tasks[0].id)  # Completed in B
+        b.delete_task(tasks[1].id)
+        b.toggle_task_completion(tasks[2].id)
+        a.toggle_task_completion(tasks[0].id)
+        a.toggle_task_completion(tasks[1].id)
+        a.delete_task(tasks[2].id)
+        a.close()
+        self.open_json().close()  # Loading archives the old completed tasks
+        
+        self.assertTrue(b.reload_changes())
+        b.backend.flush()
+        # B's toggle and delete apply to the archived copies
+        self.assertTrue(b.get_task(tasks[0].id).completed)
+        self.assertNotIn(tasks[0].id, b.backend.archived_ids)
+        self.assertIsNone(b.get_task(tasks[1].id))
+        # The task B toggled is gone, which the status bar reports
+        self.assertEqual(b.save_status(), "edit lost")
+        b.close()
+        fresh = self.open_json()
+        fresh.page_in()
+        self.assertEqual(sorted(task.name for task in fresh.iter_tasks()), ["Old 0", "Old 3"])
+        self.assertTrue(fresh.get_task(tasks[0].id).completed)
+    
+    def test_concurrent_writers_are_serialized(self):
+        self.open_json().close()
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=add_headless, args=(worker, 25)) for worker in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual([worker.exitcode for worker in workers], [0] * 4)
+        names = [name for name, completed in self.names(self.open_json())]
+        self.assertEqual(len(names), 100)
+        self.assertEqual(len(set(names)), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import datetime
+import unittest
+from unittest import mock
+
+import chroncli
+from chroncli import Recurrence, Task
+from tests.helpers import StoreTestCase
+
+START = datetime.datetime(2026, 5, 4, 10)
+
+
+class QueryCursorTest(StoreTestCase):
+    def make_manager(self, storage):
+        """Get a manager whose tasks mostly share a handful of start times"""
+        manager = self.open_manager(storage)
+        tasks = [Task(f"Review {i}" if i % 2 else f"Meeting {i}", START + datetime.timedelta(hours=i // 25),
+                      completed=i % 3 == 0) for i in range(80)]
+        tasks.append(Task("Standup", START, recurrence=Recurrence("daily")))
+        manager.add_tasks(tasks)
+        return manager
+    
+    def pages(self, manager, limit, **filters):
+        """Collect a query a page at a time, each page continuing from the last task of the previous one"""
+        found = []
+        while True:
+            page = list(manager.query(limit=limit, cursor=found[-1] if found else None, **filters))
+            found += page
+            if len(page) < limit:
+                return found
+    
+    def assert_pages_match(self, manager, **filters):
+        everything = [(task.id, task.start_time) for task in manager.query(**filters)]
+        self.assertEqual(len(everything), len(set(everything)))
+        for limit in (1, 3, 7, 25, 100):
+            self.assertEqual([(task.id, task.start_time) for task in self.pages(manager, limit, **filters)],
+                             everything)
+        return everything
+    
+    def check_cursor_with_equal_start_times(self, storage):
+        manager = self.make_manager(storage)
+        end = START + datetime.timedelta(days=3)
+        self.assertEqual(len(self.assert_pages_match(manager)), 81)
+        self.assert_pages_match(manager, start=START, end=end, completed=False)
+        self.assert_pages_match(manager, text="review")
+        # The series yields one occurrence a day, tied with the stored tasks on the first
+        self.assertEqual(len(self.assert_pages_match(manager, start=START, end=end, expand=True)), 80 + 3)
+    
+    def test_cursor_json(self):
+        self.check_cursor_with_equal_start_times("json")
+    
+    def test_cursor_binary(self):
+        self.check_cursor_with_equal_start_times("binary")
+    
+    def test_cursor_sqlite(self):
+        self.check_cursor_with_equal_start_times("sqlite")
+    
+    def test_ties_across_storage_pages(self):
+        # Pages smaller than a run of equal start times must still resume inside the run
+        with mock.patch.object(chroncli, "EXPORT_PAGE_SIZE", 4):
+            manager = self.make_manager("json")
+            self.assert_pages_match(manager)
+            self.assert_pages_match(manager, start=START + datetime.timedelta(hours=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
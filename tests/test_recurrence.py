@@ -0,0 +1,81 @@
+import datetime
+import unittest
+
+from chroncli import Recurrence
+
+
+def dt(*args):
+    return datetime.datetime(*args)
+
+
+class RecurrenceTest(unittest.TestCase):
+    def occurrences(self, rule, start_time, range_start, range_end):
+        return list(rule.occurrences(start_time, range_start, range_end))
+    
+    def test_monthly_skips_months_without_the_day(self):
+        rule = Recurrence("monthly")
+        self.assertEqual(self.occurrences(rule, dt(2026, 1, 31, 9), dt(2026, 1, 1), dt(2026, 8, 1)),
+                         [dt(2026, 1, 31, 9), dt(2026, 3, 31, 9), dt(2026, 5, 31, 9), dt(2026, 7, 31, 9)])
+        leap_days = [when for when in self.occurrences(rule, dt(2024, 2, 29, 9), dt(2024, 1, 1), dt(2029, 1, 1))
+                     if when.month == 2]
+        self.assertEqual(leap_days, [dt(2024, 2, 29, 9), dt(2028, 2, 29, 9)])
+    
+    def test_monthly_count_leaves_out_months_without_the_day(self):
+        rule = Recurrence("monthly", count=4)
+        expected = [dt(2026, 1, 31, 9), dt(2026, 3, 31, 9), dt(2026, 5, 31, 9), dt(2026, 7, 31, 9)]
+        self.assertEqual(self.occurrences(rule, dt(2026, 1, 31, 9), dt(2026, 1, 1), dt(2027, 1, 1)), expected)
+        self.assertEqual(self.occurrences(rule, dt(2026, 1, 31, 9), dt(2026, 3, 1), dt(2027, 1, 1)), expected[1:])
+    
+    def test_monthly_range_matches_full_expansion(self):
+        rule = Recurrence("monthly", interval=5)
+        start_time = dt(2020, 11, 15, 18, 30)
+        everything = self.occurrences(rule, start_time, start_time, dt(2031, 1, 1))
+        for year in range(2021, 2031):
+            for month in (1, 6, 12):
+                range_start = dt(year, month, 1)
+                range_end = range_start + datetime.timedelta(days=45)
+                self.assertEqual(self.occurrences(rule, start_time, range_start, range_end),
+                                 [when for when in everything if range_start <= when < range_end])
+    
+    def test_daily_keeps_wall_clock_time_across_dst(self):
+        rule = Recurrence("daily")
+        # Clocks change on March 29th 2026 in Europe and March 8th 2026 in the US
+        for change in (dt(2026, 3, 8, 9), dt(2026, 3, 29, 9)):
+            days = [change + datetime.timedelta(days=n) for n in range(-2, 3)]
+            got = self.occurrences(rule, dt(2025, 12, 1, 9), days[0].replace(hour=0), days[-1] + datetime.timedelta(hours=1))
+            self.assertEqual(got, days)
+        # The October change and the month end in one range
+        got = self.occurrences(rule, dt(2025, 12, 1, 1, 30), dt(2026, 10, 24), dt(2026, 11, 3))
+        self.assertEqual(got, [dt(2026, 10, 24, 1, 30) + datetime.timedelta(days=n) for n in range(10)])
+    
+    def test_weekly_jumps_to_range_across_month_end(self):
+        rule = Recurrence("weekly", interval=2)
+        start_time = dt(2025, 1, 30, 23, 45)
+        everything = self.occurrences(rule, start_time, start_time, dt(2027, 1, 1))
+        for range_start in (dt(2025, 2, 28), dt(2025, 12, 31, 23, 45), dt(2026, 3, 1)):
+            range_end = range_start + datetime.timedelta(days=40)
+            self.assertEqual(self.occurrences(rule, start_time, range_start, range_end),
+                             [when for when in everything if range_start <= when < range_end])
+    
+    def test_until_and_exceptions(self):
+        rule = Recurrence("daily", until=datetime.date(2026, 2, 2), exceptions=[datetime.date(2026, 1, 31)])
+        self.assertEqual(self.occurrences(rule, dt(2026, 1, 29, 7), dt(2026, 1, 1), dt(2026, 3, 1)),
+                         [dt(2026, 1, 29, 7), dt(2026, 1, 30, 7), dt(2026, 2, 1, 7), dt(2026, 2, 2, 7)])
+        # Dates left out as exceptions still use up the count
+        rule = Recurrence("daily", count=3, exceptions=[datetime.date(2026, 1, 30)])
+        self.assertEqual(self.occurrences(rule, dt(2026, 1, 29, 7), dt(2026, 1, 1), dt(2026, 3, 1)),
+                         [dt(2026, 1, 29, 7), dt(2026, 1, 31, 7)])
+    
+    def test_round_trip(self):
+        rule = Recurrence("weekly", interval=3, until=datetime.date(2026, 12, 31), count=10,
+                          exceptions=[datetime.date(2026, 5, 1)])
+        self.assertEqual(Recurrence.from_dict(rule.to_dict()), rule)
+    
+    def test_rejects_bad_rules(self):
+        for args in (("yearly",), ("daily", 0), ("daily", 1, None, 0)):
+            with self.assertRaises(ValueError):
+                Recurrence(*args)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import datetime
+import random
+import unittest
+
+from chroncli import SortedTaskList, Task, epoch_us
+
+
+def make_tasks(count, seed=0):
+    """Get tasks starting on a few hours of one day, so many share a start time"""
+    rng = random.Random(seed)
+    base = datetime.datetime(2026, 3, 1, 8)
+    return [Task(f"Task {i}", base + datetime.timedelta(hours=rng.randrange(12))) for i in range(count)]
+
+
+class SortedTaskListTest(unittest.TestCase):
+    def setUp(self):
+        # Small chunks so a few hundred tasks already split and empty chunks
+        self.chunk_size = SortedTaskList.CHUNK_SIZE
+        SortedTaskList.CHUNK_SIZE = 4
+    
+    def tearDown(self):
+        SortedTaskList.CHUNK_SIZE = self.chunk_size
+    
+    def assert_matches(self, tasks, expected):
+        self.assertEqual(len(tasks), len(expected))
+        self.assertEqual([task.id for task in tasks], [task.id for task in expected])
+        self.assertEqual(list(tasks.start_keys()), [epoch_us(task.start_time) for task in expected])
+    
+    def test_reset_sorts_stably(self):
+        tasks = make_tasks(50)
+        stored = SortedTaskList(tasks)
+        self.assert_matches(stored, sorted(tasks, key=lambda task: task.start_time))
+    
+    def test_add_keeps_order_and_puts_ties_last(self):
+        stored = SortedTaskList()
+        expected = []
+        for task in make_tasks(300, seed=1):
+            stored.add(task)
+            expected.append(task)
+        # sorted() is stable, so tasks with equal start times stay in insertion order
+        self.assert_matches(stored, sorted(expected, key=lambda task: task.start_time))
+    
+    def test_remove_and_index(self):
+        tasks = make_tasks(200, seed=2)
+        stored = SortedTaskList(tasks)
+        expected = sorted(tasks, key=lambda task: task.start_time)
+        rng = random.Random(3)
+        for task in rng.sample(tasks, 150):
+            stored.remove(task)
+            expected.remove(task)
+            self.assertEqual(len(stored), len(expected))
+        self.assert_matches(stored, expected)
+        for position, task in enumerate(expected):
+            self.assertEqual(stored.index(task), position)
+    
+    def test_remove_unknown_task(self):
+        tasks = make_tasks(20)
+        stored = SortedTaskList(tasks)
+        twin = Task(tasks[0].name, tasks[0].start_time, task_id=tasks[0].id)
+        with self.assertRaises(ValueError):
+            stored.remove(twin)
+    
+    def test_getitem_slice_and_bisect(self):
+        tasks = make_tasks(100, seed=4)
+        stored = SortedTaskList(tasks)
+        expected = sorted(tasks, key=lambda task: task.start_time)
+        self.assertIs(stored[0], expected[0])
+        self.assertIs(stored[-1], expected[-1])
+        with self.assertRaises(IndexError):
+            stored[len(expected)]
+        self.assertEqual(stored.slice(7, 30), expected[7:30])
+        self.assertEqual(stored.slice(90, 200), expected[90:])
+        for hour in range(8, 21):
+            when = datetime.datetime(2026, 3, 1, hour)
+            position = stored.bisect_left(when)
+            self.assertEqual(position, sum(task.start_time < when for task in expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
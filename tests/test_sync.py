@@ -0,0 +1,101 @@
+import datetime
+import json
+import os
+import unittest
+from unittest import mock
+
+import benchmark
+import chroncli
+from chroncli import Task
+from tests.helpers import StoreTestCase
+
+START = datetime.datetime(2026, 10, 20, 9)
+
+
+class SyncTest(StoreTestCase):
+    """Two client stores syncing through a server store, each in its own directory of the scratch one"""
+    
+    def use(self, name):
+        benchmark.use_data_dir(os.path.join(self.data_dir, name))
+    
+    def open(self, name):
+        self.use(name)
+        return chroncli.TaskManager(chroncli.JsonBackend())
+    
+    def change(self, name, edit):
+        manager = self.open(name)
+        try:
+            return edit(manager)
+        finally:
+            manager.close()
+    
+    def tasks(self, name):
+        return self.change(name, lambda manager: sorted((task.id, task.name, task.completed)
+                                                        for task in manager.iter_tasks()))
+    
+    def post(self, url, request, token=None):
+        """Answer a sync request from the server store, sending both ways through JSON as the HTTP server does"""
+        client = chroncli.CONFIG_DIR
+        try:
+            response = self.change("server", lambda manager: chroncli.sync_exchange(manager, json.loads(json.dumps(request))))
+        finally:
+            benchmark.use_data_dir(client)
+        return json.loads(json.dumps(response))
+    
+    def sync(self, name):
+        with mock.patch.object(chroncli, "_post_sync", self.post):
+            return self.change(name, lambda manager: chroncli.sync_with(manager, "http://server"))
+    
+    def converge(self):
+        self.sync("a")
+        self.sync("b")
+        self.sync("a")
+        self.assertEqual(self.tasks("a"), self.tasks("server"))
+        self.assertEqual(self.tasks("b"), self.tasks("server"))
+        return self.tasks("a")
+    
+    def add(self, name, *names):
+        tasks = [Task(task_name, START) for task_name in names]
+        self.change(name, lambda manager: manager.add_tasks(tasks))
+        return [task.id for task in tasks]
+    
+    def test_stores_converge_and_then_send_nothing(self):
+        self.add("a", "A1", "A2")
+        self.add("b", "B1")
+        self.assertEqual(self.sync("a"), (2, 0))
+        self.assertEqual(self.sync("b"), (1, 2))
+        self.assertEqual(self.sync("a"), (0, 1))
+        self.assertEqual(sorted(name for _, name, _ in self.converge()), ["A1", "A2", "B1"])
+        self.assertEqual(self.sync("a"), (0, 0))
+        self.assertEqual(self.sync("b"), (0, 0))
+    
+    def test_later_change_wins(self):
+        first, second = self.add("a", "Completed twice", "Deleted later")
+        self.converge()
+        self.change("a", lambda manager: manager.toggle_task_completion(first))
+        self.change("b", lambda manager: [manager.toggle_task_completion(first) for _ in range(2)])
+        self.change("a", lambda manager: manager.toggle_task_completion(second))
+        self.change("b", lambda manager: manager.delete_task(second))
+        # A pushes first, B's later changes then win on the server and come back to A
+        tasks = self.converge()
+        self.assertEqual(tasks, [(first, "Completed twice", False)])
+    
+    def test_later_edit_revives_an_earlier_delete(self):
+        task_id, = self.add("a", "Revived")
+        self.converge()
+        self.change("b", lambda manager: manager.delete_task(task_id))
+        self.change("a", lambda manager: manager.toggle_task_completion(task_id))
+        self.sync("b")
+        self.assertEqual(self.tasks("server"), [])
+        self.assertEqual(self.converge(), [(task_id, "Revived", True)])
+    
+    def test_store_that_never_syncs_keeps_no_log(self):
+        self.add("a", "Local only")
+        self.assertFalse(os.path.exists(os.path.join(self.data_dir, "a", "tasks.changes")))
+        self.sync("a")
+        self.add("a", "Logged")
+        self.assertEqual(self.sync("a"), (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()